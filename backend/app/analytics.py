@@ -0,0 +1,164 @@
+"""
+Time-bucketed conversion analytics.
+
+``UsageRollup`` keeps one row per UTC hour and one per UTC day with the
+uploads, completions, failures, minutes transcribed, processing time and
+credits charged in it. Rows are updated incrementally, in the caller's
+transaction, when a conversion is uploaded and when it finishes, with the
+same update-or-insert as the usage counters. A chart for any date range
+reads one row per bucket, however many conversions there are.
+
+``backfill`` rebuilds the rollups from the conversions table for data
+recorded before them (deleted conversions cannot be counted).
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from . import models
+
+PERIODS = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+FIELDS = ("uploads", "completed", "failed", "minutes", "processing_seconds", "credits")
+MAX_BUCKETS = 5000  # per request, e.g. about seven months of hours
+BATCH_SIZE = 500
+
+def bucket_start(at: datetime, period: str) -> datetime:
+    if period == "hour":
+        return at.replace(minute=0, second=0, microsecond=0)
+    return at.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def record(db: Session, at: datetime, **deltas: float) -> None:
+    """Add deltas (FIELDS) to the hour and the day containing at"""
+    deltas = {field: value for field, value in deltas.items() if value}
+    if not deltas:
+        return
+    for period in PERIODS:
+        _add_bucket(db, period, bucket_start(at, period), deltas)
+
+def _add_bucket(db: Session, period: str, bucket: datetime, deltas: Dict[str, float]) -> None:
+    Rollup = models.UsageRollup
+    row = db.query(Rollup).filter(Rollup.period == period, Rollup.bucket == bucket)
+    values = {getattr(Rollup, field): getattr(Rollup, field) + value for field, value in deltas.items()}
+    if row.update(values, synchronize_session=False):
+        return
+    try:
+        # First event in this bucket; a concurrent insert makes the update apply
+        with db.begin_nested():
+            db.add(Rollup(period=period, bucket=bucket, **{field: deltas.get(field, 0) for field in FIELDS}))
+    except IntegrityError:
+        row.update(values, synchronize_session=False)
+
+def conversion_uploaded(db: Session, at: datetime) -> None:
+    record(db, at, uploads=1)
+
+def conversion_finished(db: Session, conversion: models.Conversion, processing_seconds: float,
+                        credits: float = 0.0) -> None:
+    """Count a conversion that completed or failed, at its completed_at"""
+    completed = conversion.status == "completed"
+    record(
+        db, conversion.completed_at or datetime.utcnow(),
+        completed=int(completed),
+        failed=int(not completed),
+        minutes=(conversion.duration or 0.0) / 60.0 if completed else 0.0,
+        processing_seconds=processing_seconds,
+        credits=credits,
+    )
+
+def series(db: Session, start: datetime, end: datetime, period: str) -> dict:
+    """Buckets in [start, end), zero-filled, with totals and average processing time"""
+    step = PERIODS[period]
+    first = bucket_start(start, period)
+    count = 0 if end <= first else -(-(end - first) // step)
+    if count > MAX_BUCKETS:
+        raise ValueError(f"At most {MAX_BUCKETS} buckets per request; use a shorter range or daily buckets")
+    Rollup = models.UsageRollup
+    rows = {
+        row.bucket: row
+        for row in db.query(Rollup).filter(
+            Rollup.period == period, Rollup.bucket >= first, Rollup.bucket < end
+        ).order_by(Rollup.bucket)
+    }
+    buckets: List[dict] = []
+    totals = {field: 0 for field in FIELDS}
+    for i in range(count):
+        at = first + i * step
+        row = rows.get(at)
+        values = {field: getattr(row, field) if row else 0 for field in FIELDS}
+        for field in FIELDS:
+            totals[field] += values[field]
+        buckets.append({"start": at.isoformat(), **_summary(values)})
+    return {
+        "period": period,
+        "start": first.isoformat(),
+        "end": end.isoformat(),
+        "buckets": buckets,
+        "totals": _summary(totals),
+    }
+
+def _summary(values: Dict[str, float]) -> dict:
+    finished = values["completed"] + values["failed"]
+    return {
+        "uploads": int(values["uploads"]),
+        "completed": int(values["completed"]),
+        "failed": int(values["failed"]),
+        "minutes": round(values["minutes"], 2),
+        "credits": round(values["credits"], 2),
+        "avg_processing_seconds": round(values["processing_seconds"] / finished, 2) if finished else None,
+    }
+
+def backfill(db: Session, since: Optional[datetime] = None) -> int:
+    """
+    Recompute rollups from conversions (uploads at created_at, completions
+    and failures at completed_at), replacing those from since onwards.
+    Processing time comes from each conversion's trace; credits count the
+    minutes of completed conversions owned by non-admin users. Returns the
+    number of conversions counted.
+    """
+    since = bucket_start(since, "day") if since else None
+    Rollup, Conversion = models.UsageRollup, models.Conversion
+    stale = db.query(Rollup)
+    if since is not None:
+        stale = stale.filter(Rollup.bucket >= since)
+    stale.delete(synchronize_session=False)
+
+    totals: Dict[tuple, Dict[str, float]] = {}
+
+    def add(at: Optional[datetime], **deltas):
+        if at is None or (since is not None and at < since):
+            return
+        for period in PERIODS:
+            entry = totals.setdefault((period, bucket_start(at, period)), {field: 0 for field in FIELDS})
+            for field, value in deltas.items():
+                entry[field] += value
+
+    admins = {user_id for (user_id,) in db.query(models.User.id).filter(models.User.is_admin.is_(True))}
+    query = db.query(
+        Conversion.user_id, Conversion.status, Conversion.duration, Conversion.created_at,
+        Conversion.completed_at, Conversion.updated_at, Conversion.trace
+    )
+    if since is not None:
+        query = query.filter(or_(
+            Conversion.created_at >= since,
+            Conversion.completed_at >= since,
+            and_(Conversion.completed_at.is_(None), Conversion.updated_at >= since)
+        ))
+    count = 0
+    for row in query.yield_per(BATCH_SIZE):
+        count += 1
+        add(row.created_at, uploads=1)
+        if row.status not in ("completed", "failed"):
+            continue
+        completed = row.status == "completed"
+        minutes = (row.duration or 0.0) / 60.0 if completed else 0.0
+        add(
+            row.completed_at or row.updated_at,
+            completed=int(completed),
+            failed=int(not completed),
+            minutes=minutes,
+            processing_seconds=(row.trace or {}).get("wall_seconds") or 0.0,
+            credits=minutes if row.user_id not in admins else 0.0,
+        )
+    db.add_all(Rollup(period=period, bucket=bucket, **values) for (period, bucket), values in totals.items())
+    db.flush()
+    return count
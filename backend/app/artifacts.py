@@ -0,0 +1,134 @@
+"""
+Compressed storage for text artifacts.
+
+The saved Deepgram response (word-level timings for every word) and the
+plain transcript are stored compressed with the codec set by
+ARTIFACT_COMPRESSION. The codec is recorded in the file suffix
+(``abc.json.gz``, ``abc.txt.zst``), so artifacts written uncompressed or with
+another codec stay readable and a download can advertise the matching
+``Content-Encoding`` without inspecting the file.
+
+zstd needs the ``zstd`` extra (``zstandard``); gzip is always available.
+"""
+import gzip
+import hashlib
+import io
+import os
+import shutil
+from typing import IO, Dict, Iterator, Optional
+from .config import settings
+from .storage import storage
+
+SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+ENCODINGS = {suffix: codec for codec, suffix in SUFFIXES.items()}
+CHUNK_SIZE = 64 * 1024
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 9
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("zstd artifacts need the 'zstd' extra: pip install zstandard")
+    return zstandard
+
+def content_encoding(path: str) -> Optional[str]:
+    """The codec an artifact is stored with, or None if it is plain"""
+    return ENCODINGS.get(os.path.splitext(path)[1])
+
+def strip_encoding(path: str) -> str:
+    """Path without its compression suffix: ``abc.json.gz`` -> ``abc.json``"""
+    base, ext = os.path.splitext(path)
+    return base if ext in ENCODINGS else path
+
+def stored_path(path: str, codec: Optional[str] = None) -> str:
+    """Where an artifact named ``path`` is written with the given (or configured) codec"""
+    codec = settings.ARTIFACT_COMPRESSION if codec is None else codec
+    if codec not in SUFFIXES and codec != "none":
+        raise ValueError(f"Unknown artifact compression: {codec}")
+    return strip_encoding(path) + SUFFIXES.get(codec, "")
+
+def open_artifact(path: str, mode: str = "rb", encoding: str = "utf-8") -> IO:
+    """
+    Open an artifact for reading or writing ("rb", "wb", "rt", "wt"),
+    compressing or decompressing according to its suffix. Reads stream from
+    the storage backend; writes always go to the local path, to be persisted
+    once the file is complete.
+    """
+    codec = content_encoding(path)
+    text = "t" in mode
+    reading = "r" in mode
+    raw = storage.open(path) if reading else open(path, "wb")
+    if codec == "gzip":
+        f = gzip.GzipFile(fileobj=raw, mode="rb" if reading else "wb", compresslevel=GZIP_LEVEL)
+        # GzipFile leaves a passed-in file object open
+        f.myfileobj = raw
+    elif codec == "zstd":
+        zstandard = _zstandard()
+        if reading:
+            f = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        else:
+            f = zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(raw, closefd=True)
+    else:
+        f = raw
+    return io.TextIOWrapper(f, encoding=encoding) if text else f
+
+def file_checksum(path: str) -> str:
+    """SHA-256 of a file's stored bytes, recorded when it is written"""
+    digest = hashlib.sha256()
+    with storage.open(path) as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE * 16)
+            if not chunk:
+                return digest.hexdigest()
+            digest.update(chunk)
+
+def checksums(paths: Dict[str, str]) -> Dict[str, str]:
+    """{format: path} -> {format: checksum}"""
+    return {name: file_checksum(path) for name, path in paths.items()}
+
+def iter_decompressed(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield an artifact's original bytes without holding the whole file"""
+    with open_artifact(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+def compress_file(path: str, codec: Optional[str] = None) -> str:
+    """
+    Rewrite an artifact with another codec ("none" decompresses) next to the
+    original and return the new path. The original is left in place so the
+    caller can remove it once the new path is recorded.
+    """
+    target = stored_path(path, codec)
+    if target == path:
+        return path
+    # Keep the codec suffix last so open_artifact picks the right writer
+    base, ext = os.path.splitext(target) if content_encoding(target) else (target, "")
+    tmp_path = f"{base}.tmp{ext}"
+    try:
+        with open_artifact(path, "rb") as src, open_artifact(tmp_path, "wb") as dst:
+            shutil.copyfileobj(src, dst, CHUNK_SIZE)
+        os.replace(tmp_path, target)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return target
+
+def accepts_encoding(accept_encoding: str, codec: str) -> bool:
+    """Whether an Accept-Encoding header value allows the given codec"""
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if name not in (codec, "*") and not (codec == "gzip" and name == "x-gzip"):
+            continue
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                return float(q[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
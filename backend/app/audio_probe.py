@@ -0,0 +1,274 @@
+"""
+Fast audio duration probing from container headers.
+
+Reads only the few bytes needed to compute a duration (WAV fmt/data chunks,
+MP3 Xing/Info/VBRI headers or CBR frame header, MP4/M4A mvhd box, FLAC
+STREAMINFO, the first and last OGG pages); nothing is decoded. Used at
+upload time to admit files against the user's remaining credits before any
+transcription work is started.
+
+Every probe returns None when the format is unknown or the header is not
+understood, so callers must treat the duration as unknown rather than zero.
+"""
+import os
+import struct
+from typing import BinaryIO, Optional
+
+# Bounds on how much of a file a probe may read
+HEAD_BYTES = 64 * 1024
+TAIL_BYTES = 64 * 1024
+
+def _file_size(f: BinaryIO) -> int:
+    pos = f.tell()
+    f.seek(0, os.SEEK_END)
+    size = f.tell()
+    f.seek(pos)
+    return size
+
+def _read_at(f: BinaryIO, offset: int, length: int) -> bytes:
+    f.seek(offset)
+    return f.read(length)
+
+def _id3v2_size(head: bytes) -> int:
+    """Length of a leading ID3v2 tag (0 if none)."""
+    if len(head) < 10 or head[:3] != b"ID3":
+        return 0
+    size = (head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9]
+    footer = 10 if head[5] & 0x10 else 0
+    return 10 + size + footer
+
+def probe_wav(f: BinaryIO, size: int) -> Optional[float]:
+    head = _read_at(f, 0, 12)
+    if len(head) < 12 or head[:4] != b"RIFF" or head[8:12] != b"WAVE":
+        return None
+    offset = 12
+    byte_rate = None
+    while offset + 8 <= size:
+        chunk = _read_at(f, offset, 8)
+        if len(chunk) < 8:
+            break
+        chunk_id, chunk_size = chunk[:4], struct.unpack("<I", chunk[4:])[0]
+        if chunk_id == b"fmt ":
+            fmt = _read_at(f, offset + 8, 16)
+            if len(fmt) < 16:
+                return None
+            byte_rate = struct.unpack("<I", fmt[8:12])[0]
+        elif chunk_id == b"data":
+            if not byte_rate:
+                return None
+            # Streamed writers leave the size at 0 or 0xFFFFFFFF
+            if chunk_size in (0, 0xFFFFFFFF) or offset + 8 + chunk_size > size:
+                chunk_size = size - offset - 8
+            return chunk_size / byte_rate
+        offset += 8 + chunk_size + (chunk_size & 1)
+    return None
+
+def probe_flac(f: BinaryIO, size: int) -> Optional[float]:
+    head = _read_at(f, 0, HEAD_BYTES)
+    start = _id3v2_size(head)
+    block = _read_at(f, start, 4 + 4 + 18)
+    if len(block) < 26 or block[:4] != b"fLaC" or block[4] & 0x7F != 0:
+        return None
+    info = block[8:26]
+    # 20 bits sample rate, 3 bits channels, 5 bits bps, 36 bits total samples
+    packed = int.from_bytes(info[10:18], "big")
+    sample_rate = packed >> 44
+    total_samples = packed & 0xFFFFFFFFF
+    if not sample_rate or not total_samples:
+        return None
+    return total_samples / sample_rate
+
+_MP4_CONTAINERS = {b"moov"}
+
+def probe_mp4(f: BinaryIO, size: int) -> Optional[float]:
+    def walk(offset: int, end: int) -> Optional[float]:
+        while offset + 8 <= end:
+            header = _read_at(f, offset, 16)
+            if len(header) < 8:
+                return None
+            box_size, box_type = struct.unpack(">I4s", header[:8])
+            header_len = 8
+            if box_size == 1:
+                if len(header) < 16:
+                    return None
+                box_size = struct.unpack(">Q", header[8:16])[0]
+                header_len = 16
+            elif box_size == 0:
+                box_size = end - offset
+            if box_size < header_len:
+                return None
+            if box_type in _MP4_CONTAINERS:
+                return walk(offset + header_len, offset + box_size)
+            if box_type == b"mvhd":
+                body = _read_at(f, offset + header_len, 32)
+                if body[:1] == b"\x01":
+                    if len(body) < 32:
+                        return None
+                    timescale, duration = struct.unpack(">IQ", body[20:32])
+                else:
+                    if len(body) < 20:
+                        return None
+                    timescale, duration = struct.unpack(">II", body[12:20])
+                return duration / timescale if timescale else None
+            offset += box_size
+        return None
+
+    first = _read_at(f, 4, 4)
+    if first not in (b"ftyp", b"moov", b"mdat", b"free", b"wide", b"skip"):
+        return None
+    return walk(0, size)
+
+def probe_ogg(f: BinaryIO, size: int) -> Optional[float]:
+    head = _read_at(f, 0, 28 + 255 + 64)
+    if len(head) < 28 or head[:4] != b"OggS":
+        return None
+    segments = head[26]
+    packet = head[27 + segments:]
+    pre_skip = 0
+    if packet[:7] == b"\x01vorbis" and len(packet) >= 16:
+        sample_rate = struct.unpack("<I", packet[12:16])[0]
+    elif packet[:8] == b"OpusHead" and len(packet) >= 12:
+        # Opus granule positions always count 48 kHz samples
+        sample_rate = 48000
+        pre_skip = struct.unpack("<H", packet[10:12])[0]
+    else:
+        return None
+    if not sample_rate:
+        return None
+
+    tail_start = max(0, size - TAIL_BYTES)
+    tail = _read_at(f, tail_start, TAIL_BYTES)
+    last = tail.rfind(b"OggS")
+    while last >= 0:
+        if last + 14 <= len(tail):
+            granule = struct.unpack("<q", tail[last + 6:last + 14])[0]
+            if granule >= 0:
+                return max(0, granule - pre_skip) / sample_rate
+        last = tail.rfind(b"OggS", 0, last)
+    return None
+
+# kbps, indexed by bitrate index 1-14
+_MP3_BITRATES = {
+    (1, 1): [32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (1, 2): [32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (1, 3): [32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (2, 1): [32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (2, 2): [8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (2, 3): [8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_MP3_SAMPLE_RATES = {1: [44100, 48000, 32000], 2: [22050, 24000, 16000], 25: [11025, 12000, 8000]}
+
+def _parse_mp3_header(h: bytes):
+    if len(h) < 4 or h[0] != 0xFF or (h[1] & 0xE0) != 0xE0:
+        return None
+    version_bits = (h[1] >> 3) & 0x3
+    layer_bits = (h[1] >> 1) & 0x3
+    bitrate_index = h[2] >> 4
+    rate_index = (h[2] >> 2) & 0x3
+    if version_bits == 1 or layer_bits == 0 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    version = {3: 1, 2: 2, 0: 25}[version_bits]
+    layer = 4 - layer_bits
+    table_version = 1 if version == 1 else 2
+    bitrate = _MP3_BITRATES[(table_version, layer)][bitrate_index - 1] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+    mono = (h[3] >> 6) == 3
+    if layer == 1:
+        samples = 384
+    elif layer == 2 or version == 1:
+        samples = 1152
+    else:
+        samples = 576
+    return version, layer, bitrate, sample_rate, samples, mono
+
+def _mp3_frame_length(h: bytes, parsed) -> int:
+    version, layer, bitrate, sample_rate, samples, mono = parsed
+    padding = (h[2] >> 1) & 0x1
+    if layer == 1:
+        return (12 * bitrate // sample_rate + padding) * 4
+    return samples // 8 * bitrate // sample_rate + padding
+
+def probe_mp3(f: BinaryIO, size: int) -> Optional[float]:
+    head = _read_at(f, 0, HEAD_BYTES)
+    start = _id3v2_size(head)
+    if start:
+        head = _read_at(f, start, HEAD_BYTES)
+
+    # Find the first frame whose successor header is also valid, so a stray
+    # sync pattern in tag padding or junk is not taken for the first frame
+    frame = None
+    for i in range(len(head) - 4):
+        if head[i] != 0xFF:
+            continue
+        parsed = _parse_mp3_header(head[i:i + 4])
+        if not parsed:
+            continue
+        following = i + _mp3_frame_length(head[i:i + 4], parsed)
+        if following + 4 > len(head):
+            # Successor beyond what was read: only trust it if the file ends there
+            if start + following < size:
+                continue
+        else:
+            successor = _parse_mp3_header(head[following:following + 4])
+            if not successor or successor[:2] != parsed[:2] or successor[3] != parsed[3]:
+                continue
+        frame = (i, parsed)
+        break
+    if frame is None:
+        return None
+    i, (version, layer, bitrate, sample_rate, samples, mono) = frame
+
+    # Xing/Info (LAME) header sits after the side info of the first frame
+    if layer == 3:
+        side_info = (17 if mono else 32) if version == 1 else (9 if mono else 17)
+        xing = head[i + 4 + side_info:i + 4 + side_info + 12]
+        if xing[:4] in (b"Xing", b"Info") and len(xing) >= 12:
+            flags = struct.unpack(">I", xing[4:8])[0]
+            if flags & 0x1:
+                frames = struct.unpack(">I", xing[8:12])[0]
+                return frames * samples / sample_rate
+        vbri = head[i + 36:i + 36 + 18]
+        if vbri[:4] == b"VBRI" and len(vbri) >= 18:
+            frames = struct.unpack(">I", vbri[14:18])[0]
+            return frames * samples / sample_rate
+
+    # No VBR header: assume constant bitrate over the audio payload
+    audio_bytes = size - start - i
+    if _read_at(f, size - 128, 3) == b"TAG":
+        audio_bytes -= 128
+    return max(0, audio_bytes) * 8 / bitrate
+
+PROBES = {
+    ".wav": probe_wav,
+    ".mp3": probe_mp3,
+    ".m4a": probe_mp4,
+    ".mp4": probe_mp4,
+    ".mov": probe_mp4,
+    ".flac": probe_flac,
+    ".ogg": probe_ogg,
+    ".opus": probe_ogg,
+}
+
+def probe_duration(f: BinaryIO, ext: str) -> Optional[float]:
+    """
+    Duration in seconds of an open, seekable audio file, or None if unknown.
+    The file position is restored afterwards.
+    """
+    probe = PROBES.get(ext.lower())
+    if probe is None:
+        return None
+    pos = f.tell()
+    try:
+        size = _file_size(f)
+        duration = probe(f, size)
+    except (struct.error, OSError, KeyError, IndexError, ValueError):
+        duration = None
+    finally:
+        f.seek(pos)
+    if duration is None or duration < 0:
+        return None
+    return duration
+
+def probe_file(path: str) -> Optional[float]:
+    with open(path, "rb") as f:
+        return probe_duration(f, os.path.splitext(path)[1])
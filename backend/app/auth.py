@@ -2,15 +2,14 @@ from datetime import datetime, timedelta
 from typing import Optional
 import re
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from .config import settings
 from .database import get_db
-from . import models, schemas
+from . import models, schemas, hashing
+from .hashing import pwd_context
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
 def validate_password_complexity(password: str) -> tuple[bool, str]:
@@ -38,6 +37,8 @@ def validate_password_complexity(password: str) -> tuple[bool, str]:
     
     return True, "Password meets complexity requirements"
 
+# Synchronous helpers for scripts (init_db.py); request handlers must use the
+# async variants in app.hashing so bcrypt never runs on the event loop.
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
@@ -60,12 +61,17 @@ def get_user_by_username(db: Session, username: str):
 def get_user_by_email(db: Session, email: str):
     return db.query(models.User).filter(models.User.email == email).first()
 
-def authenticate_user(db: Session, username: str, password: str):
+async def authenticate_user(db: Session, username: str, password: str):
     user = get_user_by_username(db, username)
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    is_valid, new_hash = await hashing.verify_and_update(password, user.hashed_password)
+    if not is_valid:
         return False
+    # Upgrade hashes created with outdated cost parameters
+    if new_hash:
+        user.hashed_password = new_hash
+        db.commit()
     return user
 
 async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
@@ -9,13 +9,85 @@ class Settings:
     ALGORITHM = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "43200"))  # 30 days
     
+    # Password hashing: bcrypt cost and the dedicated executor that runs it
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "32"))
+    
     DEEPGRAM_API_KEY = os.getenv("DEEPGRAM_API_KEY")
+    # API host, for on-prem deployments or a local fake (benchmarks/load_test.py)
+    DEEPGRAM_URL = os.getenv("DEEPGRAM_URL", "")
     
     UPLOAD_DIR = os.getenv("UPLOAD_DIR", "./uploads")
     MAX_FILE_SIZE = int(os.getenv("MAX_FILE_SIZE", "104857600"))  # 100MB
+    # Uploads whose duration cannot be probed reserve credits as if they were
+    # audio at this bitrate (a low floor, so the estimate errs long)
+    UNKNOWN_DURATION_KBPS = float(os.getenv("UNKNOWN_DURATION_KBPS", "32"))
+    
+    # DOCX renderer: "stream" (direct XML writer) or "python-docx"
+    DOCX_ENGINE = os.getenv("DOCX_ENGINE", "stream")
+    # Formats rendered after transcription when the upload does not choose
+    DEFAULT_OUTPUT_FORMATS = os.getenv("DEFAULT_OUTPUT_FORMATS", "docx,pdf")
+    # Codec for stored JSON/TXT artifacts: gzip, zstd (needs the zstd extra) or none
+    ARTIFACT_COMPRESSION = os.getenv("ARTIFACT_COMPRESSION", "gzip")
+    
+    # Where audio and artifacts are kept: "local" (UPLOAD_DIR) or "s3" (any
+    # S3-compatible store, needs the s3 extra). With s3, UPLOAD_DIR is only
+    # scratch space and downloads redirect to presigned URLs.
+    STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local")
+    S3_BUCKET = os.getenv("S3_BUCKET")
+    S3_PREFIX = os.getenv("S3_PREFIX", "")
+    S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL")  # e.g. https://fly.storage.tigris.dev or a MinIO URL
+    S3_REGION = os.getenv("S3_REGION", "auto")
+    S3_ACCESS_KEY_ID = os.getenv("S3_ACCESS_KEY_ID")
+    S3_SECRET_ACCESS_KEY = os.getenv("S3_SECRET_ACCESS_KEY")
+    PRESIGNED_URL_EXPIRES = int(os.getenv("PRESIGNED_URL_EXPIRES", "300"))  # seconds
+    
+    # Storage garbage collection: source audio is dropped this many days after
+    # its conversion finished (0, the default, keeps it forever; opt in
+    # deliberately, deletion is permanent); files no conversion refers
+    # to are removed once older than the grace period. Sweeps run in the
+    # background every STORAGE_GC_INTERVAL_HOURS (0 disables them).
+    AUDIO_RETENTION_DAYS = float(os.getenv("AUDIO_RETENTION_DAYS", "0"))
+    ORPHAN_GRACE_HOURS = float(os.getenv("ORPHAN_GRACE_HOURS", "24"))
+    STORAGE_GC_INTERVAL_HOURS = float(os.getenv("STORAGE_GC_INTERVAL_HOURS", "24"))
+    # Per-user storage quota for non-admin users (audio plus artifacts); 0 = unlimited
+    STORAGE_QUOTA_MB = float(os.getenv("STORAGE_QUOTA_MB", "0"))
     
     CORS_ORIGINS = os.getenv("CORS_ORIGINS", "http://localhost:3000").split(",")
     
+    # Metrics: per-process snapshots are shared through METRICS_DIR (default
+    # UPLOAD_DIR/metrics) so any worker reports the whole machine. Scrapes are
+    # served at /metrics on METRICS_PORT (0 = off), which must not be a public
+    # port; the app port only serves them with "Authorization: Bearer
+    # <METRICS_TOKEN>" and answers 404 while METRICS_TOKEN is unset.
+    METRICS_DIR = os.getenv("METRICS_DIR")
+    METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+    METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+    METRICS_HOST = os.getenv("METRICS_HOST", "0.0.0.0")
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+    
+    # Admin request profiling (X-Profile: 1, needs the profiling extra):
+    # reports are kept in PROFILES_DIR (default UPLOAD_DIR/profiles), newest
+    # PROFILE_KEEP only; PROFILE_INTERVAL is the sampling period in seconds
+    PROFILES_DIR = os.getenv("PROFILES_DIR")
+    PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "50"))
+    PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.001"))
+    
+    # SQL statement statistics (GET /api/admin/sql-stats): statements slower
+    # than SLOW_QUERY_MS are logged with their parameter types (0 disables);
+    # the last SLOW_QUERY_KEEP are kept for the admin API
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "250"))
+    SLOW_QUERY_KEEP = int(os.getenv("SLOW_QUERY_KEEP", "100"))
+    
+    # Rate limiter storage shared by all workers. Defaults to a SQLite file on
+    # the data volume; use redis://host:6379 when running several machines.
+    RATE_LIMIT_STORAGE_URI = os.getenv(
+        "RATE_LIMIT_STORAGE_URI",
+        "sqlite:///" + os.path.join(UPLOAD_DIR, "ratelimit.db"),
+    )
+    RATE_LIMIT_STRATEGY = os.getenv("RATE_LIMIT_STRATEGY", "moving-window")
+    
     # Credits warning threshold in minutes
     CREDITS_WARNING_THRESHOLD = float(os.getenv("CREDITS_WARNING_THRESHOLD", "10.0"))
     
@@ -23,6 +95,5 @@ class Settings:
     os.makedirs(UPLOAD_DIR, exist_ok=True)
     os.makedirs(os.path.join(UPLOAD_DIR, "audio"), exist_ok=True)
     os.makedirs(os.path.join(UPLOAD_DIR, "docs"), exist_ok=True)
-    os.makedirs(os.path.join(UPLOAD_DIR, "pdfs"), exist_ok=True)
 
 settings = Settings()
\ No newline at end of file
@@ -1,17 +1,15 @@
 import os
 import json
 import asyncio
+import time
 from pathlib import Path
-from typing import Tuple, List, Dict, Any, Optional
-from deepgram import DeepgramClient, PrerecordedOptions
-from docx import Document
-from docx.shared import Pt
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import cm
+from typing import Tuple, List, Dict, Any, Optional, Iterable, Iterator, Union
 from .config import settings
+from .deepgram_json import DeepgramJSONReader, open_deepgram_json
+from .formats import FORMATS, default_formats
+from .artifacts import open_artifact, stored_path, strip_encoding, checksums
+from .storage import storage
+from .metrics import StageTimer, transcriptions_in_flight
 
 def format_ts(sec: Optional[float]) -> str:
     if sec is None:
@@ -21,43 +19,60 @@ def format_ts(sec: Optional[float]) -> str:
     s = int(round(sec - m * 60))
     return f"{m:02d}:{s:02d}"
 
+def model_name(meta: Dict[str, Any]) -> Optional[str]:
+    mi = meta.get("model_info") or {}
+    if mi:
+        try:
+            key = next(iter(mi))
+            return mi[key].get("name") or mi[key].get("arch")
+        except Exception:
+            pass
+    return None
+
 def response_to_dict(resp):
-    if hasattr(resp, "to_json"):
-        return json.loads(resp.to_json())
     if isinstance(resp, (dict, list)):
         return resp
+    # dataclass_json responses convert straight to dicts; to_json() would
+    # serialise the whole response only for json.loads to parse it back
+    if hasattr(resp, "to_dict"):
+        return resp.to_dict()
+    if hasattr(resp, "to_json"):
+        return json.loads(resp.to_json())
     raise TypeError(f"Unsupported response type: {type(resp)}")
 
-def build_turns_from_deepgram_json(d: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
-    meta = d.get("metadata", {})
-    chan = d.get("results", {}).get("channels", [])
-    if not chan:
-        return [], meta
-    
-    alt = chan[0].get("alternatives", [])
-    if not alt:
-        return [], meta
-    
-    words = alt[0].get("words", [])
-    turns: List[Dict[str, Any]] = []
-    if not words:
-        transcript = alt[0].get("transcript", "").strip()
-        if transcript:
-            turns.append({
-                "speaker": 0,
-                "start": None,
-                "end": None,
-                "text": transcript,
-                "avg_conf": alt[0].get("confidence"),
-            })
-        return turns, meta
+PAUSE_BREAK = 1.2  # Seconds of silence that start a new turn
+
+def _close_turn(current: Dict[str, Any], last_end: Optional[float]) -> Dict[str, Any]:
+    current["end"] = last_end
+    if current["conf_count"]:
+        current["avg_conf"] = current["conf_sum"] / current["conf_count"]
+    else:
+        current["avg_conf"] = None
+    current["text"] = " ".join(current["text"]).replace(" ,", ",").replace(" .", ".")
+    return current
+
+def iter_turns(
+    words: Iterable[Dict[str, Any]],
+    transcript: Optional[str] = None,
+    confidence: Optional[float] = None,
+    pause_break: float = PAUSE_BREAK,
+    speaker_map: Optional[Dict[int, int]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Group words into speaker turns, yielding each turn as soon as it closes.
+    Only the current turn is held in memory. If there are no words, the
+    plain transcript (when given) becomes a single turn.
     
+    speaker_map relabels diarized speakers before grouping, e.g. {2: 0}
+    merges speaker 2 into speaker 0.
+    """
     current = None
     last_end = None
-    PAUSE_BREAK = 1.2
     
     for w in words:
         spk = w.get("speaker", 0)
+        if speaker_map:
+            spk = speaker_map.get(spk, spk)
         wtext = w.get("punctuated_word") or w.get("word") or ""
         start = w.get("start")
         end = w.get("end")
@@ -69,18 +84,12 @@ def build_turns_from_deepgram_json(d: Dict[str, Any]) -> Tuple[List[Dict[str, An
         else:
             if spk != current["speaker"]:
                 new_turn = True
-            elif last_end is not None and start is not None and (start - last_end) > PAUSE_BREAK:
+            elif last_end is not None and start is not None and (start - last_end) > pause_break:
                 new_turn = True
         
         if new_turn:
             if current is not None:
-                current["end"] = last_end
-                if current["conf_count"]:
-                    current["avg_conf"] = current["conf_sum"] / current["conf_count"]
-                else:
-                    current["avg_conf"] = None
-                current["text"] = " ".join(current["text"]).replace(" ,", ",").replace(" .", ".")
-                turns.append(current)
+                yield _close_turn(current, last_end)
             
             current = {
                 "speaker": spk if isinstance(spk, int) else 0,
@@ -103,17 +112,103 @@ def build_turns_from_deepgram_json(d: Dict[str, Any]) -> Tuple[List[Dict[str, An
         last_end = end if end is not None else last_end
     
     if current is not None:
-        current["end"] = last_end
-        if current["conf_count"]:
-            current["avg_conf"] = current["conf_sum"] / current["conf_count"]
+        yield _close_turn(current, last_end)
+    elif transcript and transcript.strip():
+        yield {
+            "speaker": 0,
+            "start": None,
+            "end": None,
+            "text": transcript.strip(),
+            "avg_conf": confidence,
+        }
+
+def merge_short_turns(
+    turns: Iterable[Dict[str, Any]],
+    min_turn_duration: float,
+    pause_break: float = PAUSE_BREAK,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Fold turns shorter than min_turn_duration seconds (interjections such as
+    "yeah") into the preceding turn, then rejoin the preceding turn with the
+    next one when the same speaker carries on within pause_break seconds.
+    Holds at most one pending turn.
+    """
+    pending = None
+    for turn in turns:
+        if pending is None:
+            pending = turn
+            continue
+        start, end = turn["start"], turn["end"]
+        is_short = start is not None and end is not None and (end - start) < min_turn_duration
+        same_speaker_resumes = (
+            turn["speaker"] == pending["speaker"]
+            and start is not None and pending["end"] is not None
+            and (start - pending["end"]) <= pause_break
+        )
+        if is_short or same_speaker_resumes:
+            pending = _join_turns(pending, turn)
         else:
-            current["avg_conf"] = None
-        current["text"] = " ".join(current["text"]).replace(" ,", ",").replace(" .", ".")
-        turns.append(current)
-    
+            yield pending
+            pending = turn
+    if pending is not None:
+        yield pending
+
+def _join_turns(first: Dict[str, Any], second: Dict[str, Any]) -> Dict[str, Any]:
+    count = first.get("conf_count", 0) + second.get("conf_count", 0)
+    if count:
+        first["conf_sum"] = first.get("conf_sum", 0.0) + second.get("conf_sum", 0.0)
+        first["conf_count"] = count
+        first["avg_conf"] = first["conf_sum"] / count
+    first["text"] = f"{first['text']} {second['text']}".strip()
+    if second["end"] is not None:
+        first["end"] = second["end"]
+    return first
+
+def iter_turns_from_deepgram_json(
+    d: Union[Dict[str, Any], DeepgramJSONReader],
+    pause_break: float = PAUSE_BREAK,
+    min_turn_duration: float = 0.0,
+    speaker_map: Optional[Dict[int, int]] = None,
+) -> Tuple[Iterator[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Lazy variant of build_turns_from_deepgram_json: returns a turn iterator
+    and the metadata. Accepts a parsed response dict or a DeepgramJSONReader
+    streaming a saved response from disk.
+    """
+    if isinstance(d, DeepgramJSONReader):
+        if not d.has_channel:
+            return iter(()), d.metadata
+        words, transcript, confidence, meta = d.words(), d.transcript, d.confidence, d.metadata
+    else:
+        meta = d.get("metadata", {})
+        chan = d.get("results", {}).get("channels", [])
+        if not chan:
+            return iter(()), meta
+        
+        alt = chan[0].get("alternatives", [])
+        if not alt:
+            return iter(()), meta
+        words, transcript, confidence = alt[0].get("words", []), alt[0].get("transcript", ""), alt[0].get("confidence")
+    
+    turns = iter_turns(words, transcript, confidence, pause_break=pause_break, speaker_map=speaker_map)
+    if min_turn_duration > 0:
+        turns = merge_short_turns(turns, min_turn_duration, pause_break)
     return turns, meta
 
+def build_turns_from_deepgram_json(
+    d: Union[Dict[str, Any], DeepgramJSONReader],
+    pause_break: float = PAUSE_BREAK,
+    min_turn_duration: float = 0.0,
+    speaker_map: Optional[Dict[int, int]] = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    turns, meta = iter_turns_from_deepgram_json(d, pause_break, min_turn_duration, speaker_map)
+    return list(turns), meta
+
 def render_docx(docx_path: Path, audio_name: str, turns: List[Dict[str, Any]], meta: Dict[str, Any]) -> None:
+    # Imported here so the API process does not load python-docx at startup
+    from docx import Document
+    from docx.shared import Pt
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
     doc = Document()
     
     title = doc.add_heading(audio_name, level=0)
@@ -123,14 +218,7 @@ def render_docx(docx_path: Path, audio_name: str, turns: List[Dict[str, Any]], m
     p.alignment = WD_ALIGN_PARAGRAPH.CENTER
     duration = meta.get("duration")
     channels = meta.get("channels")
-    model = None
-    mi = meta.get("model_info") or {}
-    if mi:
-        try:
-            key = next(iter(mi))
-            model = mi[key].get("name") or mi[key].get("arch")
-        except Exception:
-            pass
+    model = model_name(meta)
     p.add_run(f"Duration: {format_ts(duration)}   •   Channels: {channels or '—'}   •   Model: {model or '—'}").italic = True
     
     doc.add_paragraph("")
@@ -159,85 +247,114 @@ def render_docx(docx_path: Path, audio_name: str, turns: List[Dict[str, Any]], m
     
     doc.save(str(docx_path))
 
-def render_pdf(pdf_path: Path, audio_name: str, turns: List[Dict[str, Any]], meta: Dict[str, Any]) -> None:
-    doc = SimpleDocTemplate(str(pdf_path), pagesize=A4,
-                            leftMargin=2*cm, rightMargin=2*cm,
-                            topMargin=2*cm, bottomMargin=2*cm)
-    
-    styles = getSampleStyleSheet()
-    heading = ParagraphStyle(
-        "Heading",
-        parent=styles["Title"],
-        fontSize=18,
-        leading=22,
-        alignment=1
-    )
-    meta_style = ParagraphStyle(
-        "Meta",
-        parent=styles["Italic"],
-        alignment=1,
-        fontSize=10,
-    )
-    speaker_style = ParagraphStyle(
-        "Speaker",
-        parent=styles["Heading4"],
-        fontSize=12,
-        spaceBefore=8,
-        spaceAfter=2
-    )
-    text_style = ParagraphStyle(
-        "Text",
-        parent=styles["BodyText"],
-        fontSize=11,
-        leading=15,
-        spaceAfter=6
-    )
-    
-    story = []
-    story.append(Paragraph(audio_name, heading))
-    
-    duration = meta.get("duration")
-    channels = meta.get("channels")
-    model = None
-    mi = meta.get("model_info") or {}
-    if mi:
+def render_pdf(pdf_path: Path, audio_name: str, turns: Iterable[Dict[str, Any]], meta: Dict[str, Any]) -> None:
+    # Laid out incrementally from the turn iterator, see app/pdf_render.py
+    from .pdf_render import render_pdf as render_pdf_stream
+    render_pdf_stream(pdf_path, audio_name, turns, meta)
+
+def render_from_json(
+    json_path: str,
+    display_name: str,
+    formats: Iterable[str],
+    pause_break: float = PAUSE_BREAK,
+    min_turn_duration: float = 0.0,
+    speaker_map: Optional[Dict[int, int]] = None,
+    timer: Optional[StageTimer] = None,
+) -> Dict[str, str]:
+    """
+    Build turns from a saved Deepgram response and render the requested
+    formats next to it. Each format streams its own pass over the JSON, so
+    neither the words nor the full turn list are ever held in memory. Files
+    are written to a temporary path and swapped in atomically.
+    Turn building and rendering interleave; the time spent producing turns
+    is recorded as "build_turns" and the rest as "render_<format>".
+    Returns {format: path}.
+    """
+    timer = timer or StageTimer()
+    base = strip_encoding(json_path)
+    base = base[:-len(".json")] if base.endswith(".json") else base
+    paths = {}
+    for fmt in formats:
+        timer.current = f"render_{fmt}"
+        # Includes importing the renderer the first time it is used
+        start, started = time.time(), time.perf_counter()
+        output_format = FORMATS[fmt]
+        render = output_format.render_function()
+        path = f"{base}{output_format.extension}"
+        tmp_path = f"{base}.tmp{output_format.extension}"
+        turns_seconds = [0.0]
         try:
-            key = next(iter(mi))
-            model = mi[key].get("name") or mi[key].get("arch")
-        except Exception:
-            pass
-    
-    meta_line = f"Duration: {format_ts(duration)} • Channels: {channels or '—'} • Model: {model or '—'}"
-    story.append(Paragraph(meta_line, meta_style))
-    story.append(Spacer(1, 12))
-    
-    for t in turns:
-        spk = t["speaker"]
-        st = format_ts(t["start"])
-        en = format_ts(t["end"])
-        story.append(Paragraph(f"Speaker {spk}  [{st}–{en}]", speaker_style))
-        story.append(Paragraph(t["text"], text_style))
-    
-    story.append(Spacer(1, 12))
-    story.append(Paragraph("Generated by Deepgram + Python", meta_style))
+            with open_deepgram_json(json_path) as reader:
+                turns, meta = iter_turns_from_deepgram_json(reader, pause_break, min_turn_duration, speaker_map)
+                render(Path(tmp_path), display_name, timer.timed_iter(turns, turns_seconds), meta)
+            os.replace(tmp_path, path)
+            # Turns stream into the renderer: one trace event per format
+            timer.record("build_turns", turns_seconds[0], trace=False)
+            timer.record(
+                f"render_{fmt}", time.perf_counter() - started - turns_seconds[0], start,
+                turns_seconds=round(turns_seconds[0], 3), bytes=os.path.getsize(path)
+            )
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        paths[fmt] = path
+    return paths
+
+def persist_artifacts(paths: Dict[str, str]) -> Tuple[Dict[str, str], Dict[str, int]]:
+    """
+    Checksum and measure freshly written artifacts while they are local, hand
+    them to the storage backend and drop the scratch copies. Returns
+    ({format: checksum}, {format: bytes}).
+    """
+    sums = checksums(paths)
+    sizes = {name: os.path.getsize(path) for name, path in paths.items()}
+    for path in paths.values():
+        storage.persist(path)
+        storage.release(path)
+    return sums, sizes
+
+def save_transcript(data: Dict[str, Any], output_base_path: str) -> Tuple[str, str]:
+    """
+    Write the JSON response and the plain transcript (TXT, even if empty),
+    compressed with ARTIFACT_COMPRESSION. The JSON is encoded piece by piece
+    into the file rather than built as one string first.
+    """
+    json_path = stored_path(f"{output_base_path}.json")
+    with open_artifact(json_path, "wt") as f:
+        json.dump(data, f, ensure_ascii=False, default=str)
     
-    doc.build(story)
+    text = ""
+    channels = data.get("results", {}).get("channels", [])
+    if channels and channels[0].get("alternatives"):
+        # Get the transcript, ensuring it's not None
+        text = channels[0]["alternatives"][0].get("transcript", "") or ""
+    txt_path = stored_path(f"{output_base_path}.txt")
+    with open_artifact(txt_path, "wt") as f:
+        f.write(text)
+    return json_path, txt_path
 
 async def transcribe_and_convert(
     audio_path: str,
     output_base_path: str,
     display_name: str,
     language: Optional[str] = None,
-    model: str = "nova-3"
+    model: str = "nova-3",
+    formats: Optional[Iterable[str]] = None,
+    timer: Optional[StageTimer] = None
 ) -> Dict[str, Any]:
     """
     Transcribe audio file and convert to multiple formats
+    (DEFAULT_OUTPUT_FORMATS unless given; JSON and TXT are always written)
     Returns paths to generated files and metadata
     """
     if not settings.DEEPGRAM_API_KEY:
         raise ValueError("DEEPGRAM_API_KEY not configured")
+    timer = timer or StageTimer()
     
-    client = DeepgramClient(settings.DEEPGRAM_API_KEY)
+    # The SDK pulls in httpx, websockets and dataclasses_json; it is only
+    # needed once a conversion actually runs
+    from deepgram import DeepgramClient, DeepgramClientOptions, PrerecordedOptions
+    client = DeepgramClient(settings.DEEPGRAM_API_KEY, DeepgramClientOptions(url=settings.DEEPGRAM_URL))
     
     # Build options
     options_dict = {
@@ -259,7 +376,9 @@ async def transcribe_and_convert(
     options = PrerecordedOptions(**options_dict)
     
     # Transcribe the audio file
-    with open(audio_path, "rb") as audio_file:
+    with timer.stage("fetch_audio"):
+        audio_path = await asyncio.to_thread(storage.fetch, audio_path)
+    with timer.stage("transcribe"), transcriptions_in_flight.track(), open(audio_path, "rb") as audio_file:
         source = {"buffer": audio_file, "mimetype": "audio/mpeg"}
         response = await asyncio.to_thread(
             client.listen.prerecorded.v("1").transcribe_file,
@@ -267,34 +386,15 @@ async def transcribe_and_convert(
             options
         )
     
-    # Save JSON response
-    json_path = f"{output_base_path}.json"
-    with open(json_path, "w", encoding="utf-8") as f:
-        raw_json = response.to_json() if hasattr(response, "to_json") else json.dumps(response, ensure_ascii=False)
-        f.write(raw_json)
-    
-    # Extract transcript for TXT file
+    timer.current = "save_transcript"
+    start, started = time.time(), time.perf_counter()
+    # Convert the response to a dict once and serialise it once for the file
     data = response_to_dict(response)
-    text = ""
-    channels = data.get("results", {}).get("channels", [])
-    if channels and channels[0].get("alternatives"):
-        # Get the transcript, ensuring it's not None
-        transcript = channels[0]["alternatives"][0].get("transcript", "")
-        text = transcript if transcript else ""
-    
-    # Save TXT file (even if empty, to maintain consistency)
-    txt_path = f"{output_base_path}.txt"
-    with open(txt_path, "w", encoding="utf-8") as f:
-        f.write(text)
-    
-    # Generate DOCX and PDF
-    turns, meta = build_turns_from_deepgram_json(data)
-    
-    docx_path = f"{output_base_path}.docx"
-    pdf_path = f"{output_base_path}.pdf"
+    del response
     
-    render_docx(Path(docx_path), display_name, turns, meta)
-    render_pdf(Path(pdf_path), display_name, turns, meta)
+    # Off the event loop: compressing a long transcript takes a while
+    json_path, txt_path = await asyncio.to_thread(save_transcript, data, output_base_path)
+    channels = data.get("results", {}).get("channels", [])
     
     # Get detected language if auto-detection was used
     detected_language = language  # Default to requested language
@@ -303,13 +403,30 @@ async def transcribe_and_convert(
         detected_language = channels[0].get("detected_language")
         if not detected_language:
             # Fallback to metadata language field
-            detected_language = meta.get("language")
+            detected_language = data.get("metadata", {}).get("language")
+    
+    # Render the requested formats by streaming the saved JSON; the in-memory
+    # response is released first so rendering memory does not grow with it
+    meta = data.get("metadata", {})
+    del data, channels
+    timer.record("save_transcript", time.perf_counter() - started, start)
+    # Off the event loop: long transcripts take seconds to lay out
+    paths = await asyncio.to_thread(
+        render_from_json, json_path, display_name, formats if formats is not None else default_formats(),
+        timer=timer
+    )
+    with timer.stage("persist"):
+        sums, sizes = await asyncio.to_thread(persist_artifacts, {"json": json_path, "txt": txt_path, **paths})
+    del sums["json"]  # Not downloadable, so it needs no ETag
     
     return {
         "json_path": json_path,
         "txt_path": txt_path,
-        "docx_path": docx_path,
-        "pdf_path": pdf_path,
+        "docx_path": paths.get("docx"),
+        "pdf_path": paths.get("pdf"),
+        "paths": paths,
+        "checksums": sums,
+        "sizes": sizes,
         "duration": meta.get("duration"),
         "model_used": model,
         "language": detected_language or language,
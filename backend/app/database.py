@@ -1,7 +1,12 @@
-from sqlalchemy import create_engine
+import hashlib
+import warnings
+from sqlalchemy import create_engine, inspect, text, select, Table, Column, Integer, String
+from sqlalchemy.exc import SAWarning, SQLAlchemyError
+from sqlalchemy.schema import CreateIndex
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
+from . import query_stats
 
 # Fix postgres:// to postgresql:// for SQLAlchemy compatibility
 database_url = settings.DATABASE_URL
@@ -12,6 +17,7 @@ engine = create_engine(
     database_url,
     connect_args={"check_same_thread": False} if database_url.startswith("sqlite") else {}
 )
+query_stats.instrument(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -22,4 +28,76 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# One-row table holding a fingerprint of the models the schema was last
+# upgraded to, so startups with an up-to-date schema skip introspection
+schema_info = Table(
+    "schema_info",
+    Base.metadata,
+    Column("id", Integer, primary_key=True),
+    Column("fingerprint", String(64), nullable=False),
+)
+
+def schema_fingerprint() -> str:
+    """Hash of every table, column (type and nullability) and index in the models"""
+    from . import models  # noqa: F401  make sure every table is registered
+    digest = hashlib.sha256()
+    for table in Base.metadata.sorted_tables:
+        digest.update(f"{table.name}|".encode())
+        for column in table.columns:
+            digest.update(f"{column.name}:{column.type!r}:{column.nullable}|".encode())
+        for index in sorted(table.indexes, key=lambda i: i.name or ""):
+            digest.update(f"{index.name}|".encode())
+    return digest.hexdigest()
+
+def schema_is_current(bind=engine) -> bool:
+    try:
+        with bind.connect() as conn:
+            stored = conn.execute(select(schema_info.c.fingerprint)).scalar()
+    except SQLAlchemyError:
+        # Fresh database, or one created before schema_info existed
+        return False
+    return stored == schema_fingerprint()
+
+def upgrade_schema(bind=engine, force: bool = False) -> bool:
+    """
+    Create missing tables, and add missing nullable columns and indexes to
+    existing ones.
+
+    create_all() never alters tables that already exist, so columns and
+    indexes added to the models after a deployment would otherwise be absent
+    in production.
+    Skipped (a single SELECT) when the stored fingerprint matches the models,
+    unless force is set. Returns whether the schema was checked.
+    """
+    if not force and schema_is_current(bind):
+        return False
+    from . import models  # noqa: F401  make sure every table is registered
+    if bind.dialect.name == "postgresql":
+        # The user search indexes use trigram operator classes
+        with bind.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    Base.metadata.create_all(bind=bind)
+    inspector = inspect(bind)
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                col_type = column.type.compile(dialect=bind.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}'))
+            with warnings.catch_warnings():
+                warnings.filterwarnings("ignore", "Skipped unsupported reflection", SAWarning)
+                indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in indexes:
+                    # IF NOT EXISTS: SQLite does not reflect expression indexes
+                    create = CreateIndex(index, if_not_exists=True)
+                    # Executing the construct directly ignores Index.ddl_if()
+                    if create._should_execute(index, conn):
+                        conn.execute(create)
+        conn.execute(schema_info.delete())
+        conn.execute(schema_info.insert().values(id=1, fingerprint=schema_fingerprint()))
+    return True
@@ -0,0 +1,234 @@
+"""
+Incremental reader for saved Deepgram JSON responses.
+
+A multi-hour recording produces a response of several MB, almost all of it
+in ``results.channels[0].alternatives[0].words`` (and the paragraphs and
+utterances that repeat those words). ``DeepgramJSONReader`` walks the file
+with a small rolling buffer, decodes only the values it needs (metadata,
+transcript, detected language, one word at a time) and skips everything
+else without materialising it, so memory stays bounded by the largest
+single value it keeps rather than by the transcript size.
+
+    with open_deepgram_json(path) as reader:
+        meta = reader.metadata
+        for word in reader.words():
+            ...
+"""
+import json
+import re
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, TextIO
+from .artifacts import open_artifact
+
+CHUNK_SIZE = 64 * 1024
+
+_WS = re.compile(r"[ \t\n\r]*")
+_STRING_BODY = re.compile(r'(?:[^"\\]|\\.)*', re.S)
+_STRUCT = re.compile(r'["\[\]{}]')
+_decoder = json.JSONDecoder()
+
+# Marker yielded by the walk when it reaches the first word
+_WORDS_START = object()
+
+class DeepgramJSONReader:
+    """
+    Streaming view of a Deepgram response stored as JSON.
+
+    Fields that precede the words array in the file (``metadata``,
+    ``transcript``, ``confidence``) are available right after construction;
+    fields after it (``detected_language``) once ``words()`` is exhausted.
+    """
+
+    def __init__(self, fp: TextIO):
+        self._fp = fp
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self.metadata: Dict[str, Any] = {}
+        self.transcript: Optional[str] = None
+        self.confidence: Optional[float] = None
+        self.detected_language: Optional[str] = None
+        self.has_channel = False
+        self._events = self._walk()
+        self._in_words = False
+        for event in self._events:
+            if event is _WORDS_START:
+                self._in_words = True
+                break
+
+    def words(self) -> Iterator[Dict[str, Any]]:
+        """Yield the words of the first alternative of the first channel, once."""
+        if self._in_words:
+            self._in_words = False
+            yield from self._events
+
+    # Buffer handling
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._fp.read(CHUNK_SIZE)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        while True:
+            self._pos = _WS.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of Deepgram JSON")
+
+    def _expect(self, char: str) -> None:
+        if self._peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self._pos} of buffer")
+        self._pos += 1
+
+    def _read_value(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buf, self._pos)
+            except ValueError:
+                if self._fill():
+                    continue
+                raise
+            # A number at the very end of the buffer may continue in the next chunk
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def _skip_string(self) -> None:
+        self._pos += 1  # opening quote
+        while True:
+            self._pos = _STRING_BODY.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf) and self._buf[self._pos] == '"':
+                self._pos += 1
+                return
+            # Ran out of buffer, possibly on a lone trailing backslash
+            if not self._fill():
+                raise ValueError("Unterminated string in Deepgram JSON")
+
+    def _skip_value(self) -> None:
+        char = self._peek()
+        if char == '"':
+            self._skip_string()
+            return
+        if char not in "[{":
+            self._read_value()
+            return
+        depth = 0
+        while True:
+            m = _STRUCT.search(self._buf, self._pos)
+            if m is None:
+                self._pos = len(self._buf)
+                if not self._fill():
+                    raise ValueError("Unexpected end of Deepgram JSON")
+                continue
+            char = m.group()
+            if char == '"':
+                self._pos = m.start()
+                self._skip_string()
+                continue
+            self._pos = m.end()
+            depth += 1 if char in "[{" else -1
+            if depth == 0:
+                return
+
+    # Structure walking
+
+    def _keys(self) -> Iterator[str]:
+        """Yield each key of an object; the caller must consume its value."""
+        if self._peek() != "{":
+            self._read_value()  # null or an unexpected scalar
+            return
+        self._pos += 1
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self._read_value()
+            self._expect(":")
+            yield key
+            if self._peek() == ",":
+                self._pos += 1
+            else:
+                self._expect("}")
+                return
+
+    def _items(self) -> Iterator[int]:
+        """Yield each index of an array; the caller must consume its value."""
+        if self._peek() != "[":
+            self._read_value()
+            return
+        self._pos += 1
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        index = 0
+        while True:
+            yield index
+            if self._peek() == ",":
+                self._pos += 1
+                index += 1
+            else:
+                self._expect("]")
+                return
+
+    def _walk(self):
+        for key in self._keys():
+            if key == "metadata":
+                self.metadata = self._read_value() or {}
+            elif key == "results":
+                yield from self._results()
+            else:
+                self._skip_value()
+
+    def _results(self):
+        for key in self._keys():
+            if key == "channels":
+                for index in self._items():
+                    if index == 0:
+                        self.has_channel = True
+                        yield from self._channel()
+                    else:
+                        self._skip_value()
+            else:
+                self._skip_value()
+
+    def _channel(self):
+        for key in self._keys():
+            if key == "alternatives":
+                for index in self._items():
+                    if index == 0:
+                        yield from self._alternative()
+                    else:
+                        self._skip_value()
+            elif key == "detected_language":
+                self.detected_language = self._read_value()
+            else:
+                self._skip_value()
+
+    def _alternative(self):
+        for key in self._keys():
+            if key == "transcript":
+                self.transcript = self._read_value()
+            elif key == "confidence":
+                self.confidence = self._read_value()
+            elif key == "words":
+                yield _WORDS_START
+                for _ in self._items():
+                    yield self._read_value()
+            else:
+                self._skip_value()
+
+@contextmanager
+def open_deepgram_json(path: str):
+    # Saved responses may be compressed; see app/artifacts.py
+    with open_artifact(path, "rt") as f:
+        yield DeepgramJSONReader(f)
@@ -0,0 +1,143 @@
+"""
+Conditional and partial responses for artifact downloads.
+
+Artifacts get a strong ETag derived from the checksum recorded when they
+were written, so a client that already holds the file revalidates with
+``If-None-Match`` and receives an empty 304. Stored files also honour a
+single ``Range`` (with ``If-Range``) so interrupted downloads resume.
+
+Re-rendering replaces an artifact at the same URL, so responses are
+``no-cache`` (always revalidated) unless the URL carries the artifact's
+version (``?v=``, listed in ``ConversionResponse.versions``), in which case
+they are immutable for a year.
+
+When the storage backend hands out presigned URLs, downloads redirect to
+the object store instead; the ETag is still checked here first.
+"""
+import os
+from typing import Dict, Iterator, Optional, Tuple
+from urllib.parse import quote
+from fastapi import Request
+from fastapi.responses import Response, FileResponse, StreamingResponse, RedirectResponse
+
+CHUNK_SIZE = 64 * 1024
+VERSION_LENGTH = 16
+IMMUTABLE = "private, max-age=31536000, immutable"
+REVALIDATE = "private, no-cache"
+# Presigned URLs expire, so the redirect itself must never be reused
+NO_STORE = "private, no-store"
+
+def version(checksum: str) -> str:
+    """Short token identifying one revision of an artifact"""
+    return checksum[:VERSION_LENGTH]
+
+def attachment_header(filename: str) -> str:
+    """Content-Disposition value, encoded the way FileResponse does it"""
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/ prefixes are ignored"""
+    if not header:
+        return False
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single ``bytes=`` range into inclusive (start, end). Returns None
+    when the header should be ignored (other units, several ranges, bad
+    syntax) and raises ValueError when the range cannot be satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    if first:
+        if not first.isdigit() or (last and not last.isdigit()):
+            return None
+        start = int(first)
+        end = int(last) if last else size - 1
+        if last and end < start:
+            return None
+    else:
+        # Suffix range: the last N bytes
+        if not last.isdigit():
+            return None
+        if int(last) == 0:
+            raise ValueError("empty suffix range")
+        start, end = max(0, size - int(last)), size - 1
+    if start >= size:
+        raise ValueError("range starts past the end")
+    return start, min(end, size - 1)
+
+def _iter_file(path: str, start: int, length: int) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                return
+            length -= len(chunk)
+            yield chunk
+
+def artifact_response(
+    request: Request,
+    path: Optional[str],
+    media_type: str,
+    filename: str,
+    etag: str,
+    cache_control: str,
+    headers: Optional[Dict[str, str]] = None,
+    body: Optional[Iterator[bytes]] = None,
+) -> Response:
+    """
+    Serve an artifact with validators. ``path`` is sent as stored (with
+    Range support); ``body`` instead streams a transformed representation,
+    which is never served partially.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control, **(headers or {})}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    if body is not None:
+        headers["Content-Disposition"] = attachment_header(filename)
+        return StreamingResponse(body, media_type=media_type, headers=headers)
+
+    headers["Accept-Ranges"] = "bytes"
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    # A stale If-Range means the client's partial copy is outdated: send it all
+    if range_header and (not if_range or if_range.strip() == etag):
+        size = os.path.getsize(path)
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            headers["Content-Range"] = f"bytes */{size}"
+            return Response(status_code=416, headers=headers)
+        if byte_range is not None:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+            headers["Content-Length"] = str(end - start + 1)
+            headers["Content-Disposition"] = attachment_header(filename)
+            return StreamingResponse(
+                _iter_file(path, start, end - start + 1),
+                status_code=206,
+                media_type=media_type,
+                headers=headers
+            )
+
+    return FileResponse(path=path, media_type=media_type, filename=filename, headers=headers)
+
+def redirect_response(request: Request, url: str, etag: str) -> Response:
+    """Send the client to a presigned URL unless its copy is still current"""
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": REVALIDATE})
+    return RedirectResponse(url, status_code=307, headers={"ETag": etag, "Cache-Control": NO_STORE})
@@ -0,0 +1,86 @@
+"""
+Lightweight exporters that render straight from the turn list.
+
+SRT and WebVTT captions and a JSONL dump of turns need nothing but the
+standard library and take milliseconds even for multi-hour transcripts.
+All exporters share the renderer signature used by ``app.formats``:
+``render(path, display_name, turns, meta)``, consuming turns lazily.
+"""
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Tuple
+
+# Caption cues are cut at word boundaries to stay readable on screen
+MAX_CUE_CHARS = 84
+MAX_CUE_SECONDS = 7.0
+
+def _clock(sec: float, separator: str) -> str:
+    ms = int(round(max(0.0, sec) * 1000))
+    h, ms = divmod(ms, 3_600_000)
+    m, ms = divmod(ms, 60_000)
+    s, ms = divmod(ms, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d}{separator}{ms:03d}"
+
+def iter_cues(turns: Iterable[Dict[str, Any]], meta: Dict[str, Any]) -> Iterator[Tuple[float, float, int, str, bool]]:
+    """
+    Split turns into caption cues of at most MAX_CUE_CHARS characters and
+    roughly MAX_CUE_SECONDS each, spreading the turn's time over its cues in
+    proportion to their length. Yields (start, end, speaker, text, first)
+    where first marks the first cue of a turn.
+    """
+    for t in turns:
+        words = t["text"].split()
+        if not words:
+            continue
+        start = t["start"] if t["start"] is not None else 0.0
+        end = t["end"] if t["end"] is not None else (meta.get("duration") or start)
+        end = max(end, start)
+        total_chars = len(t["text"]) or 1
+        max_chars = MAX_CUE_CHARS
+        if end > start:
+            # Shorten cues for slow speech so each stays on screen briefly
+            chars_per_second = total_chars / (end - start)
+            max_chars = max(16, min(MAX_CUE_CHARS, int(chars_per_second * MAX_CUE_SECONDS)))
+
+        cues = []
+        current = []
+        length = 0
+        for word in words:
+            if current and length + 1 + len(word) > max_chars:
+                cues.append(" ".join(current))
+                current, length = [], 0
+            length += len(word) + (1 if current else 0)
+            current.append(word)
+        cues.append(" ".join(current))
+
+        cursor = start
+        for i, text in enumerate(cues):
+            share = (end - start) * (len(text) + 1) / (total_chars + 1)
+            cue_end = end if i == len(cues) - 1 else cursor + share
+            yield cursor, cue_end, t["speaker"], text, i == 0
+            cursor = cue_end
+
+def render_srt(path: Path, display_name: str, turns: Iterable[Dict[str, Any]], meta: Dict[str, Any]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for index, (start, end, speaker, text, first) in enumerate(iter_cues(turns, meta), 1):
+            label = f"Speaker {speaker}: " if first else ""
+            f.write(f"{index}\n{_clock(start, ',')} --> {_clock(end, ',')}\n{label}{text}\n\n")
+
+def render_vtt(path: Path, display_name: str, turns: Iterable[Dict[str, Any]], meta: Dict[str, Any]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("WEBVTT\n\n")
+        for start, end, speaker, text, _ in iter_cues(turns, meta):
+            text = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+            f.write(f"{_clock(start, '.')} --> {_clock(end, '.')}\n<v Speaker {speaker}>{text}\n\n")
+
+def render_jsonl(path: Path, display_name: str, turns: Iterable[Dict[str, Any]], meta: Dict[str, Any]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for t in turns:
+            f.write(json.dumps({
+                "speaker": t["speaker"],
+                "start": t["start"],
+                "end": t["end"],
+                "text": t["text"],
+                "confidence": t.get("avg_conf"),
+            }, ensure_ascii=False))
+            f.write("\n")
@@ -0,0 +1,98 @@
+"""
+Registry of output formats.
+
+Each format declares its file extension, MIME type, render cost and the
+renderer that produces it from a turn iterator. Renderers are referenced as
+"module:function" strings and imported on first use, so heavy libraries
+(reportlab, python-docx) are only loaded by workers that actually render
+those formats.
+
+Cost is "light" for formats rendered in milliseconds from turns (these are
+also rendered on demand at download time when missing) and "heavy" for
+formats that need page layout.
+"""
+import importlib
+import os
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+from .config import settings
+from .artifacts import strip_encoding
+
+@dataclass(frozen=True)
+class OutputFormat:
+    name: str
+    extension: str
+    media_type: str
+    cost: str  # "light" or "heavy"
+    renderer: Optional[str] = None  # "module:function"; None if produced at transcription only
+    compressed: bool = False  # The file format is already compressed (not worth deflating again)
+
+    def render_function(self) -> Callable:
+        module_name, func_name = self.renderer.split(":")
+        return getattr(importlib.import_module(module_name), func_name)
+
+FORMATS: Dict[str, OutputFormat] = {}
+
+def register(fmt: OutputFormat) -> None:
+    FORMATS[fmt.name] = fmt
+
+register(OutputFormat(
+    "docx", ".docx",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "heavy",
+    "app.converter:render_docx" if settings.DOCX_ENGINE == "python-docx" else "app.docx_writer:render_docx",
+    compressed=True,
+))
+register(OutputFormat("pdf", ".pdf", "application/pdf", "heavy", "app.pdf_render:render_pdf", compressed=True))
+# The plain transcript is written from Deepgram's transcript, not from turns
+register(OutputFormat("txt", ".txt", "text/plain", "light"))
+register(OutputFormat("srt", ".srt", "application/x-subrip", "light", "app.exporters:render_srt"))
+register(OutputFormat("vtt", ".vtt", "text/vtt", "light", "app.exporters:render_vtt"))
+register(OutputFormat("jsonl", ".jsonl", "application/x-ndjson", "light", "app.exporters:render_jsonl"))
+
+def renderable() -> List[str]:
+    """Formats that can be (re-)rendered from a stored transcription"""
+    return [name for name, fmt in FORMATS.items() if fmt.renderer]
+
+def default_formats() -> List[str]:
+    names = [name.strip() for name in settings.DEFAULT_OUTPUT_FORMATS.split(",")]
+    return [name for name in names if name in FORMATS and FORMATS[name].renderer]
+
+def parse_formats(value: Optional[str]) -> List[str]:
+    """
+    Parse a comma-separated list of renderable formats, keeping order and
+    dropping duplicates. Raises ValueError on unknown names.
+    """
+    if not value:
+        return default_formats()
+    names = list(dict.fromkeys(name.strip().lower() for name in value.split(",") if name.strip()))
+    invalid = [name for name in names if name not in renderable()]
+    if invalid or not names:
+        raise ValueError(
+            f"Invalid formats: {', '.join(invalid) or 'none given'}. Choose from {', '.join(renderable())}"
+        )
+    return names
+
+def artifact_path(conversion, name: str) -> Optional[str]:
+    """
+    Where a conversion's artifact for a format lives. Formats with a column
+    on Conversion (docx_path, pdf_path, txt_path) use it; the others sit
+    next to the stored JSON with their own extension.
+    """
+    column = f"{name}_path"
+    if hasattr(conversion, column):
+        return getattr(conversion, column)
+    if not conversion.json_path:
+        return None
+    base, _ = os.path.splitext(strip_encoding(conversion.json_path))
+    return base + FORMATS[name].extension
+
+def conversion_artifacts(conversion) -> Dict[str, str]:
+    """{kind: path} of every file a conversion may own: "audio", "json" and each format"""
+    paths = {"audio": conversion.audio_path, "json": conversion.json_path}
+    paths.update((name, artifact_path(conversion, name)) for name in FORMATS)
+    return {kind: path for kind, path in paths.items() if path}
+
+def conversion_files(conversion) -> List[str]:
+    """Every file a conversion may own: its audio, the JSON and each format's artifact"""
+    return list(dict.fromkeys(conversion_artifacts(conversion).values()))
@@ -0,0 +1,106 @@
+"""
+Password hashing off the event loop.
+
+bcrypt is slow on purpose (roughly 100-300 ms per call), so every hash and
+verify runs on a small dedicated thread pool instead of inline in async
+endpoints. The pool is bounded: once too many calls are waiting, new ones
+are rejected with a 503 so a login burst cannot freeze the rest of the API.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from .config import settings
+
+# min/max rounds pin the cost so hashes made with an older BCRYPT_ROUNDS
+# are reported by needs_update() and transparently upgraded on login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="pwhash",
+)
+_lock = threading.Lock()
+_stats = {
+    "pending": 0,       # submitted but not finished (waiting + running)
+    "running": 0,
+    "completed": 0,
+    "rejected": 0,
+    "rehashed": 0,
+    "wait_seconds_total": 0.0,
+    "run_seconds_total": 0.0,
+    "max_wait_seconds": 0.0,
+}
+
+def _run(fn, args, submitted_at: float):
+    started = time.perf_counter()
+    wait = started - submitted_at
+    with _lock:
+        _stats["running"] += 1
+        _stats["wait_seconds_total"] += wait
+        _stats["max_wait_seconds"] = max(_stats["max_wait_seconds"], wait)
+    try:
+        return fn(*args)
+    finally:
+        with _lock:
+            _stats["running"] -= 1
+            _stats["completed"] += 1
+            _stats["run_seconds_total"] += time.perf_counter() - started
+
+def _finished(future):
+    # Also runs for a job cancelled while still queued (its awaiting request
+    # was cancelled), which never reaches _run
+    with _lock:
+        _stats["pending"] -= 1
+
+async def _submit(fn, *args):
+    with _lock:
+        if _stats["pending"] >= settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_QUEUE:
+            _stats["rejected"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server busy, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        _stats["pending"] += 1
+    try:
+        future = _executor.submit(_run, fn, args, time.perf_counter())
+    except BaseException:
+        _finished(None)
+        raise
+    future.add_done_callback(_finished)
+    return await asyncio.wrap_future(future)
+
+async def hash_password(password: str) -> str:
+    return await _submit(pwd_context.hash, password)
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await _submit(pwd_context.verify, plain_password, hashed_password)
+
+async def verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and, if the stored hash uses outdated cost parameters,
+    return a replacement hash computed in the same executor call.
+    """
+    ok, new_hash = await _submit(pwd_context.verify_and_update, plain_password, hashed_password)
+    if new_hash:
+        with _lock:
+            _stats["rehashed"] += 1
+    return ok, new_hash
+
+def hashing_stats() -> dict:
+    with _lock:
+        stats = dict(_stats)
+    stats["workers"] = settings.PASSWORD_HASH_WORKERS
+    stats["max_queue"] = settings.PASSWORD_HASH_MAX_QUEUE
+    stats["queued"] = max(0, stats["pending"] - stats["running"])
+    return stats
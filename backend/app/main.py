@@ -1,14 +1,21 @@
-from fastapi import FastAPI
+import os
+import asyncio
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy import text
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
-from .database import engine, Base
+from .database import engine, upgrade_schema
 from .routers import auth, conversions, admin
 from .config import settings
+from .storage_gc import start_background_sweeps
+from . import metrics, profiling, query_stats
 from .rate_limiter import limiter
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create database tables and add any new columns; a single query when the
+# schema already matches the models (init_db.py normally ran just before)
+upgrade_schema(engine)
 
 app = FastAPI(title="Speech to PDF API", version="1.0.0")
 
@@ -25,15 +32,77 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Counts the queries each request runs
+app.add_middleware(query_stats.QueryStatsMiddleware)
+
+# Passes requests through unless an admin asks for a profile
+app.add_middleware(profiling.ProfilingMiddleware)
+
+# Outermost, so the time includes every other middleware
+app.add_middleware(metrics.MetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(conversions.router)
 app.include_router(admin.router)
 
+_background_tasks = set()
+
+@app.on_event("startup")
+async def start_background_work():
+    start_background_sweeps()
+    metrics.start_flushing()
+    metrics.start_server()
+    task = asyncio.create_task(metrics.monitor_event_loop())
+    _background_tasks.add(task)
+
+def conversion_queue():
+    """Queue depth straight from the database, so it is right whichever worker answers"""
+    counts = {"pending": 0, "processing": 0}
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT status, COUNT(*) FROM conversions WHERE status IN ('pending', 'processing') GROUP BY status"
+        ))
+        counts.update(dict(rows.all()))
+    for status, count in counts.items():
+        yield "conversions_queued", "gauge", "Conversions waiting or being processed", {"status": status}, count
+
+metrics.register_collector(conversion_queue)
+
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint(request: Request):
+    """Prometheus text exposition for every worker on this machine (token required)"""
+    # This port is public; unauthenticated scrapes go to METRICS_PORT
+    if not settings.METRICS_TOKEN:
+        return PlainTextResponse("Not Found", status_code=404)
+    if request.headers.get("authorization") != f"Bearer {settings.METRICS_TOKEN}":
+        return PlainTextResponse("Unauthorized", status_code=401)
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/")
 def read_root():
     return {"message": "Speech to PDF API", "version": "1.0.0"}
 
 @app.get("/api/health")
 def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+@app.get("/api/ready")
+def readiness_check():
+    """
+    Readiness probe: the database answers and the upload volume is writable.
+    Unlike /api/health this touches the dependencies a request needs.
+    """
+    checks = {}
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        checks["database"] = "ok"
+    except Exception as e:
+        checks["database"] = f"error: {e.__class__.__name__}"
+    checks["storage"] = "ok" if os.access(settings.UPLOAD_DIR, os.W_OK) else "error: not writable"
+    ready = all(value == "ok" for value in checks.values())
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not ready", "checks": checks}
+    )
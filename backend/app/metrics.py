@@ -0,0 +1,447 @@
+"""
+Prometheus-style metrics without a client library.
+
+Metrics live in process memory and are written to a small JSON snapshot per
+process (``METRICS_DIR/<pid>-<instance>.json``) every METRICS_FLUSH_SECONDS, so
+a scrape answered by any uvicorn worker reports the whole machine:
+
+* counters and histograms are summed over every snapshot, including those
+  of workers that have exited (their totals stay; Prometheus treats a drop
+  after a snapshot is pruned as a counter reset);
+* gauges only count live processes and are summed or maxed per metric. The
+  directory is on the persistent volume, so a snapshot is only live if its
+  pid is running *and* is the same process: the instance is the boot id plus
+  the process start time, which a pid reused after a restart does not share.
+
+The pipeline is timed through ``StageTimer``: each stage of a conversion
+(upload, queue wait, Deepgram call, turn building, each render, persisting)
+is observed in ``pipeline_stage_seconds`` and a failure is counted under the
+stage that was running.
+
+Scrapes are served on METRICS_PORT, a listener of its own that is not part
+of the public HTTP service (the first worker to bind it serves it), and on
+the app's ``GET /metrics`` only with METRICS_TOKEN.
+"""
+import asyncio
+import atexit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from .config import settings
+
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+STALE_SNAPSHOT_SECONDS = 24 * 3600  # snapshots of exited workers are pruned after this
+LOOP_LAG_INTERVAL = 0.5
+
+_lock = threading.Lock()
+_registry: Dict[str, "_Metric"] = {}
+_collectors: List[Callable[[], Iterable[Tuple[str, str, str, Dict[str, str], float]]]] = []
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+def _key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.values: Dict[LabelKey, object] = {}
+        _registry[name] = self
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = _key(labels)
+        with _lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+class Gauge(_Metric):
+    """Per-process value; across processes ``mode`` is "sum" or "max" (live ones only)"""
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, mode: str = "sum"):
+        super().__init__(name, help)
+        self.mode = mode
+        self.values[()] = 0.0  # reported as 0 before the first update
+
+    def set(self, value: float, **labels) -> None:
+        with _lock:
+            self.values[_key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = _key(labels)
+        with _lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track(self, **labels) -> Iterator[None]:
+        """Count the duration of a block as in progress"""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...]):
+        super().__init__(name, help)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels) -> None:
+        key = _key(labels)
+        with _lock:
+            # [count per bucket..., count above the last bucket, sum]
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            else:
+                state[len(self.buckets)] += 1
+            state[-1] += value
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+def register_collector(fn: Callable[[], Iterable[Tuple[str, str, str, Dict[str, str], float]]]) -> None:
+    """
+    Add samples computed at scrape time, e.g. from the database. fn yields
+    (name, type, help, labels, value); these are not aggregated across processes.
+    """
+    _collectors.append(fn)
+
+# --- Application metrics ---------------------------------------------------
+
+http_request_seconds = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", HTTP_BUCKETS
+)
+pipeline_stage_seconds = Histogram(
+    "pipeline_stage_seconds", "Time spent in each conversion pipeline stage", STAGE_BUCKETS
+)
+conversion_failures = Counter(
+    "conversion_failures_total", "Failed conversions by the stage that failed and the error type"
+)
+conversions_finished = Counter("conversions_finished_total", "Conversions that finished processing, by status")
+transcriptions_in_flight = Gauge("transcriptions_in_flight", "Deepgram requests currently running")
+conversions_in_flight = Gauge("conversions_in_flight", "Conversions being processed by this machine")
+event_loop_lag = Gauge("event_loop_lag_seconds", "Event loop scheduling delay, worst worker", mode="max")
+
+# --- Pipeline stages -------------------------------------------------------
+
+class StageTimer:
+    """
+    Times the stages of one conversion or re-render. ``current`` names the
+    stage in progress, so a failure can be attributed to it. Every stage is
+    also kept as an event (start offset from ``origin``, duration) for the
+    conversion's trace.
+    """
+
+    def __init__(self, origin: Optional[float] = None):
+        self.origin = origin if origin is not None else time.time()  # epoch seconds
+        self.current: Optional[str] = None
+        self.durations: Dict[str, float] = {}
+        self.events: List[dict] = []
+
+    def record(self, stage: str, seconds: float, start: Optional[float] = None, trace: bool = True, **extra) -> None:
+        """Observe a finished stage; start is its epoch time (default: just now minus seconds)"""
+        self.durations[stage] = self.durations.get(stage, 0.0) + seconds
+        pipeline_stage_seconds.observe(seconds, stage=stage)
+        if trace:
+            start = start if start is not None else time.time() - seconds
+            self.events.append({
+                "stage": stage,
+                "start": round(start - self.origin, 3),
+                "seconds": round(seconds, 3),
+                **extra
+            })
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        previous, self.current = self.current, name
+        start, started = time.time(), time.perf_counter()
+        yield
+        # Not reached on error: current keeps naming the failed stage
+        self.record(name, time.perf_counter() - started, start)
+        self.current = previous
+
+    def timed_iter(self, items: Iterable, counter: List[float]) -> Iterator:
+        """Yield from items, adding the time spent producing them to counter[0]"""
+        iterator = iter(items)
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                counter[0] += time.perf_counter() - started
+                return
+            counter[0] += time.perf_counter() - started
+            yield item
+
+    def failed(self, error: BaseException) -> None:
+        conversion_failures.inc(stage=self.current or "unknown", error=type(error).__name__)
+
+    def trace(self, **fields) -> dict:
+        """Compact record of this run: stage events plus the given fields"""
+        return {"stages": self.events, **fields}
+
+# --- HTTP ------------------------------------------------------------------
+
+class MetricsMiddleware:
+    """Observe every HTTP request under its route template, not its raw path"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        started = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            http_request_seconds.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=f"{status[0] // 100}xx"
+            )
+
+async def monitor_event_loop(interval: float = LOOP_LAG_INTERVAL) -> None:
+    """Measure how late a sleep wakes up; runs for the life of the process"""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        event_loop_lag.set(max(0.0, loop.time() - started - interval))
+
+# --- Multi-process snapshots -----------------------------------------------
+
+def metrics_dir() -> str:
+    return settings.METRICS_DIR or os.path.join(settings.UPLOAD_DIR, "metrics")
+
+def _snapshot() -> dict:
+    with _lock:
+        return {
+            name: [[list(map(list, key)), value if not isinstance(value, list) else list(value)]
+                   for key, value in metric.values.items()]
+            for name, metric in _registry.items()
+        }
+
+def _boot_id() -> str:
+    try:
+        with open("/proc/sys/kernel/random/boot_id") as f:
+            return f.read().strip().replace("-", "")[:12]
+    except OSError:
+        return ""
+
+_BOOT_ID = _boot_id()
+_HAS_PROC = os.path.exists("/proc/self/stat")
+
+def _instance(pid: int) -> Optional[str]:
+    """Boot id and start time of a running process; None if it is not running"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # Fields after the parenthesised command name; starttime is field 22
+    return f"{_BOOT_ID}.{stat.rsplit(')', 1)[1].split()[19]}"
+
+def _snapshot_name(pid: int) -> str:
+    return f"{pid}-{_instance(pid) or ''}.json"
+
+def flush() -> None:
+    """Write this process's metrics where other workers can read them"""
+    directory = metrics_dir()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, _snapshot_name(os.getpid()))
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"pid": os.getpid(), "metrics": _snapshot()}, f)
+    os.replace(tmp_path, path)
+
+def _alive(pid: int, instance: str) -> bool:
+    """Whether the process that wrote a snapshot is still running"""
+    if _HAS_PROC:
+        # A pid reused after a restart belongs to another instance
+        return _instance(pid) == instance
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def _snapshots() -> Iterator[Tuple[bool, dict]]:
+    """(alive, metrics) for this process (from memory) and every other snapshot"""
+    yield True, _snapshot()
+    directory = metrics_dir()
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return
+    own = _snapshot_name(os.getpid())
+    for name in names:
+        stem, ext = os.path.splitext(name)
+        # <pid>.json snapshots predate instances and never count as live
+        pid, _, instance = stem.partition("-")
+        if ext != ".json" or not pid.isdigit() or name == own:
+            continue
+        path = os.path.join(directory, name)
+        alive = _alive(int(pid), instance)
+        try:
+            if not alive and time.time() - os.path.getmtime(path) > STALE_SNAPSHOT_SECONDS:
+                os.remove(path)
+                continue
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        yield alive, data.get("metrics", {})
+
+def _aggregate() -> Dict[str, Dict[LabelKey, object]]:
+    merged: Dict[str, Dict[LabelKey, object]] = {name: {} for name in _registry}
+    for alive, snapshot in _snapshots():
+        for name, samples in snapshot.items():
+            metric = _registry.get(name)
+            if metric is None or (metric.kind == "gauge" and not alive):
+                continue
+            values = merged[name]
+            for key, value in samples:
+                key = tuple(tuple(pair) for pair in key)
+                if metric.kind == "histogram":
+                    if len(value) != len(metric.buckets) + 2:
+                        continue  # written with other buckets
+                    current = values.get(key)
+                    values[key] = value if current is None else [a + b for a, b in zip(current, value)]
+                elif metric.kind == "gauge" and metric.mode == "max":
+                    values[key] = max(values.get(key, value), value)
+                else:
+                    values[key] = values.get(key, 0.0) + value
+    return merged
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(key: Iterable[Tuple[str, str]], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+def render() -> str:
+    """Text exposition format (version 0.0.4) of every metric on this machine"""
+    lines = []
+    for name, values in _aggregate().items():
+        metric = _registry[name]
+        lines.append(f"# HELP {name} {metric.help}")
+        lines.append(f"# TYPE {name} {metric.kind}")
+        for key, value in sorted(values.items()):
+            if metric.kind != "histogram":
+                lines.append(f"{name}{_labels(key)} {_number(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip(metric.buckets + (float("inf"),), value[:-1]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(key, ('le', _number(bound)))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(key)} {_number(value[-1])}")
+            lines.append(f"{name}_count{_labels(key)} {cumulative}")
+    for collector in _collectors:
+        declared = set()
+        for name, kind, help, labels, value in collector():
+            if name not in declared:
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                declared.add(name)
+            lines.append(f"{name}{_labels(_key(labels))} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+_flusher: Optional[threading.Thread] = None
+
+def _flush_forever(interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        try:
+            flush()
+        except OSError:
+            pass
+
+def start_flushing() -> None:
+    """Periodically publish this process's metrics; also on exit"""
+    global _flusher
+    if _flusher is not None and _flusher.is_alive():
+        return
+    _flusher = threading.Thread(
+        target=_flush_forever, args=(settings.METRICS_FLUSH_SECONDS,), name="metrics-flush", daemon=True
+    )
+    _flusher.start()
+    atexit.register(flush)
+
+class _ScrapeHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+_server: Optional[ThreadingHTTPServer] = None
+
+def start_server(port: Optional[int] = None, host: Optional[str] = None) -> Optional[ThreadingHTTPServer]:
+    """
+    Serve /metrics on the internal METRICS_PORT (0 disables it). Other workers
+    on the machine find the port taken and leave it to the first one.
+    """
+    global _server
+    port = settings.METRICS_PORT if port is None else port
+    if _server is not None or port <= 0:
+        return _server
+    try:
+        _server = ThreadingHTTPServer((host or settings.METRICS_HOST, port), _ScrapeHandler)
+    except OSError:
+        return None
+    _server.daemon_threads = True
+    threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+    return _server
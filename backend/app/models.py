@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, Float
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, Text, Boolean, Float, JSON, Index, func
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .database import Base
@@ -16,7 +16,47 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
     
+    # Usage counters, maintained incrementally by app.usage (no aggregate queries)
+    usage_conversions = Column(Integer, default=0)  # Conversions currently stored
+    usage_minutes = Column(Float, default=0.0)  # Minutes transcribed, ever
+    usage_bytes = Column(BigInteger, default=0)  # Bytes stored, all kinds; see UserStorage
+    usage_failures = Column(Integer, default=0)  # Conversions currently stored that failed
+    last_upload_at = Column(DateTime, nullable=True)
+    
     conversions = relationship("Conversion", back_populates="user", cascade="all, delete-orphan")
+    storage = relationship("UserStorage", cascade="all, delete-orphan")
+    
+    # One per sort key of the admin user listing, for keyset pagination
+    __table_args__ = (
+        Index("ix_users_usage_conversions_id", "usage_conversions", "id"),
+        Index("ix_users_usage_minutes_id", "usage_minutes", "id"),
+        Index("ix_users_usage_bytes_id", "usage_bytes", "id"),
+        Index("ix_users_usage_failures_id", "usage_failures", "id"),
+        Index("ix_users_last_upload_at_id", "last_upload_at", "id"),
+        # Admin user search (app.user_search): trigram GIN indexes on Postgres,
+        # plain indexes on the lower-cased value (prefix ranges) elsewhere
+        Index(
+            "ix_users_username_search", func.lower(username).label("username_lower"),
+            postgresql_using="gin", postgresql_ops={"username_lower": "gin_trgm_ops"}
+        ),
+        Index(
+            "ix_users_email_search", func.lower(email).label("email_lower"),
+            postgresql_using="gin", postgresql_ops={"email_lower": "gin_trgm_ops"}
+        ),
+        # Postgres only: GIN cannot return rows in order, so autocomplete reads
+        # prefix matches in order from these ("C": code point order, as the
+        # prefix ranges need; the plain indexes above already are elsewhere)
+        Index("ix_users_username_prefix", func.lower(username).collate("C")).ddl_if(dialect="postgresql"),
+        Index("ix_users_email_prefix", func.lower(email).collate("C")).ddl_if(dialect="postgresql"),
+    )
+
+class UserStorage(Base):
+    """Bytes a user has stored per kind of file (audio, json, txt, docx, pdf...)"""
+    __tablename__ = "user_storage"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    kind = Column(String, primary_key=True)
+    bytes = Column(BigInteger, nullable=False, default=0)
 
 class Conversion(Base):
     __tablename__ = "conversions"
@@ -31,8 +71,11 @@ class Conversion(Base):
     pdf_path = Column(String)
     json_path = Column(String)
     txt_path = Column(String)
+    checksums = Column(JSON)  # {format: SHA-256 of the stored file}, recorded when written; used as ETag
+    sizes = Column(JSON)  # {kind: stored bytes} for the audio, JSON and each artifact; feeds usage counters
     
     duration = Column(Float)
+    estimated_duration = Column(Float)  # Seconds, probed from the container header at upload (or estimated from the size)
     model_used = Column(String)
     language = Column(String)
     
@@ -41,5 +84,20 @@ class Conversion(Base):
     
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = Column(DateTime)  # When processing finished (completed or failed); starts audio retention
+    trace = Column(JSON)  # Processing trace: stage events, bytes in/out, speed; see process_conversion
+    
+    user = relationship("User", back_populates="conversions")
+
+class UsageRollup(Base):
+    """Conversion activity per UTC hour and day, maintained by app.analytics"""
+    __tablename__ = "usage_rollups"
     
-    user = relationship("User", back_populates="conversions")
\ No newline at end of file
+    period = Column(String, primary_key=True)  # "hour" or "day"
+    bucket = Column(DateTime, primary_key=True)  # Start of the hour or day
+    uploads = Column(Integer, nullable=False, default=0)
+    completed = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    minutes = Column(Float, nullable=False, default=0.0)  # Audio minutes transcribed
+    processing_seconds = Column(Float, nullable=False, default=0.0)  # Summed over completed and failed
+    credits = Column(Float, nullable=False, default=0.0)  # Minutes charged to non-admin users
@@ -0,0 +1,119 @@
+"""
+Bounded-memory PDF rendering for transcripts.
+
+``SimpleDocTemplate.build`` expects the whole story as a list, so rendering a
+multi-hour transcript used to parse a ``Paragraph`` for every turn before the
+first page was laid out. Here the story is a ``FlowableStream``: platypus
+pulls flowables from it on demand and the stream builds them from the turn
+iterator one turn at a time, so only the turns on the page being laid out
+are alive. Paragraph styles are built once at import time.
+"""
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List
+from xml.sax.saxutils import escape
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import cm
+from .converter import format_ts, model_name
+
+_styles = getSampleStyleSheet()
+HEADING_STYLE = ParagraphStyle(
+    "Heading",
+    parent=_styles["Title"],
+    fontSize=18,
+    leading=22,
+    alignment=1
+)
+META_STYLE = ParagraphStyle(
+    "Meta",
+    parent=_styles["Italic"],
+    alignment=1,
+    fontSize=10,
+)
+SPEAKER_STYLE = ParagraphStyle(
+    "Speaker",
+    parent=_styles["Heading4"],
+    fontSize=12,
+    spaceBefore=8,
+    spaceAfter=2
+)
+TEXT_STYLE = ParagraphStyle(
+    "Text",
+    parent=_styles["BodyText"],
+    fontSize=11,
+    leading=15,
+    spaceAfter=6
+)
+
+class FlowableStream:
+    """
+    The subset of list behaviour ``BaseDocTemplate.build`` uses on its
+    story (len, indexing, slicing, deletion and insertion at the front),
+    backed by an iterator of flowable groups that is consumed lazily.
+    """
+
+    def __init__(self, groups: Iterable[List[Any]]):
+        self._groups = iter(groups)
+        self._buf: List[Any] = []
+
+    def _fill(self, n: int) -> None:
+        while len(self._buf) < n:
+            group = next(self._groups, None)
+            if group is None:
+                return
+            self._buf.extend(group)
+
+    def _needed(self, key) -> int:
+        if isinstance(key, slice):
+            # Open-ended slices are only used with explicit bounds by platypus
+            return key.stop if key.stop is not None and key.stop >= 0 else len(self._buf)
+        return key + 1 if key >= 0 else len(self._buf)
+
+    def __len__(self) -> int:
+        # Platypus only tests truthiness and reads ahead within this length
+        self._fill(1)
+        return len(self._buf)
+
+    def __getitem__(self, key):
+        self._fill(self._needed(key))
+        return self._buf[key]
+
+    def __setitem__(self, key, value) -> None:
+        self._fill(self._needed(key))
+        self._buf[key] = value
+
+    def __delitem__(self, key) -> None:
+        self._fill(self._needed(key))
+        del self._buf[key]
+
+    def insert(self, index: int, value: Any) -> None:
+        self._buf.insert(index, value)
+
+def _story(audio_name: str, turns: Iterable[Dict[str, Any]], meta: Dict[str, Any]) -> Iterator[List[Any]]:
+    meta_line = (
+        f"Duration: {format_ts(meta.get('duration'))} • Channels: {meta.get('channels') or '—'} "
+        f"• Model: {model_name(meta) or '—'}"
+    )
+    yield [
+        Paragraph(escape(audio_name), HEADING_STYLE),
+        Paragraph(meta_line, META_STYLE),
+        Spacer(1, 12),
+    ]
+    for t in turns:
+        yield [
+            Paragraph(f"Speaker {t['speaker']}  [{format_ts(t['start'])}–{format_ts(t['end'])}]", SPEAKER_STYLE),
+            Paragraph(escape(t["text"]), TEXT_STYLE),
+        ]
+    yield [
+        Spacer(1, 12),
+        Paragraph("Generated by Deepgram + Python", META_STYLE),
+    ]
+
+def _document(pdf_path: Path) -> SimpleDocTemplate:
+    return SimpleDocTemplate(str(pdf_path), pagesize=A4,
+                             leftMargin=2*cm, rightMargin=2*cm,
+                             topMargin=2*cm, bottomMargin=2*cm)
+
+def render_pdf(pdf_path: Path, audio_name: str, turns: Iterable[Dict[str, Any]], meta: Dict[str, Any]) -> None:
+    _document(pdf_path).build(FlowableStream(_story(audio_name, turns, meta)))
@@ -0,0 +1,140 @@
+"""
+On-demand request profiling for admins.
+
+A request sent with ``X-Profile: 1`` (or ``?profile=1``) by an admin runs
+under pyinstrument's sampling profiler. The HTML report is written to
+PROFILES_DIR (default UPLOAD_DIR/profiles) and the response carries its
+link in ``X-Profile-Report``. Background tasks started by the request (the
+conversion after an upload, a re-render) run inside the same ASGI call, so
+the report covers them too and is saved once they finish; until then the
+link answers 404. Work handed to threads (the Deepgram call, rendering)
+shows up as time spent awaiting it.
+
+Other requests only pay for looking at the query string and headers:
+pyinstrument (the ``profiling`` extra) is imported on first use. One
+request is profiled at a time per process; a second one runs normally.
+"""
+import asyncio
+import json
+import os
+import re
+import secrets
+import time
+from typing import List, Optional
+from urllib.parse import parse_qs
+from fastapi import HTTPException
+from .config import settings
+
+REPORT_ID = re.compile(r"^\d{8}T\d{6}-[0-9a-f]{8}$")
+
+_active = False
+
+def profiles_dir() -> str:
+    return settings.PROFILES_DIR or os.path.join(settings.UPLOAD_DIR, "profiles")
+
+def report_path(report_id: str, extension: str = ".html") -> Optional[str]:
+    """Path of a stored report, or None for an invalid id"""
+    if not REPORT_ID.match(report_id):
+        return None
+    return os.path.join(profiles_dir(), report_id + extension)
+
+def _requested(scope) -> bool:
+    query = scope.get("query_string", b"")
+    if b"profile=" in query and parse_qs(query.decode("latin-1")).get("profile", [""])[0] in ("1", "true"):
+        return True
+    return any(name == b"x-profile" and value in (b"1", b"true") for name, value in scope["headers"])
+
+async def _admin(scope):
+    """The requesting user if get_admin_user accepts them, else None"""
+    from . import auth
+    from .database import SessionLocal
+    header = dict(scope["headers"]).get(b"authorization", b"").decode("latin-1")
+    scheme, _, token = header.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    db = SessionLocal()
+    try:
+        user = await auth.get_current_user(token, db)
+        user = await auth.get_current_active_user(user)
+        return await auth.get_admin_user(user)
+    except HTTPException:
+        return None
+    finally:
+        db.close()
+
+def _save(report_id: str, profiler, info: dict) -> None:
+    directory = profiles_dir()
+    os.makedirs(directory, exist_ok=True)
+    with open(report_path(report_id), "w", encoding="utf-8") as f:
+        f.write(profiler.output_html())
+    with open(report_path(report_id, ".json"), "w") as f:
+        json.dump(info, f)
+    # Keep the newest PROFILE_KEEP reports; ids sort by time
+    for old in list_reports()[settings.PROFILE_KEEP:]:
+        for extension in (".html", ".json"):
+            try:
+                os.remove(report_path(old["id"], extension))
+            except OSError:
+                pass
+
+def list_reports() -> List[dict]:
+    """Stored reports, newest first"""
+    try:
+        names = os.listdir(profiles_dir())
+    except FileNotFoundError:
+        return []
+    reports = []
+    for name in sorted(names, reverse=True):
+        report_id, extension = os.path.splitext(name)
+        if extension != ".json" or not REPORT_ID.match(report_id):
+            continue
+        try:
+            with open(report_path(report_id, ".json")) as f:
+                reports.append({"id": report_id, **json.load(f)})
+        except (OSError, ValueError):
+            continue
+    return reports
+
+class ProfilingMiddleware:
+    """Profile requests flagged by an admin; anything else passes straight through"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global _active
+        if scope["type"] != "http" or _active or not _requested(scope):
+            return await self.app(scope, receive, send)
+        admin = await _admin(scope)
+        if admin is None or _active:
+            return await self.app(scope, receive, send)
+
+        from pyinstrument import Profiler
+        report_id = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{secrets.token_hex(4)}"
+        link = f"/api/admin/profiles/{report_id}".encode()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-report", link)]}
+            await send(message)
+
+        _active = True
+        profiler = Profiler(interval=settings.PROFILE_INTERVAL, async_mode="enabled")
+        started = time.time()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            _active = False
+            info = {
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status[0],
+                "seconds": round(time.time() - started, 3),
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(started)),
+                "admin": admin.username,
+            }
+            await asyncio.to_thread(_save, report_id, profiler, info)
@@ -0,0 +1,198 @@
+"""
+SQL statement statistics from SQLAlchemy engine events.
+
+Every statement the engine runs is timed between ``before_cursor_execute``
+and ``after_cursor_execute`` and aggregated under its normalised text
+(placeholders and literals replaced by ``?``, IN lists and multi-row VALUES
+collapsed), so the same query with different arguments is one entry.
+
+* Per statement: count, total, mean and max time.
+* Per request: ``QueryStatsMiddleware`` counts the queries a request runs
+  (including those in threads it awaits) and aggregates them by route
+  template; ``db_queries_per_request`` exports the distribution.
+* Slow queries: statements slower than SLOW_QUERY_MS are printed with the
+  shape of their bound parameters (types, never values) and the last
+  SLOW_QUERY_KEEP are kept for the admin API.
+
+Statistics are per process and start over when it restarts.
+"""
+import re
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional
+from sqlalchemy import event
+from .config import settings
+from .metrics import Histogram
+
+MAX_STATEMENTS = 1000  # distinct statements tracked; the rest are counted as OTHER
+OTHER = "<other statements>"
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+db_queries_per_request = Histogram(
+    "db_queries_per_request", "Database queries run by one HTTP request, by route template", QUERY_BUCKETS
+)
+
+_lock = threading.Lock()
+_statements: Dict[str, List[float]] = {}  # statement -> [count, seconds, max seconds]
+_routes: Dict[str, List[float]] = {}  # route -> [requests, queries, seconds, max queries]
+_slow: deque = deque(maxlen=settings.SLOW_QUERY_KEEP)
+_since = datetime.utcnow()
+# [queries, seconds, scope, open] of the request being served, None outside requests
+_request: ContextVar[Optional[list]] = ContextVar("query_stats_request", default=None)
+
+_PLACEHOLDER = re.compile(r"%\([^)]*\)s|%s|\?|(?<!:):\w+")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ROWS = re.compile(r"(\([^()]*\))(?:\s*,\s*\1)+")
+_SPACE = re.compile(r"\s+")
+
+@lru_cache(maxsize=2048)
+def normalize(statement: str) -> str:
+    """Statement text with values replaced by ?, so that calls with different arguments match"""
+    sql = _STRING.sub("?", statement)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _SPACE.sub(" ", sql).strip()
+    sql = _LIST.sub("(?, ...)", sql)
+    return _ROWS.sub(r"\1, ...", sql)
+
+def parameter_shape(parameters, executemany: bool = False):
+    """Types of the bound parameters, e.g. {"username_1": "str"} or "12 x [int, str]" """
+    if executemany:
+        rows = list(parameters or [])
+        return f"{len(rows)} x {parameter_shape(rows[0]) if rows else '[]'}"
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+def _before(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+def _after(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    key = normalize(statement)
+    request = _request.get()
+    with _lock:
+        if key not in _statements and len(_statements) >= MAX_STATEMENTS:
+            key = OTHER
+        entry = _statements.setdefault(key, [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed
+        entry[2] = max(entry[2], elapsed)
+        if request is not None and request[3]:
+            request[0] += 1
+            request[1] += elapsed
+    if settings.SLOW_QUERY_MS > 0 and elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        route = getattr(request[2].get("route"), "path", None) if request is not None else None
+        slow = {
+            "at": datetime.utcnow().isoformat(),
+            "ms": round(elapsed * 1000, 1),
+            "statement": key,
+            "parameters": parameter_shape(parameters, executemany),
+            "route": route,
+        }
+        _slow.append(slow)
+        print(f"🐢 Slow query ({slow['ms']} ms{', ' + route if route else ''}): {key} -- {slow['parameters']}")
+
+def _failed(context):
+    # after_cursor_execute does not fire for a failed statement
+    started = context.connection.info.get("query_started") if context.connection is not None else None
+    if started:
+        started.pop()
+
+def instrument(engine) -> None:
+    """Time every statement run through engine"""
+    event.listen(engine, "before_cursor_execute", _before)
+    event.listen(engine, "after_cursor_execute", _after)
+    event.listen(engine, "handle_error", _failed)
+
+class QueryStatsMiddleware:
+    """Count the queries each request runs, by route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        request = [0, 0.0, scope, True]
+        token = _request.set(request)
+
+        def finish():
+            # Background tasks run after the response; their queries are not the request's
+            if not request[3]:
+                return
+            request[3] = False
+            route = getattr(scope.get("route"), "path", "unmatched")
+            queries, seconds = request[0], request[1]
+            db_queries_per_request.observe(queries, route=route)
+            with _lock:
+                entry = _routes.setdefault(route, [0, 0, 0.0, 0])
+                entry[0] += 1
+                entry[1] += queries
+                entry[2] += seconds
+                entry[3] = max(entry[3], queries)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finish()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            finish()
+            _request.reset(token)
+
+def stats(sort: str = "total", limit: int = 50) -> dict:
+    """Aggregated statistics for the admin API; sort by total, count, mean or max time"""
+    keys = {
+        "total": lambda e: e[1][1],
+        "count": lambda e: e[1][0],
+        "mean": lambda e: e[1][1] / e[1][0],
+        "max": lambda e: e[1][2],
+    }
+    with _lock:
+        statements = sorted(((k, list(v)) for k, v in _statements.items()), key=keys[sort], reverse=True)
+        routes = sorted(((k, list(v)) for k, v in _routes.items()), key=lambda e: e[1][1], reverse=True)
+        slow = list(_slow)
+    return {
+        "since": _since.isoformat(),
+        "slow_query_ms": settings.SLOW_QUERY_MS,
+        "statements": [
+            {
+                "statement": statement,
+                "count": int(count),
+                "total_ms": round(seconds * 1000, 1),
+                "mean_ms": round(seconds * 1000 / count, 2),
+                "max_ms": round(longest * 1000, 1),
+            }
+            for statement, (count, seconds, longest) in statements[:limit]
+        ],
+        "routes": [
+            {
+                "route": route,
+                "requests": int(requests),
+                "queries_per_request": round(queries / requests, 2),
+                "max_queries": int(most),
+                "db_ms_per_request": round(seconds * 1000 / requests, 2),
+            }
+            for route, (requests, queries, seconds, most) in routes
+        ],
+        "slow_queries": slow[::-1],
+    }
+
+def reset() -> None:
+    global _since
+    with _lock:
+        _statements.clear()
+        _routes.clear()
+        _slow.clear()
+        _since = datetime.utcnow()
@@ -0,0 +1,175 @@
+"""
+SQLite storage backend for the rate limiter.
+
+slowapi's default ``memory://`` storage keeps counters per process, so every
+uvicorn worker enforces its own limit and all counters reset when a machine
+auto-starts. This backend keeps them in a small SQLite file (WAL mode) that
+every worker on the machine shares and that survives restarts, without an
+external service.
+
+Registering the ``sqlite`` scheme with ``limits`` is a side effect of
+importing this module; ``storage_uri`` then follows SQLAlchemy's convention:
+``sqlite:///relative/path.db`` or ``sqlite:////absolute/path.db``.
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+from limits.storage import Storage, MovingWindowSupport
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rl_counters (
+    key TEXT PRIMARY KEY,
+    count INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rl_events (
+    key TEXT NOT NULL,
+    ts REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_rl_events_key_ts ON rl_events (key, ts);
+CREATE INDEX IF NOT EXISTS ix_rl_events_expires_at ON rl_events (expires_at);
+"""
+
+# Expired rows are purged every N writes per process rather than on a timer
+PURGE_EVERY = 1000
+
+class SQLiteStorage(Storage, MovingWindowSupport):
+    """
+    Fixed-window and moving-window (sliding log) rate limit storage on SQLite.
+
+    Each check runs in a ``BEGIN IMMEDIATE`` transaction, so concurrent
+    workers serialise on the database write lock and never over-admit.
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri: Optional[str] = None, wrap_exceptions: bool = False, **options):
+        path = (uri or "sqlite:///ratelimit.db")[len("sqlite:///"):]
+        self.path = path or "ratelimit.db"
+        self.busy_timeout = float(options.get("busy_timeout", 5.0))
+        self._local = threading.local()
+        self._writes = 0
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _write(self, fn):
+        """Run fn(conn, now) inside an immediate transaction."""
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = fn(conn, now)
+            self._writes += 1
+            if self._writes % PURGE_EVERY == 0:
+                conn.execute("DELETE FROM rl_counters WHERE expires_at <= ?", (now,))
+                conn.execute("DELETE FROM rl_events WHERE expires_at <= ?", (now,))
+            conn.execute("COMMIT")
+            return result
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    # Fixed window
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        def op(conn, now):
+            row = conn.execute(
+                "SELECT count, expires_at FROM rl_counters WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                count = amount
+                conn.execute(
+                    "INSERT OR REPLACE INTO rl_counters (key, count, expires_at) VALUES (?, ?, ?)",
+                    (key, count, now + expiry),
+                )
+            else:
+                count = row[0] + amount
+                conn.execute("UPDATE rl_counters SET count = ? WHERE key = ?", (count, key))
+            return count
+        return self._write(op)
+
+    def get(self, key: str) -> int:
+        row = self._conn().execute(
+            "SELECT count FROM rl_counters WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key: str) -> float:
+        now = time.time()
+        row = self._conn().execute(
+            "SELECT expires_at FROM rl_counters WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        return row[0] if row else now
+
+    # Moving window
+
+    def acquire_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+
+        def op(conn, now):
+            conn.execute("DELETE FROM rl_events WHERE key = ? AND ts <= ?", (key, now - expiry))
+            (count,) = conn.execute(
+                "SELECT COUNT(*) FROM rl_events WHERE key = ?", (key,)
+            ).fetchone()
+            if count + amount > limit:
+                return False
+            conn.executemany(
+                "INSERT INTO rl_events (key, ts, expires_at) VALUES (?, ?, ?)",
+                [(key, now, now + expiry)] * amount,
+            )
+            return True
+        return self._write(op)
+
+    def get_moving_window(self, key: str, limit: int, expiry: int) -> Tuple[float, int]:
+        now = time.time()
+        oldest, count = self._conn().execute(
+            "SELECT MIN(ts), COUNT(*) FROM rl_events WHERE key = ? AND ts > ?",
+            (key, now - expiry),
+        ).fetchone()
+        if not count:
+            return now, 0
+        return oldest, count
+
+    # Maintenance
+
+    def check(self) -> bool:
+        try:
+            self._conn().execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> Optional[int]:
+        def op(conn, now):
+            (counters,) = conn.execute("SELECT COUNT(*) FROM rl_counters").fetchone()
+            (events,) = conn.execute("SELECT COUNT(DISTINCT key) FROM rl_events").fetchone()
+            conn.execute("DELETE FROM rl_counters")
+            conn.execute("DELETE FROM rl_events")
+            return counters + events
+        return self._write(op)
+
+    def clear(self, key: str) -> None:
+        def op(conn, now):
+            conn.execute("DELETE FROM rl_counters WHERE key = ?", (key,))
+            conn.execute("DELETE FROM rl_events WHERE key = ?", (key,))
+        self._write(op)
@@ -4,6 +4,8 @@ from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 from fastapi import Request
 import hashlib
+from .config import settings
+from . import rate_limit_storage  # registers the sqlite:// storage scheme
 
 def get_client_identifier(request: Request) -> str:
     """
@@ -29,7 +31,9 @@ def get_client_identifier(request: Request) -> str:
 limiter = Limiter(
     key_func=get_client_identifier,
     default_limits=["200 per hour"],  # Global default limit
-    storage_uri="memory://",  # Use in-memory storage (can be changed to Redis for distributed systems)
+    # Shared across workers: sqlite:///path (default, one machine) or redis://host:port (several machines)
+    storage_uri=settings.RATE_LIMIT_STORAGE_URI,
+    strategy=settings.RATE_LIMIT_STRATEGY,
 )
 
 # Login-specific rate limit decorator
@@ -0,0 +1,66 @@
+"""
+Background removal of conversion files.
+
+Deleting a conversion used to unlink its audio and every artifact inline,
+one ``os.remove`` per file in the request path. Requests now commit the row
+deletion and hand the paths to ``discard``; a single worker thread removes
+them from the storage backend afterwards. Paths still queued when the
+process stops are left behind and picked up later as orphans.
+"""
+import queue
+import threading
+from typing import Iterable, Optional
+from .storage import storage
+
+_queue: "queue.Queue[str]" = queue.Queue()
+_worker: Optional[threading.Thread] = None
+_lock = threading.Lock()
+_stats = {
+    "queued": 0,        # handed over and not processed yet
+    "removed": 0,
+    "bytes_reclaimed": 0,
+    "errors": 0,
+}
+
+def _run():
+    while True:
+        path = _queue.get()
+        try:
+            # Optional artifacts (captions, JSONL) often never existed: 0 bytes
+            size = storage.delete(path)
+            if size:
+                with _lock:
+                    _stats["removed"] += 1
+                    _stats["bytes_reclaimed"] += size
+        except Exception:
+            with _lock:
+                _stats["errors"] += 1
+        finally:
+            with _lock:
+                _stats["queued"] -= 1
+            _queue.task_done()
+
+def discard(paths: Iterable[Optional[str]]) -> int:
+    """Queue files for removal; returns how many were queued"""
+    global _worker
+    count = 0
+    for path in paths:
+        if not path:
+            continue
+        with _lock:
+            _stats["queued"] += 1
+        _queue.put(path)
+        count += 1
+    with _lock:
+        if count and (_worker is None or not _worker.is_alive()):
+            _worker = threading.Thread(target=_run, name="file-reaper", daemon=True)
+            _worker.start()
+    return count
+
+def wait_idle() -> None:
+    """Block until every queued file has been processed"""
+    _queue.join()
+
+def reaper_stats() -> dict:
+    with _lock:
+        return dict(_stats)
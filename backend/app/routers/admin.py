@@ -1,23 +1,164 @@
+import os
+import asyncio
+import base64
+import json
+from datetime import datetime, timedelta, timezone
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi.responses import FileResponse
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional, Tuple
 from ..database import get_db
-from .. import models, schemas, auth
+from .. import models, schemas, auth, analytics, hashing, reaper, storage_gc, usage, user_search, profiling, query_stats, formats as output_formats
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
+def admin_user_response(user: models.User) -> schemas.AdminUser:
+    """User with usage counters read straight from its columns"""
+    response = schemas.AdminUser.model_validate(user)
+    response.usage = schemas.UserUsage(
+        conversions=user.usage_conversions or 0,
+        minutes=round(user.usage_minutes or 0.0, 2),
+        bytes=user.usage_bytes or 0,
+        bytes_by_kind=usage.storage_by_kind(user),
+        failures=user.usage_failures or 0,
+        last_upload_at=user.last_upload_at
+    )
+    return response
+
+# Sort keys of the user listing; each has an index on (column, id)
+USER_SORT_COLUMNS = {
+    "id": None,
+    "conversions": models.User.usage_conversions,
+    "minutes": models.User.usage_minutes,
+    "bytes": models.User.usage_bytes,
+    "failures": models.User.usage_failures,
+    "last_upload": models.User.last_upload_at,
+}
+
+def encode_cursor(value, user_id: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return base64.urlsafe_b64encode(json.dumps([value, user_id]).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[object, int]:
+    try:
+        value, user_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if sort == "last_upload" and value is not None:
+            value = datetime.fromisoformat(value)
+        return value, int(user_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def users_page(query, sort: str, descending: bool, cursor: Optional[str], limit: int) -> Tuple[list, Optional[str]]:
+    """
+    One page of users in (sort column, id) order, users without a value
+    last, continuing after cursor. Each step is a range scan of the
+    (column, id) index: rows with a value first, then those without.
+    """
+    User = models.User
+    column = USER_SORT_COLUMNS[sort]
+    after = decode_cursor(cursor, sort) if cursor else None
+    by_id = User.id.desc() if descending else User.id
+
+    def id_after(last_id):
+        return User.id < last_id if descending else User.id > last_id
+
+    if column is None:
+        if after is not None:
+            query = query.filter(id_after(after[1]))
+        rows = query.order_by(by_id).limit(limit + 1).all()
+    else:
+        rows = []
+        if after is None or after[0] is not None:
+            valued = query.filter(column.isnot(None))
+            if after is not None:
+                value, last_id = after
+                beyond = column < value if descending else column > value
+                valued = valued.filter(or_(beyond, and_(column == value, id_after(last_id))))
+            rows = valued.order_by(column.desc() if descending else column, by_id).limit(limit + 1).all()
+        if len(rows) <= limit:
+            empty = query.filter(column.is_(None))
+            if after is not None and after[0] is None:
+                empty = empty.filter(id_after(after[1]))
+            rows += empty.order_by(by_id).limit(limit + 1 - len(rows)).all()
+
+    if len(rows) <= limit:
+        return rows, None
+    last = rows[limit - 1]
+    value = getattr(last, column.key) if column is not None else None
+    return rows[:limit], encode_cursor(value, last.id)
+
 @router.get("/users", response_model=schemas.UserListResponse)
 async def list_users(
     skip: int = 0,
     limit: int = 100,
+    sort: str = "id",
+    order: str = "asc",
+    cursor: Optional[str] = None,
+    min_conversions: Optional[int] = None,
+    min_minutes: Optional[float] = None,
+    min_failures: Optional[int] = None,
+    active_since: Optional[datetime] = None,
+    inactive_since: Optional[datetime] = None,
+    q: Optional[str] = None,
     current_admin: models.User = Depends(auth.get_admin_user),
     db: Session = Depends(get_db)
 ):
-    """List all users (admin only)"""
-    query = db.query(models.User)
-    total = query.count()
-    users = query.offset(skip).limit(limit).all()
-    return schemas.UserListResponse(users=users, total=total)
+    """
+    List users with their usage (admin only). Sort by id, conversions,
+    minutes, bytes, failures or last_upload; page with the returned
+    next_cursor (skip still works, without the index). q searches
+    usernames and emails like /users/search.
+    """
+    if sort not in USER_SORT_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(USER_SORT_COLUMNS)}")
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be asc or desc")
+    limit = max(1, min(limit, 500))
+    User = models.User
+    query = db.query(User)
+    if min_conversions is not None:
+        query = query.filter(User.usage_conversions >= min_conversions)
+    if min_minutes is not None:
+        query = query.filter(User.usage_minutes >= min_minutes)
+    if min_failures is not None:
+        query = query.filter(User.usage_failures >= min_failures)
+    if active_since is not None:
+        query = query.filter(User.last_upload_at >= active_since)
+    if inactive_since is not None:
+        query = query.filter(or_(User.last_upload_at < inactive_since, User.last_upload_at.is_(None)))
+    if q and q.strip():
+        query = query.filter(user_search.matches(db, q))
+
+    # Counting scans every matching row, so only the first page has a total
+    total = query.count() if cursor is None else None
+    query = query.options(selectinload(User.storage))
+    if skip and cursor is None:
+        column = USER_SORT_COLUMNS[sort]
+        descending = order == "desc"
+        ordering = [User.id.desc() if descending else User.id]
+        if column is not None:
+            ordering = [column.is_(None), column.desc() if descending else column] + ordering
+        users, next_cursor = query.order_by(*ordering).offset(skip).limit(limit).all(), None
+    else:
+        users, next_cursor = users_page(query, sort, order == "desc", cursor, limit)
+    return schemas.UserListResponse(
+        users=[admin_user_response(user) for user in users], total=total, next_cursor=next_cursor
+    )
+
+@router.get("/users/search", response_model=List[schemas.UserInfo])
+async def search_users(
+    q: str,
+    limit: int = 10,
+    current_admin: models.User = Depends(auth.get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Autocomplete users by username or email (admin only). Prefix matches;
+    on Postgres, queries of three characters or more also match inside.
+    """
+    return user_search.autocomplete(db, q, limit)
 
 @router.post("/users", response_model=schemas.UserWithWarning)
 async def create_user(
@@ -42,7 +183,7 @@ async def create_user(
         warning = f"WARNING: Weak password - {error_message}. Password set anyway by admin override."
     
     # Create new user
-    hashed_password = auth.get_password_hash(user.password)
+    hashed_password = await hashing.hash_password(user.password)
     db_user = models.User(
         email=user.email,
         username=user.username,
@@ -114,7 +255,7 @@ async def update_user(
         is_valid, error_message = auth.validate_password_complexity(user_update.password)
         if not is_valid:
             warning = f"WARNING: Weak password - {error_message}. Password set anyway by admin override."
-        user.hashed_password = auth.get_password_hash(user_update.password)
+        user.hashed_password = await hashing.hash_password(user_update.password)
     
     if user_update.is_active is not None:
         user.is_active = user_update.is_active
@@ -166,11 +307,105 @@ async def delete_user(
                 detail="Cannot delete the last admin user"
             )
     
+    # The ORM cascade removes the conversion rows; their files go to the reaper
+    paths = [path for conversion in user.conversions for path in output_formats.conversion_files(conversion)]
     db.delete(user)
     db.commit()
+    reaper.discard(paths)
     
     return {"detail": "User deleted successfully"}
 
+@router.get("/analytics")
+async def get_analytics(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    period: str = "day",
+    current_admin: models.User = Depends(auth.get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Uploads, completions, failures, minutes, credits and average processing
+    time per hour or day (UTC) in [start, end); the last 30 days by default
+    (admin only)
+    """
+    if period not in analytics.PERIODS:
+        raise HTTPException(status_code=400, detail="period must be hour or day")
+    end = _utc(end) if end else datetime.utcnow()
+    start = _utc(start) if start else end - timedelta(days=30)
+    try:
+        return analytics.series(db, start, end, period)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _utc(value: datetime) -> datetime:
+    """Naive UTC, as stored"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+@router.get("/hashing-stats")
+async def get_hashing_stats(
+    current_admin: models.User = Depends(auth.get_admin_user)
+):
+    """Password hashing executor queue metrics (admin only)"""
+    return hashing.hashing_stats()
+
+@router.get("/storage")
+async def get_storage_stats(
+    current_admin: models.User = Depends(auth.get_admin_user)
+):
+    """Last garbage collection sweep and file reaper counters (admin only)"""
+    return {"last_sweep": storage_gc.last_report(), "reaper": reaper.reaper_stats()}
+
+@router.post("/storage/sweep")
+async def sweep_storage(
+    dry_run: bool = True,
+    current_admin: models.User = Depends(auth.get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Expire old audio and remove orphaned files now; a dry run only reports (admin only)"""
+    try:
+        return await asyncio.to_thread(storage_gc.sweep, db, dry_run)
+    except storage_gc.SweepInProgress:
+        raise HTTPException(status_code=409, detail="A storage sweep is already running")
+
+@router.get("/profiles")
+async def list_profiles(
+    current_admin: models.User = Depends(auth.get_admin_user)
+):
+    """Stored request profiles, newest first (admin only)"""
+    return {"profiles": profiling.list_reports()}
+
+@router.get("/profiles/{report_id}")
+async def get_profile(
+    report_id: str,
+    current_admin: models.User = Depends(auth.get_admin_user)
+):
+    """HTML report of a profiled request (admin only)"""
+    path = profiling.report_path(report_id)
+    if path is None or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/html")
+
+@router.get("/sql-stats")
+async def get_sql_stats(
+    sort: str = "total",
+    limit: int = 50,
+    current_admin: models.User = Depends(auth.get_admin_user)
+):
+    """Time per normalised SQL statement, queries per route and recent slow queries (admin only)"""
+    if sort not in ("total", "count", "mean", "max"):
+        raise HTTPException(status_code=400, detail="sort must be one of total, count, mean, max")
+    return query_stats.stats(sort, limit)
+
+@router.delete("/sql-stats")
+async def reset_sql_stats(
+    current_admin: models.User = Depends(auth.get_admin_user)
+):
+    """Start SQL statistics over (admin only)"""
+    query_stats.reset()
+    return {"detail": "SQL statistics reset"}
+
 @router.post("/change-password")
 async def change_password(
     current_password: str,
@@ -180,14 +415,14 @@ async def change_password(
 ):
     """Change own password (any authenticated user)"""
     # Verify current password
-    if not auth.verify_password(current_password, current_user.hashed_password):
+    if not await hashing.verify_password(current_password, current_user.hashed_password):
         raise HTTPException(
             status_code=400,
             detail="Incorrect current password"
         )
     
     # Update password
-    current_user.hashed_password = auth.get_password_hash(new_password)
+    current_user.hashed_password = await hashing.hash_password(new_password)
     db.commit()
     
     return {"detail": "Password changed successfully"}
\ No newline at end of file
@@ -3,7 +3,7 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from datetime import timedelta
 from ..database import get_db
-from .. import models, schemas, auth
+from .. import models, schemas, auth, hashing
 from ..config import settings
 from ..rate_limiter import login_rate_limit
 
@@ -13,8 +13,8 @@ router = APIRouter(prefix="/api/auth", tags=["authentication"])
 
 @router.post("/login", response_model=schemas.Token)
 @login_rate_limit
-def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = auth.authenticate_user(db, form_data.username, form_data.password)
+async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    user = await auth.authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -47,7 +47,7 @@ async def change_password(
     - At least one number
     """
     # Verify current password
-    if not auth.verify_password(password_data.current_password, current_user.hashed_password):
+    if not await hashing.verify_password(password_data.current_password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
@@ -69,7 +69,7 @@ async def change_password(
         )
     
     # Update password
-    current_user.hashed_password = auth.get_password_hash(password_data.new_password)
+    current_user.hashed_password = await hashing.hash_password(password_data.new_password)
     db.commit()
     
     return {"message": "Password changed successfully"}
\ No newline at end of file
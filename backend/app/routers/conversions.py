@@ -1,19 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional
 import os
+import time
 import uuid
+import asyncio
 import aiofiles
+from datetime import datetime, timezone
 from pathlib import Path
 from ..database import get_db
-from .. import models, schemas, auth, converter
+from .. import models, schemas, auth, analytics, converter, audio_probe, artifacts, downloads, metrics, reaper, usage, user_search, zip_stream, formats as output_formats
 from ..config import settings
+from ..storage import storage
 
 router = APIRouter(prefix="/api/conversions", tags=["conversions"])
 
 ALLOWED_EXTENSIONS = {'.wav', '.mp3', '.m4a', '.flac', '.aac', '.ogg', '.opus', '.webm', '.mp4', '.mkv', '.mov'}
 MAX_FILENAME_LENGTH = 100  # Maximum length for filenames (without extension)
+QUEUED_STATUSES = ("pending", "processing")  # Conversions whose minutes are not billed yet
 
 def validate_file(filename: str):
     ext = Path(filename).suffix.lower()
@@ -28,12 +34,172 @@ def truncate_filename(name: str, max_length: int = MAX_FILENAME_LENGTH) -> str:
     # Keep first part and add ellipsis
     return name[:max_length-3] + "..."
 
-async def process_conversion(conversion_id: int, audio_path: str, output_base: str, display_name: str, language: str, user_id: int, db: Session):
+def conversion_response(
+    conversion: models.Conversion,
+    include_user: bool = False,
+    include_trace: bool = False
+) -> schemas.ConversionResponse:
+    response = schemas.ConversionResponse(
+        id=conversion.id,
+        display_name=conversion.display_name,
+        original_filename=conversion.original_filename,
+        status=conversion.status,
+        duration=conversion.duration,
+        model_used=conversion.model_used,
+        language=conversion.language,
+        error_message=conversion.error_message,
+        created_at=conversion.created_at,
+        updated_at=conversion.updated_at,
+        has_docx=storage.available(conversion.docx_path),
+        has_pdf=storage.available(conversion.pdf_path),
+        has_txt=storage.available(conversion.txt_path),
+        versions={fmt: downloads.version(checksum) for fmt, checksum in (conversion.checksums or {}).items()}
+    )
+    # Include user info for admins
+    if include_user and conversion.user:
+        response.user = schemas.UserInfo(
+            id=conversion.user.id,
+            username=conversion.user.username,
+            email=conversion.user.email,
+            credits=conversion.user.credits
+        )
+    if include_trace:
+        response.trace = conversion.trace
+    return response
+
+def record_artifacts(
+    conversion: models.Conversion,
+    paths: Dict[str, str],
+    checksums: Dict[str, str],
+    sizes: Optional[Dict[str, int]] = None
+):
+    """Store rendered paths (for formats with a column), their checksums and sizes"""
+    for fmt, path in paths.items():
+        if hasattr(conversion, f"{fmt}_path"):
+            setattr(conversion, f"{fmt}_path", path)
+    # Reassigned rather than mutated so the JSON column is flagged as changed
+    conversion.checksums = {**(conversion.checksums or {}), **checksums}
+    usage.record_sizes(conversion, sizes or {})
+
+async def render_artifacts(conversion: models.Conversion, formats: List[str], *options) -> Dict[str, str]:
+    """
+    Render formats from the stored transcription in a worker thread, hashing
+    each file while it is still in the page cache, and record them.
+    options are passed on to converter.render_from_json.
+    """
+    json_path, display_name = conversion.json_path, conversion.display_name
+    timer = metrics.StageTimer()
+    
+    def render():
+        paths = converter.render_from_json(json_path, display_name, formats, *options, timer=timer)
+        with timer.stage("persist"):
+            return paths, converter.persist_artifacts(paths)
+    
+    paths, (checksums, sizes) = await asyncio.to_thread(render)
+    record_artifacts(conversion, paths, checksums, sizes)
+    return paths
+
+def owned_conversions(db: Session, user: models.User, ids: List[int]) -> Dict[int, models.Conversion]:
+    """
+    Load several conversions with one access-checked query. Conversions the
+    user may not see are reported as missing, so ids cannot be probed.
+    """
+    query = db.query(models.Conversion).filter(models.Conversion.id.in_(ids))
+    if not user.is_admin:
+        query = query.filter(models.Conversion.user_id == user.id)
+    found = {conversion.id: conversion for conversion in query.all()}
+    missing = [conversion_id for conversion_id in ids if conversion_id not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Conversions not found: {', '.join(map(str, missing))}")
+    return found
+
+def queued_minutes(db: Session, user_id: int) -> float:
+    """Estimated minutes of the user's conversions that are queued or running"""
+    seconds = db.query(
+        func.coalesce(func.sum(models.Conversion.estimated_duration), 0.0)
+    ).filter(
+        models.Conversion.user_id == user_id,
+        models.Conversion.status.in_(QUEUED_STATUSES)
+    ).scalar()
+    return (seconds or 0.0) / 60.0
+
+def admit_conversion(db: Session, user: models.User, conversion: models.Conversion):
+    """
+    Add and commit a pending conversion only if its estimated minutes fit the
+    credits not already reserved by the user's queued conversions. Callers
+    must give files whose duration could not be probed a conservative
+    estimate (see unknown_duration) rather than none. Committed before the
+    upload is written, so the minutes are reserved while it is.
+    """
+    # Lock the user row so concurrent uploads are admitted one at a time (Postgres)
+    user = db.query(models.User).filter(models.User.id == user.id).with_for_update().populate_existing().first()
+    db.add(conversion)
+    # On SQLite the insert takes the database write lock, which serialises
+    # admissions the same way until this one commits or rolls back
+    db.flush()
+    requested = (conversion.estimated_duration or 0.0) / 60.0
+    queued = queued_minutes(db, user.id) - requested
+    available = user.credits - queued
+    if available <= 0 or requested > available:
+        db.rollback()
+        raise HTTPException(
+            status_code=402,
+            detail=(
+                f"Insufficient credits: this file is about {requested:.1f} min, "
+                f"{max(0.0, available):.1f} min available ({queued:.1f} min already queued). "
+                "Please contact administrator to add more credits."
+            )
+        )
+    db.commit()
+
+def unknown_duration(size: int) -> float:
+    """Seconds to reserve for a file that could not be probed: its size at UNKNOWN_DURATION_KBPS"""
+    return size * 8 / (settings.UNKNOWN_DURATION_KBPS * 1000)
+
+def check_storage_quota(user: models.User, upload_size: int):
+    """Reject an upload that would take the user past STORAGE_QUOTA_MB"""
+    quota = settings.STORAGE_QUOTA_MB * 1024 * 1024
+    used = user.usage_bytes or 0
+    if quota > 0 and used + upload_size > quota:
+        raise HTTPException(
+            status_code=413,
+            detail=(
+                f"Storage quota exceeded: {used / 1024 / 1024:.1f} MB of "
+                f"{settings.STORAGE_QUOTA_MB:g} MB used. Delete some conversions to upload more."
+            )
+        )
+
+def conversion_trace(conversion: models.Conversion, timer: metrics.StageTimer, wall_seconds: float) -> dict:
+    """Stage events plus sizes and speed, stored on the conversion for support"""
+    sizes = conversion.sizes or {}
+    trace = timer.trace(
+        started_at=datetime.utcfromtimestamp(timer.origin + timer.events[0]["seconds"]).isoformat(),
+        completed_at=datetime.utcnow().isoformat(),
+        wall_seconds=round(wall_seconds, 3),
+        bytes_in=sizes.get("audio"),
+        bytes_out=sum(size for kind, size in sizes.items() if kind != "audio"),
+        audio_seconds=round(conversion.duration, 3) if conversion.duration else None,
+        # Audio seconds transcribed and rendered per second of processing
+        speed=round(conversion.duration / wall_seconds, 2) if conversion.duration and wall_seconds else None,
+    )
+    if conversion.status == "failed":
+        trace["failed_stage"] = timer.current or "unknown"
+    return trace
+
+async def process_conversion(conversion_id: int, audio_path: str, output_base: str, display_name: str, language: str, user_id: int, db: Session, formats: Optional[List[str]] = None):
     """Background task to process audio conversion"""
     conversion = db.query(models.Conversion).filter(models.Conversion.id == conversion_id).first()
     if not conversion:
         return
     
+    # Trace offsets count from the upload, so queue time is the first stage
+    queued_at = conversion.created_at.replace(tzinfo=timezone.utc).timestamp()
+    timer = metrics.StageTimer(origin=queued_at)
+    start = time.time()
+    timer.record("queue_wait", max(0.0, start - queued_at), queued_at)
+    started = time.perf_counter()
+    charged = 0.0
+    metrics.conversions_in_flight.inc()
     try:
         conversion.status = "processing"
         db.commit()
@@ -43,30 +209,46 @@ async def process_conversion(conversion_id: int, audio_path: str, output_base: s
             output_base_path=output_base,
             display_name=display_name,
             language=language,
-            model="nova-3"  # Always use nova-3
+            model="nova-3",  # Always use nova-3
+            formats=formats,
+            timer=timer
         )
         
         conversion.json_path = result["json_path"]
-        conversion.txt_path = result["txt_path"]
-        conversion.docx_path = result["docx_path"]
-        conversion.pdf_path = result["pdf_path"]
+        record_artifacts(conversion, {"txt": result["txt_path"], **result["paths"]}, result["checksums"], result["sizes"])
         conversion.duration = result["duration"]
         conversion.model_used = result["model_used"]
         conversion.language = result["language"]
         conversion.status = "completed"
+        if conversion.duration:
+            usage.add(db, user_id, minutes=conversion.duration / 60.0)
         
         # Deduct credits after successful transcription (skip for admin users)
         user = db.query(models.User).filter(models.User.id == user_id).first()
         if user and conversion.duration and not user.is_admin:
             # Convert duration from seconds to minutes
             duration_minutes = conversion.duration / 60.0
+            charged = min(duration_minutes, max(0, user.credits))
             user.credits = max(0, user.credits - duration_minutes)
             db.commit()
         
     except Exception as e:
         conversion.status = "failed"
         conversion.error_message = str(e)
-    
+        usage.add(db, user_id, failures=1)
+        timer.failed(e)
+    finally:
+        # Remote backends keep the audio in the bucket, not on the volume
+        await asyncio.to_thread(storage.release, audio_path)
+        metrics.conversions_in_flight.dec()
+    
+    wall_seconds = time.perf_counter() - started
+    timer.record("total", wall_seconds, start, trace=False)
+    metrics.conversions_finished.inc(status=conversion.status)
+    
+    conversion.completed_at = datetime.utcnow()
+    conversion.trace = conversion_trace(conversion, timer, wall_seconds)
+    analytics.conversion_finished(db, conversion, wall_seconds, charged)
     db.commit()
 
 @router.post("/upload", response_model=schemas.ConversionResponse)
@@ -75,9 +257,15 @@ async def upload_audio(
     file: UploadFile = File(...),
     display_name: Optional[str] = Form(None),
     language: Optional[str] = Form(None),
+    formats: Optional[str] = Form(None),  # Comma-separated, e.g. "pdf,srt"
     current_user: models.User = Depends(auth.get_current_active_user),
     db: Session = Depends(get_db)
 ):
+    try:
+        formats = output_formats.parse_formats(formats)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     # Check if user has credits (skip for admin users with unlimited credits)
     if not current_user.is_admin and current_user.credits <= 0:
         raise HTTPException(
@@ -91,29 +279,58 @@ async def upload_audio(
     # Check file size
     if file.size > settings.MAX_FILE_SIZE:
         raise HTTPException(status_code=413, detail="File too large")
+    if not current_user.is_admin:
+        check_storage_quota(current_user, file.size)
+    
+    # Probe duration from the container header; files that cannot be probed
+    # (.webm, .aac, unparsable headers...) reserve a worst-case estimate
+    ext = Path(file.filename).suffix.lower()
+    estimated_duration = audio_probe.probe_duration(file.file, ext)
+    if estimated_duration is None:
+        estimated_duration = unknown_duration(file.size)
     
     # Generate unique filename
     file_id = str(uuid.uuid4())
-    ext = Path(file.filename).suffix.lower()
     audio_filename = f"{file_id}{ext}"
     audio_path = os.path.join(settings.UPLOAD_DIR, "audio", audio_filename)
     
-    # Save uploaded file
-    async with aiofiles.open(audio_path, 'wb') as f:
-        content = await file.read()
-        await f.write(content)
-    
-    # Create conversion record
+    # Create the conversion record first: it reserves the estimated minutes
+    # against the user's credits before anything is awaited
     conversion = models.Conversion(
         user_id=current_user.id,
         original_filename=file.filename,
         display_name=display_name or file.filename,
         audio_path=audio_path,
+        estimated_duration=estimated_duration,
         status="pending",
         language=language,
-        model_used="nova-3"  # Always use nova-3
+        model_used="nova-3",  # Always use nova-3
     )
-    db.add(conversion)
+    if current_user.is_admin:
+        db.add(conversion)
+        db.commit()
+    else:
+        admit_conversion(db, current_user, conversion)
+    
+    # Save uploaded file
+    try:
+        with metrics.pipeline_stage_seconds.time(stage="upload"):
+            async with aiofiles.open(audio_path, 'wb') as f:
+                content = await file.read()
+                await f.write(content)
+            await asyncio.to_thread(storage.persist, audio_path)
+    except BaseException:
+        # Release the reservation
+        db.rollback()
+        db.delete(conversion)
+        db.commit()
+        reaper.discard([audio_path])
+        raise
+    
+    conversion.sizes = {"audio": len(content)}
+    uploaded_at = datetime.utcnow()
+    usage.add(db, current_user.id, {"audio": len(content)}, conversions=1, uploaded_at=uploaded_at)
+    analytics.conversion_uploaded(db, uploaded_at)
     db.commit()
     db.refresh(conversion)
     
@@ -127,24 +344,11 @@ async def upload_audio(
         conversion.display_name,
         language,
         current_user.id,
-        db
+        db,
+        formats
     )
     
-    return schemas.ConversionResponse(
-        id=conversion.id,
-        display_name=conversion.display_name,
-        original_filename=conversion.original_filename,
-        status=conversion.status,
-        duration=conversion.duration,
-        model_used=conversion.model_used,
-        language=conversion.language,
-        error_message=conversion.error_message,
-        created_at=conversion.created_at,
-        updated_at=conversion.updated_at,
-        has_docx=bool(conversion.docx_path),
-        has_pdf=bool(conversion.pdf_path),
-        has_txt=bool(conversion.txt_path)
-    )
+    return conversion_response(conversion)
 
 @router.get("/", response_model=schemas.ConversionListResponse)
 async def list_conversions(
@@ -160,48 +364,175 @@ async def list_conversions(
     # Admins see all conversions (with optional user search), regular users see only their own
     if current_user.is_admin:
         if search_user:
-            # Search by username or email
-            query = query.filter(
-                (models.User.username.ilike(f"%{search_user}%")) | 
-                (models.User.email.ilike(f"%{search_user}%"))
-            )
+            # Search by username or email, through the user search indexes
+            query = query.filter(models.Conversion.user_id.in_(user_search.user_ids(db, search_user)))
     else:
         query = query.filter(models.Conversion.user_id == current_user.id)
     
     total = query.count()
     conversions = query.order_by(models.Conversion.created_at.desc()).offset(skip).limit(limit).all()
     
-    conversion_responses = []
-    for conv in conversions:
-        response_data = {
-            "id": conv.id,
-            "display_name": conv.display_name,
-            "original_filename": conv.original_filename,
-            "status": conv.status,
-            "duration": conv.duration,
-            "model_used": conv.model_used,
-            "language": conv.language,
-            "error_message": conv.error_message,
-            "created_at": conv.created_at,
-            "updated_at": conv.updated_at,
-            "has_docx": bool(conv.docx_path and os.path.exists(conv.docx_path)),
-            "has_pdf": bool(conv.pdf_path and os.path.exists(conv.pdf_path)),
-            "has_txt": bool(conv.txt_path and os.path.exists(conv.txt_path))
-        }
-        
-        # Include user info for admins
-        if current_user.is_admin and conv.user:
-            response_data["user"] = schemas.UserInfo(
-                id=conv.user.id,
-                username=conv.user.username,
-                email=conv.user.email,
-                credits=conv.user.credits
-            )
-        
-        conversion_responses.append(schemas.ConversionResponse(**response_data))
+    conversion_responses = [
+        conversion_response(conv, include_user=current_user.is_admin) for conv in conversions
+    ]
     
     return schemas.ConversionListResponse(conversions=conversion_responses, total=total)
 
+@router.get("/formats")
+async def list_formats(current_user: models.User = Depends(auth.get_current_active_user)):
+    """Output formats that can be requested at upload, re-render or download"""
+    return {
+        "formats": [
+            {"name": fmt.name, "extension": fmt.extension, "media_type": fmt.media_type, "cost": fmt.cost}
+            for fmt in output_formats.FORMATS.values()
+        ],
+        "default": output_formats.default_formats()
+    }
+
+@router.post("/export")
+async def export_conversions(
+    params: schemas.ExportRequest,
+    current_user: models.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Download several conversions as one ZIP, streamed while it is built.
+    Missing light formats are rendered first; other missing files are skipped.
+    """
+    ids = list(dict.fromkeys(params.ids))
+    names = list(dict.fromkeys(name.strip().lower() for name in params.formats))
+    invalid = [name for name in names if name not in output_formats.FORMATS]
+    if not names or invalid:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid formats: {', '.join(invalid) or 'none given'}. Choose from {', '.join(output_formats.FORMATS)}"
+        )
+    
+    found = owned_conversions(db, current_user, ids)
+    
+    entries = []
+    used_names = set()
+    for conversion_id in ids:
+        conversion = found[conversion_id]
+        for name in names:
+            output_format = output_formats.FORMATS[name]
+            path = output_formats.artifact_path(conversion, name)
+            stored_size = await asyncio.to_thread(storage.size, path) if path else None
+            if (
+                stored_size is None
+                and output_format.cost == "light" and output_format.renderer
+                and await asyncio.to_thread(storage.exists, conversion.json_path)
+            ):
+                path = (await render_artifacts(conversion, [name]))[name]
+                stored_size = await asyncio.to_thread(storage.size, path)
+            if stored_size is None:
+                continue
+            
+            base = truncate_filename(conversion.display_name).replace("/", "_").replace("\\", "_")
+            arcname = f"{base}{output_format.extension}"
+            if arcname in used_names:
+                arcname = f"{base} ({conversion.id}){output_format.extension}"
+            used_names.add(arcname)
+            entries.append(zip_stream.ZipEntry(
+                name=arcname,
+                # Bind path now: the archive is written after this handler returns
+                chunks=lambda path=path: artifacts.iter_decompressed(path),
+                mtime=conversion.updated_at.replace(tzinfo=timezone.utc).timestamp(),
+                compress=not output_format.compressed,
+                size=None if artifacts.content_encoding(path) else stored_size
+            ))
+    db.commit()
+    
+    if not entries:
+        raise HTTPException(status_code=404, detail="None of the requested files exist")
+    
+    filename = f"conversions-{datetime.utcnow():%Y%m%d-%H%M%S}.zip"
+    return StreamingResponse(
+        zip_stream.stream_zip(entries),
+        media_type="application/zip",
+        headers={"Content-Disposition": downloads.attachment_header(filename)}
+    )
+
+@router.post("/batch/delete")
+async def batch_delete_conversions(
+    params: schemas.BatchIds,
+    current_user: models.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Delete several conversions in one transaction; files are removed in the background"""
+    ids = list(dict.fromkeys(params.ids))
+    found = owned_conversions(db, current_user, ids)
+    paths = [path for conversion in found.values() for path in output_formats.conversion_files(conversion)]
+    usage.conversions_deleted(db, found.values())
+    db.query(models.Conversion).filter(
+        models.Conversion.id.in_(ids)
+    ).delete(synchronize_session=False)
+    db.commit()
+    
+    reaper.discard(paths)
+    return {"detail": f"{len(ids)} conversion(s) deleted", "deleted": ids}
+
+@router.post("/batch/rename", response_model=schemas.ConversionListResponse)
+async def batch_rename_conversions(
+    params: schemas.BatchRenameRequest,
+    current_user: models.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    names = {item.id: item.display_name for item in params.items}
+    found = owned_conversions(db, current_user, list(names))
+    for conversion_id, display_name in names.items():
+        found[conversion_id].display_name = display_name
+    db.commit()
+    
+    return schemas.ConversionListResponse(
+        conversions=[conversion_response(found[conversion_id]) for conversion_id in names],
+        total=len(names)
+    )
+
+async def rerender_batch(conversion_ids: List[int], formats: List[str], options: tuple, db: Session):
+    """Background task: re-render conversions one after the other"""
+    for conversion_id in conversion_ids:
+        conversion = db.query(models.Conversion).filter(models.Conversion.id == conversion_id).first()
+        # Deleted or re-transcribed since the batch was accepted
+        if not conversion or conversion.status != "completed" or not conversion.json_path:
+            continue
+        try:
+            await render_artifacts(conversion, formats, *options)
+            db.commit()
+        except Exception:
+            db.rollback()
+
+@router.post("/batch/rerender", status_code=202)
+async def batch_rerender_conversions(
+    params: schemas.BatchRerenderRequest,
+    background_tasks: BackgroundTasks,
+    current_user: models.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Queue a re-render of several conversions with the same segmentation
+    options. Conversions without a stored transcription are skipped.
+    """
+    try:
+        formats = output_formats.parse_formats(",".join(params.formats))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    ids = list(dict.fromkeys(params.ids))
+    found = owned_conversions(db, current_user, ids)
+    accepted = [
+        conversion_id for conversion_id in ids
+        if found[conversion_id].status == "completed" and found[conversion_id].json_path
+    ]
+    background_tasks.add_task(
+        rerender_batch,
+        accepted,
+        formats,
+        (params.pause_break, params.min_turn_duration, params.speaker_map),
+        db
+    )
+    return {"accepted": accepted, "skipped": [conversion_id for conversion_id in ids if conversion_id not in accepted]}
+
 @router.get("/{conversion_id}", response_model=schemas.ConversionResponse)
 async def get_conversion(
     conversion_id: int,
@@ -219,21 +550,8 @@ async def get_conversion(
     if conversion.user_id != current_user.id and not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    return schemas.ConversionResponse(
-        id=conversion.id,
-        display_name=conversion.display_name,
-        original_filename=conversion.original_filename,
-        status=conversion.status,
-        duration=conversion.duration,
-        model_used=conversion.model_used,
-        language=conversion.language,
-        error_message=conversion.error_message,
-        created_at=conversion.created_at,
-        updated_at=conversion.updated_at,
-        has_docx=bool(conversion.docx_path and os.path.exists(conversion.docx_path)),
-        has_pdf=bool(conversion.pdf_path and os.path.exists(conversion.pdf_path)),
-        has_txt=bool(conversion.txt_path and os.path.exists(conversion.txt_path))
-    )
+    # The processing trace is for support: admins only
+    return conversion_response(conversion, include_trace=current_user.is_admin)
 
 @router.patch("/{conversion_id}", response_model=schemas.ConversionResponse)
 async def update_conversion(
@@ -257,21 +575,7 @@ async def update_conversion(
     db.commit()
     db.refresh(conversion)
     
-    return schemas.ConversionResponse(
-        id=conversion.id,
-        display_name=conversion.display_name,
-        original_filename=conversion.original_filename,
-        status=conversion.status,
-        duration=conversion.duration,
-        model_used=conversion.model_used,
-        language=conversion.language,
-        error_message=conversion.error_message,
-        created_at=conversion.created_at,
-        updated_at=conversion.updated_at,
-        has_docx=bool(conversion.docx_path and os.path.exists(conversion.docx_path)),
-        has_pdf=bool(conversion.pdf_path and os.path.exists(conversion.pdf_path)),
-        has_txt=bool(conversion.txt_path and os.path.exists(conversion.txt_path))
-    )
+    return conversion_response(conversion)
 
 @router.delete("/{conversion_id}")
 async def delete_conversion(
@@ -290,28 +594,69 @@ async def delete_conversion(
     if conversion.user_id != current_user.id and not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    # Delete files
-    for path_attr in ['audio_path', 'json_path', 'txt_path', 'docx_path', 'pdf_path']:
-        path = getattr(conversion, path_attr)
-        if path and os.path.exists(path):
-            try:
-                os.remove(path)
-            except Exception:
-                pass
-    
+    paths = output_formats.conversion_files(conversion)
+    usage.conversions_deleted(db, [conversion])
     db.delete(conversion)
     db.commit()
     
+    # Files are removed in the background once the row is gone
+    reaper.discard(paths)
+    
     return {"detail": "Conversion deleted successfully"}
 
+@router.post("/{conversion_id}/rerender", response_model=schemas.ConversionResponse)
+async def rerender_conversion(
+    conversion_id: int,
+    params: schemas.RerenderRequest,
+    current_user: models.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Regenerate documents from the stored transcription with different turn
+    segmentation. No new transcription is made, so no credits are used.
+    """
+    try:
+        formats = output_formats.parse_formats(",".join(params.formats))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    conversion = db.query(models.Conversion).filter(
+        models.Conversion.id == conversion_id
+    ).first()
+    
+    if not conversion:
+        raise HTTPException(status_code=404, detail="Conversion not found")
+    
+    # Check access rights: user must be the owner or an admin
+    if conversion.user_id != current_user.id and not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    if conversion.status != "completed" or not await asyncio.to_thread(storage.exists, conversion.json_path):
+        raise HTTPException(status_code=409, detail="Transcription is not available for this conversion")
+    
+    await render_artifacts(
+        conversion,
+        formats,
+        params.pause_break,
+        params.min_turn_duration,
+        params.speaker_map
+    )
+    db.commit()
+    db.refresh(conversion)
+    
+    return conversion_response(conversion)
+
 @router.get("/{conversion_id}/download/{file_type}")
 async def download_file(
     conversion_id: int,
     file_type: str,
+    request: Request,
+    v: Optional[str] = None,  # Artifact version from ConversionResponse.versions
     current_user: models.User = Depends(auth.get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    if file_type not in ["docx", "pdf", "txt"]:
+    output_format = output_formats.FORMATS.get(file_type)
+    if output_format is None:
         raise HTTPException(status_code=400, detail="Invalid file type")
     
     # First try to find the conversion
@@ -329,28 +674,56 @@ async def download_file(
             detail="Access denied. You can only download your own files."
         )
     
-    file_path = None
-    media_type = None
-    filename = None
-    
-    if file_type == "docx":
-        file_path = conversion.docx_path
-        media_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-        filename = f"{truncate_filename(conversion.display_name)}.docx"
-    elif file_type == "pdf":
-        file_path = conversion.pdf_path
-        media_type = "application/pdf"
-        filename = f"{truncate_filename(conversion.display_name)}.pdf"
-    elif file_type == "txt":
-        file_path = conversion.txt_path
-        media_type = "text/plain"
-        filename = f"{truncate_filename(conversion.display_name)}.txt"
-    
-    if not file_path or not os.path.exists(file_path):
+    file_path = output_formats.artifact_path(conversion, file_type)
+    
+    # Light formats that were not requested at upload are rendered on first
+    # download from the stored transcription
+    exists = await asyncio.to_thread(storage.exists, file_path)
+    if (
+        not exists
+        and output_format.cost == "light" and output_format.renderer
+        and await asyncio.to_thread(storage.exists, conversion.json_path)
+    ):
+        file_path = (await render_artifacts(conversion, [file_type]))[file_type]
+        exists = True
+        db.commit()
+    
+    if not exists:
         raise HTTPException(status_code=404, detail=f"{file_type.upper()} file not found")
     
-    return FileResponse(
-        path=file_path,
-        media_type=media_type,
-        filename=filename
-    )
\ No newline at end of file
+    checksum = (conversion.checksums or {}).get(file_type)
+    if checksum is None:
+        # Artifact written before checksums were recorded: hash it once
+        checksum = await asyncio.to_thread(artifacts.file_checksum, file_path)
+        record_artifacts(conversion, {}, {file_type: checksum})
+        db.commit()
+    
+    version = downloads.version(checksum)
+    cache_control = downloads.IMMUTABLE if v == version else downloads.REVALIDATE
+    filename = f"{truncate_filename(conversion.display_name)}{output_format.extension}"
+    encoding = artifacts.content_encoding(file_path)
+    accepted = encoding is None or artifacts.accepts_encoding(request.headers.get("accept-encoding", ""), encoding)
+    
+    # Object stores serve the bytes themselves through a short-lived URL
+    url = storage.presigned_url(file_path, filename, output_format.media_type) if accepted else None
+    if url is not None:
+        return downloads.redirect_response(request, url, f'"{version}"')
+    
+    if encoding is None:
+        return downloads.artifact_response(
+            request, file_path, output_format.media_type, filename, f'"{version}"', cache_control
+        )
+    
+    # Compressed artifacts go out as stored when the client can decode them,
+    # otherwise they are decompressed chunk by chunk (a separate representation
+    # with its own ETag)
+    vary = {"Vary": "Accept-Encoding"}
+    if accepted:
+        return downloads.artifact_response(
+            request, file_path, output_format.media_type, filename, f'"{version}"', cache_control,
+            headers={"Content-Encoding": encoding, **vary}
+        )
+    return downloads.artifact_response(
+        request, None, output_format.media_type, filename, f'"{version}-identity"', cache_control,
+        headers=vary, body=artifacts.iter_decompressed(file_path)
+    )
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, Field
+from typing import Any, Optional, List, Dict
 from datetime import datetime
 
 class UserCreate(BaseModel):
@@ -37,9 +37,21 @@ class User(BaseModel):
 class UserWithWarning(User):
     warning: Optional[str] = None
 
+class UserUsage(BaseModel):
+    conversions: int = 0  # Currently stored
+    minutes: float = 0.0  # Transcribed, ever
+    bytes: int = 0  # Stored, all kinds
+    bytes_by_kind: Dict[str, int] = {}  # audio, json, txt, docx, pdf, ...
+    failures: int = 0  # Currently stored conversions that failed
+    last_upload_at: Optional[datetime] = None
+
+class AdminUser(User):
+    usage: UserUsage = UserUsage()
+
 class UserListResponse(BaseModel):
-    users: List[User]
-    total: int
+    users: List[AdminUser]
+    total: Optional[int] = None  # First page only
+    next_cursor: Optional[str] = None  # Pass as cursor for the next page; None on the last one
 
 class Token(BaseModel):
     access_token: str
@@ -63,6 +75,29 @@ class ConversionCreate(BaseModel):
 class ConversionUpdate(BaseModel):
     display_name: str
 
+class RerenderRequest(BaseModel):
+    formats: List[str] = ["docx", "pdf"]
+    pause_break: float = Field(1.2, ge=0.0, le=60.0)  # Seconds of silence that start a new turn
+    min_turn_duration: float = Field(0.0, ge=0.0, le=60.0)  # Shorter turns are folded into the previous one
+    speaker_map: Optional[Dict[int, int]] = None  # e.g. {2: 0} merges speaker 2 into speaker 0
+
+class BatchIds(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+class BatchRenameItem(BaseModel):
+    id: int
+    display_name: str
+
+class BatchRenameRequest(BaseModel):
+    items: List[BatchRenameItem] = Field(..., min_length=1, max_length=1000)
+
+class BatchRerenderRequest(RerenderRequest):
+    ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+class ExportRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=500)  # Conversions to bundle, in archive order
+    formats: List[str] = ["pdf"]
+
 class UserInfo(BaseModel):
     id: int
     username: str
@@ -86,7 +121,9 @@ class ConversionResponse(BaseModel):
     has_docx: bool = False
     has_pdf: bool = False
     has_txt: bool = False
+    versions: Dict[str, str] = {}  # {format: version}; pass as ?v= to download for an immutable response
     user: Optional[UserInfo] = None  # Include user info for admins
+    trace: Optional[Dict[str, Any]] = None  # Processing trace, admins only
     
     class Config:
         from_attributes = True
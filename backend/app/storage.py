@@ -0,0 +1,196 @@
+"""
+Storage backends for audio and artifacts.
+
+Conversions keep referring to files by their path under UPLOAD_DIR; the
+backend decides where that path durably lives:
+
+* ``LocalStorage`` - the file itself, as before (single machine, one volume).
+* ``S3Storage`` - an object in an S3-compatible bucket, keyed by the path
+  relative to UPLOAD_DIR. Files are still written locally first (renderers
+  and zipfile need a real file) and then persisted and released, so
+  UPLOAD_DIR only holds scratch copies. Downloads redirect to presigned URLs.
+
+Reads go through ``open`` and stream from whichever copy exists, so callers
+never need to know which backend is active. Use the module-level
+``storage`` instance.
+"""
+import mimetypes
+import os
+from typing import IO, Iterator, Optional, Tuple
+from .config import settings
+
+_mimetypes = mimetypes.MimeTypes()
+_mimetypes.encodings_map[".zst"] = "zstd"
+for _ext, _type in ((".srt", "application/x-subrip"), (".vtt", "text/vtt"), (".jsonl", "application/x-ndjson"),
+                    (".docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document")):
+    _mimetypes.add_type(_type, _ext)
+
+class LocalStorage:
+    """Files stay where they were written"""
+    name = "local"
+
+    def open(self, path: str) -> IO[bytes]:
+        """Binary file object streaming the stored bytes"""
+        return open(path, "rb")
+
+    def exists(self, path: Optional[str]) -> bool:
+        return bool(path) and os.path.exists(path)
+
+    def available(self, path: Optional[str]) -> bool:
+        """Cheap check for listings"""
+        return self.exists(path)
+
+    def size(self, path: str) -> Optional[int]:
+        """Size in bytes, or None if the file does not exist"""
+        try:
+            return os.path.getsize(path)
+        except FileNotFoundError:
+            return None
+
+    def persist(self, path: str) -> None:
+        """Make a file just written at path durable"""
+
+    def release(self, path: str) -> None:
+        """Drop the local copy of a persisted file when it lives elsewhere"""
+
+    def fetch(self, path: str) -> str:
+        """Make sure a local copy exists and return its path"""
+        return path
+
+    def delete(self, path: str) -> int:
+        """Remove a file; returns the bytes reclaimed (0 if it was already gone)"""
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return 0
+        return size
+
+    def presigned_url(self, path: str, filename: str, media_type: str) -> Optional[str]:
+        """Direct download URL, or None when the app must serve the file itself"""
+        return None
+
+    def iter_files(self, directory: str) -> Iterator[Tuple[str, int, float]]:
+        """(path, size, mtime) of every stored file below a directory"""
+        for parent, _, names in os.walk(directory):
+            for name in names:
+                path = os.path.join(parent, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+
+class S3Storage(LocalStorage):
+    """Objects in an S3-compatible bucket; UPLOAD_DIR holds scratch copies"""
+    name = "s3"
+
+    def __init__(self):
+        try:
+            import boto3
+            from botocore.config import Config
+        except ImportError:
+            raise RuntimeError("STORAGE_BACKEND=s3 needs the 's3' extra: pip install boto3")
+        if not settings.S3_BUCKET:
+            raise RuntimeError("STORAGE_BACKEND=s3 needs S3_BUCKET")
+        self.bucket = settings.S3_BUCKET
+        self.prefix = settings.S3_PREFIX
+        self.root = os.path.abspath(settings.UPLOAD_DIR)
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region_name=settings.S3_REGION,
+            aws_access_key_id=settings.S3_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+            config=Config(signature_version="s3v4", retries={"max_attempts": 5, "mode": "standard"}),
+        )
+
+    def key(self, path: str) -> str:
+        relative = os.path.relpath(os.path.abspath(path), self.root)
+        if relative.startswith(".."):
+            raise ValueError(f"{path} is outside UPLOAD_DIR")
+        return self.prefix + relative.replace(os.sep, "/")
+
+    def _missing(self, error) -> bool:
+        return error.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound")
+
+    def open(self, path: str) -> IO[bytes]:
+        # A scratch copy is still around right after rendering or upload
+        if os.path.exists(path):
+            return open(path, "rb")
+        return self.client.get_object(Bucket=self.bucket, Key=self.key(path))["Body"]
+
+    def exists(self, path: Optional[str]) -> bool:
+        return bool(path) and self.size(path) is not None
+
+    def available(self, path: Optional[str]) -> bool:
+        # Paths are recorded only after a successful upload: no request needed
+        return bool(path)
+
+    def size(self, path: str) -> Optional[int]:
+        from botocore.exceptions import ClientError
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self.key(path))["ContentLength"]
+        except ClientError as e:
+            if self._missing(e):
+                return None
+            raise
+
+    def persist(self, path: str) -> None:
+        content_type, encoding = _mimetypes.guess_type(path)
+        extra = {"ContentType": content_type or "application/octet-stream"}
+        if encoding:
+            extra["ContentEncoding"] = encoding
+        self.client.upload_file(path, self.bucket, self.key(path), ExtraArgs=extra)
+
+    def release(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def fetch(self, path: str) -> str:
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.client.download_file(self.bucket, self.key(path), path)
+        return path
+
+    def delete(self, path: str) -> int:
+        self.release(path)
+        size = self.size(path)
+        if size is None:
+            return 0
+        self.client.delete_object(Bucket=self.bucket, Key=self.key(path))
+        return size
+
+    def presigned_url(self, path: str, filename: str, media_type: str) -> Optional[str]:
+        # Same header encoding as downloads.attachment_header
+        from .downloads import attachment_header
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={
+                "Bucket": self.bucket,
+                "Key": self.key(path),
+                "ResponseContentDisposition": attachment_header(filename),
+                "ResponseContentType": media_type,
+            },
+            ExpiresIn=settings.PRESIGNED_URL_EXPIRES,
+        )
+
+    def iter_files(self, directory: str) -> Iterator[Tuple[str, int, float]]:
+        prefix = self.key(directory).rstrip("/") + "/"
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for item in page.get("Contents", []):
+                relative = item["Key"][len(self.prefix):]
+                yield os.path.join(self.root, *relative.split("/")), item["Size"], item["LastModified"].timestamp()
+
+BACKENDS = {"local": LocalStorage, "s3": S3Storage}
+
+def get_storage(name: Optional[str] = None) -> LocalStorage:
+    name = name or settings.STORAGE_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown storage backend: {name}")
+    return BACKENDS[name]()
+
+storage = get_storage()
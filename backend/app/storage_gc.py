@@ -0,0 +1,169 @@
+"""
+Storage garbage collection.
+
+Two things used to make the upload volume grow without bound: source audio
+was kept forever after transcription, and files could outlive their rows
+(deleted users, crashes between writing a file and recording it, the
+never-used ``uploads/pdfs`` directory). A sweep fixes both:
+
+* retention - audio of conversions that finished more than
+  AUDIO_RETENTION_DAYS ago (off unless set) is deleted and ``audio_path``
+  cleared;
+* orphans - files under ``audio/``, ``docs/`` and ``pdfs/`` that no
+  conversion refers to are deleted once older than ORPHAN_GRACE_HOURS, so
+  uploads and renders still in flight are left alone.
+
+Sweeps run on a background thread every STORAGE_GC_INTERVAL_HOURS, from the
+admin API, or from ``gc_storage.py``. Only one runs at a time per process;
+sweeps in other processes may overlap, so each expired row is claimed with
+a conditional update before its file is deleted and its usage adjusted.
+"""
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Set
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from . import models, usage
+from .config import settings
+from .formats import conversion_files
+from .storage import storage
+
+DIRECTORIES = ("audio", "docs", "pdfs")
+BATCH_SIZE = 500
+STARTUP_DELAY = 60  # seconds before the first background sweep
+
+_lock = threading.Lock()
+_worker: Optional[threading.Thread] = None
+_last_report: Optional[dict] = None
+
+class SweepInProgress(Exception):
+    pass
+
+def _referenced_paths(db: Session) -> Set[str]:
+    columns = (
+        models.Conversion.audio_path, models.Conversion.json_path, models.Conversion.txt_path,
+        models.Conversion.docx_path, models.Conversion.pdf_path
+    )
+    referenced = set()
+    for row in db.query(*columns).yield_per(BATCH_SIZE):
+        referenced.update(os.path.abspath(path) for path in conversion_files(row))
+    return referenced
+
+def expire_audio(db: Session, report: dict, now: datetime, dry_run: bool = False) -> None:
+    """Delete source audio past its retention period and clear audio_path"""
+    if settings.AUDIO_RETENTION_DAYS <= 0:
+        return
+    cutoff = now - timedelta(days=settings.AUDIO_RETENTION_DAYS)
+    # Rows finished before completed_at existed fall back to updated_at
+    Conversion = models.Conversion
+    query = db.query(Conversion.id, Conversion.audio_path).filter(
+        Conversion.status.in_(("completed", "failed")),
+        Conversion.audio_path.isnot(None),
+        func.coalesce(Conversion.completed_at, Conversion.updated_at) < cutoff
+    ).order_by(Conversion.id)
+    last_id = 0
+    while True:
+        batch = query.filter(Conversion.id > last_id).limit(BATCH_SIZE).all()
+        if not batch:
+            return
+        for conversion_id, path in batch:
+            last_id = conversion_id
+            if dry_run:
+                size = storage.size(path) or 0
+            else:
+                # Claim the row: a sweep in another process that read it too
+                # updates nothing, and leaves the file and usage alone
+                claimed = db.query(Conversion).filter(
+                    Conversion.id == conversion_id, Conversion.audio_path == path
+                ).update({Conversion.audio_path: None}, synchronize_session=False)
+                if claimed != 1:
+                    db.rollback()
+                    continue
+                try:
+                    size = storage.delete(path)
+                except Exception:
+                    db.rollback()
+                    report["errors"] += 1
+                    continue
+                usage.forget_sizes(db.get(Conversion, conversion_id), ["audio"])
+                db.commit()
+            report["expired_audio"] += 1
+            report["bytes_reclaimed"] += size
+
+def remove_orphans(db: Session, report: dict, now: datetime, dry_run: bool = False) -> None:
+    """Delete stored files that no conversion refers to"""
+    referenced = _referenced_paths(db)
+    cutoff = now.replace(tzinfo=timezone.utc).timestamp() - settings.ORPHAN_GRACE_HOURS * 3600
+    for directory in DIRECTORIES:
+        for path, size, mtime in storage.iter_files(os.path.join(settings.UPLOAD_DIR, directory)):
+            if os.path.abspath(path) in referenced or mtime > cutoff:
+                continue
+            if not dry_run:
+                try:
+                    size = storage.delete(path)
+                except Exception:
+                    report["errors"] += 1
+                    continue
+            report["orphans"] += 1
+            report["bytes_reclaimed"] += size
+
+def sweep(db: Session, dry_run: bool = False, now: Optional[datetime] = None) -> dict:
+    """
+    Run one garbage collection pass and return its report. Raises
+    SweepInProgress when another sweep is running in this process.
+    """
+    global _last_report
+    if not _lock.acquire(blocking=False):
+        raise SweepInProgress()
+    try:
+        now = now or datetime.utcnow()
+        report = {
+            "started_at": now.isoformat(),
+            "dry_run": dry_run,
+            "expired_audio": 0,
+            "orphans": 0,
+            "bytes_reclaimed": 0,  # would be reclaimed, for a dry run
+            "errors": 0,
+        }
+        started = time.perf_counter()
+        expire_audio(db, report, now, dry_run)
+        remove_orphans(db, report, now, dry_run)
+        report["seconds"] = round(time.perf_counter() - started, 3)
+        if not dry_run:
+            _last_report = report
+        return report
+    finally:
+        _lock.release()
+
+def last_report() -> Optional[dict]:
+    """Report of the last completed (non dry-run) sweep in this process"""
+    return _last_report
+
+def _run(interval: float):
+    from .database import SessionLocal
+    time.sleep(STARTUP_DELAY)
+    while True:
+        db = SessionLocal()
+        try:
+            report = sweep(db)
+            print(f"🧹 Storage sweep: {report['expired_audio']} audio file(s) expired, "
+                  f"{report['orphans']} orphan(s), {report['bytes_reclaimed'] / 1024 / 1024:.1f} MB reclaimed")
+        except SweepInProgress:
+            pass
+        except Exception as e:
+            print(f"❌ Storage sweep failed: {e}")
+        finally:
+            db.close()
+        time.sleep(interval)
+
+def start_background_sweeps() -> None:
+    """Start the periodic sweep thread unless disabled or already running"""
+    global _worker
+    if settings.STORAGE_GC_INTERVAL_HOURS <= 0 or (_worker is not None and _worker.is_alive()):
+        return
+    _worker = threading.Thread(
+        target=_run, args=(settings.STORAGE_GC_INTERVAL_HOURS * 3600,), name="storage-gc", daemon=True
+    )
+    _worker.start()
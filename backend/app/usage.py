@@ -0,0 +1,145 @@
+"""
+Per-user usage accounting.
+
+Each conversion records the stored size of its files in ``Conversion.sizes``
+({kind: bytes}, kinds being "audio", "json" and the format names). Whenever
+a file is written, replaced or removed the difference is applied to the
+owner's counters with single-row ``UPDATE ... SET x = x + delta`` statements:
+
+* ``User.usage_bytes``, ``usage_conversions`` and ``usage_minutes``;
+* ``UserStorage`` rows, one per (user, kind).
+
+Uploads also set ``User.last_upload_at`` and failed conversions count in
+``usage_failures``. Reading usage (admin listing, sorted and filtered on
+these columns, quota checks at upload) is then a plain column read.
+
+Nothing here commits: changes land in the caller's transaction together
+with the row changes they account for. ``rebuild`` recomputes everything
+from the files, for databases that predate the counters.
+"""
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, object_session
+from . import models
+from .formats import conversion_artifacts
+from .storage import storage
+
+def add(
+    db: Session,
+    user_id: int,
+    sizes: Optional[Dict[str, int]] = None,
+    conversions: int = 0,
+    minutes: float = 0.0,
+    failures: int = 0,
+    uploaded_at: Optional[datetime] = None,
+) -> None:
+    """
+    Apply deltas to a user's counters: bytes per kind, conversion count,
+    minutes, failed conversions; uploaded_at sets the last upload time
+    """
+    sizes = {kind: delta for kind, delta in (sizes or {}).items() if delta}
+    total = sum(sizes.values())
+    if not (total or sizes or conversions or minutes or failures or uploaded_at):
+        return
+    User = models.User
+    values = {
+        User.usage_bytes: func.coalesce(User.usage_bytes, 0) + total,
+        User.usage_conversions: func.coalesce(User.usage_conversions, 0) + conversions,
+        User.usage_minutes: func.coalesce(User.usage_minutes, 0.0) + minutes,
+        User.usage_failures: func.coalesce(User.usage_failures, 0) + failures,
+    }
+    if uploaded_at is not None:
+        values[User.last_upload_at] = uploaded_at
+    db.query(User).filter(User.id == user_id).update(values, synchronize_session=False)
+    for kind, delta in sizes.items():
+        _add_kind(db, user_id, kind, delta)
+
+def _add_kind(db: Session, user_id: int, kind: str, delta: int) -> None:
+    UserStorage = models.UserStorage
+    row = db.query(UserStorage).filter(UserStorage.user_id == user_id, UserStorage.kind == kind)
+    if row.update({UserStorage.bytes: UserStorage.bytes + delta}, synchronize_session=False):
+        return
+    try:
+        # First file of this kind; a concurrent insert makes the update apply
+        with db.begin_nested():
+            db.add(UserStorage(user_id=user_id, kind=kind, bytes=delta))
+    except IntegrityError:
+        row.update({UserStorage.bytes: UserStorage.bytes + delta}, synchronize_session=False)
+
+def record_sizes(conversion: models.Conversion, sizes: Dict[str, int]) -> None:
+    """Record new stored sizes for some of a conversion's files and account for the change"""
+    if not sizes:
+        return
+    old = conversion.sizes or {}
+    delta = {kind: size - old.get(kind, 0) for kind, size in sizes.items()}
+    conversion.sizes = {**old, **sizes}
+    add(object_session(conversion), conversion.user_id, delta)
+
+def forget_sizes(conversion: models.Conversion, kinds: Iterable[str]) -> None:
+    """Account for files of a conversion that were removed"""
+    old = conversion.sizes or {}
+    removed = {kind: -old[kind] for kind in kinds if kind in old}
+    if removed:
+        conversion.sizes = {kind: size for kind, size in old.items() if kind not in removed}
+        add(object_session(conversion), conversion.user_id, removed)
+
+def conversions_deleted(db: Session, conversions: Iterable[models.Conversion]) -> None:
+    """Account for deleted conversions (rows and all their files), one update per user"""
+    per_user: Dict[int, dict] = {}
+    for conversion in conversions:
+        entry = per_user.setdefault(conversion.user_id, {"sizes": {}, "conversions": 0, "failures": 0})
+        entry["conversions"] -= 1
+        if conversion.status == "failed":
+            entry["failures"] -= 1
+        for kind, size in (conversion.sizes or {}).items():
+            entry["sizes"][kind] = entry["sizes"].get(kind, 0) - size
+    for user_id, entry in per_user.items():
+        add(db, user_id, entry["sizes"], conversions=entry["conversions"], failures=entry["failures"])
+
+def storage_by_kind(user: models.User) -> Dict[str, int]:
+    return {row.kind: row.bytes for row in user.storage if row.bytes}
+
+def rebuild(db: Session, user_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Recompute counters from scratch: stat every conversion's files to refresh
+    ``Conversion.sizes``, then reset each user's totals. Minutes and
+    failures only count conversions that still exist; the last upload time
+    is only moved forward. Returns the number of users rebuilt. For
+    maintenance only; the app keeps counters up to date.
+    """
+    users = db.query(models.User)
+    if user_ids is not None:
+        users = users.filter(models.User.id.in_(list(user_ids)))
+    count = 0
+    for user in users.all():
+        totals: Dict[str, int] = {}
+        minutes = 0.0
+        failures = 0
+        last_upload = user.last_upload_at
+        for conversion in user.conversions:
+            sizes = {}
+            for kind, path in conversion_artifacts(conversion).items():
+                size = storage.size(path)
+                if size is not None:
+                    sizes[kind] = size
+            conversion.sizes = sizes
+            for kind, size in sizes.items():
+                totals[kind] = totals.get(kind, 0) + size
+            if conversion.status == "completed" and conversion.duration:
+                minutes += conversion.duration / 60.0
+            failures += conversion.status == "failed"
+            if conversion.created_at and (last_upload is None or conversion.created_at > last_upload):
+                last_upload = conversion.created_at
+        user.usage_conversions = len(user.conversions)
+        user.usage_minutes = minutes
+        user.usage_failures = failures
+        user.last_upload_at = last_upload
+        user.usage_bytes = sum(totals.values())
+        db.query(models.UserStorage).filter(models.UserStorage.user_id == user.id).delete(synchronize_session=False)
+        db.expire(user, ["storage"])
+        db.add_all(models.UserStorage(user_id=user.id, kind=kind, bytes=size) for kind, size in totals.items())
+        db.flush()
+        count += 1
+    return count
@@ -0,0 +1,96 @@
+"""
+Index-backed user search for the admin API.
+
+Queries are matched against the lower-cased username and email, which are
+indexed in that form (see ``models.User``):
+
+* Postgres: the indexes are pg_trgm GIN indexes, so a query of
+  MIN_SUBSTRING characters or more matches anywhere in the value
+  (``lower(username) LIKE '%x%'``); shorter ones match prefixes, which
+  extract enough trigrams for the index too.
+* SQLite (and anything else): the indexes are ordinary B-trees, so a query
+  matches prefixes as a range ``x <= lower(username) < x + U+10FFFF``.
+
+``autocomplete`` lists prefix matches first, ordered by the lower-cased
+value, reading at most limit rows from each column's B-tree in index order
+(on Postgres the Postgres-only ``lower(...) COLLATE "C"`` indexes, since GIN
+indexes cannot return rows in order). On Postgres it then fills any remaining
+slots with substring matches from the trigram indexes, unordered: ordering
+them would mean sorting every match before the limit, so which of them are
+returned is arbitrary (they are sorted among themselves afterwards). Either
+way its cost does not grow with the number of users.
+"""
+from typing import List
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+from . import models
+
+MIN_SUBSTRING = 3
+MAX_LIMIT = 50
+_TOP = "\U0010ffff"  # sorts after every character
+
+def normalize(q: str) -> str:
+    return (q or "").strip().lower()
+
+def _postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+def _substring(db: Session, q: str) -> bool:
+    return _postgres(db) and len(q) >= MIN_SUBSTRING
+
+def _key(db: Session, column):
+    """The lower-cased column as the ordered (prefix) indexes hold it"""
+    key = func.lower(column)
+    return key.collate("C") if _postgres(db) else key
+
+def _prefix(db: Session, column, q: str):
+    key = _key(db, column)
+    return (key >= q) & (key < q + _TOP)
+
+def _match(db: Session, column, q: str):
+    if _postgres(db):
+        key = func.lower(column)
+        return key.contains(q, autoescape=True) if _substring(db, q) else key.startswith(q, autoescape=True)
+    return _prefix(db, column, q)
+
+def matches(db: Session, q: str):
+    """Filter on User for users whose username or email match q (normalised)"""
+    q = normalize(q)
+    return or_(_match(db, models.User.username, q), _match(db, models.User.email, q))
+
+def user_ids(db: Session, q: str):
+    """Subquery of the ids of matching users, e.g. for Conversion.user_id.in_()"""
+    return select(models.User.id).where(matches(db, q))
+
+def autocomplete(db: Session, q: str, limit: int = 10) -> List[models.User]:
+    """
+    Up to limit matching users: username prefix matches first, then email
+    prefix matches, each ordered by the lower-cased value; then, on Postgres,
+    substring matches (see the module docstring).
+    """
+    q = normalize(q)
+    limit = max(1, min(limit, MAX_LIMIT))
+    if not q:
+        return []
+    found = {}
+    for column in (models.User.username, models.User.email):
+        rows = (
+            db.query(models.User)
+            .filter(_prefix(db, column, q))
+            .order_by(_key(db, column), models.User.id)
+            .limit(limit)
+        )
+        for user in rows:
+            found.setdefault(user.id, user)
+        if len(found) >= limit:
+            return list(found.values())[:limit]
+    if _substring(db, q):
+        rows = (
+            db.query(models.User)
+            .filter(matches(db, q), models.User.id.notin_(list(found)))
+            .limit(limit - len(found))
+            .all()
+        )
+        for user in sorted(rows, key=lambda u: (u.username.lower(), u.id)):
+            found[user.id] = user
+    return list(found.values())
@@ -0,0 +1,59 @@
+"""
+ZIP archives streamed while they are built.
+
+``zipfile`` can write to a non-seekable stream: it then records sizes and
+CRCs in data descriptors after each member instead of seeking back. The
+archive is written into a small in-memory sink that is drained every
+FLUSH_SIZE bytes, so an export of any size is produced without a temporary
+file and with memory bounded by one chunk plus the central directory.
+"""
+import time
+import zipfile
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, Optional
+
+FLUSH_SIZE = 256 * 1024
+
+class _Sink:
+    """Write-only file object collecting zipfile output between yields"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def write(self, data) -> int:
+        self.buffer += data
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def take(self) -> bytes:
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
+
+@dataclass
+class ZipEntry:
+    name: str
+    chunks: Callable[[], Iterator[bytes]]  # called when the member is written
+    mtime: float
+    compress: bool = False  # deflate; off for formats that are already compressed
+    size: Optional[int] = None  # uncompressed size when known, to pick ZIP64
+
+def stream_zip(entries: Iterable[ZipEntry]) -> Iterator[bytes]:
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w") as zf:
+        for entry in entries:
+            info = zipfile.ZipInfo(entry.name, time.localtime(entry.mtime)[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED if entry.compress else zipfile.ZIP_STORED
+            # Without a known size, assume members may exceed the 2 GiB limit
+            force_zip64 = entry.size is None or entry.size >= zipfile.ZIP64_LIMIT
+            with zf.open(info, "w", force_zip64=force_zip64) as out:
+                for chunk in entry.chunks():
+                    out.write(chunk)
+                    if len(sink.buffer) >= FLUSH_SIZE:
+                        yield sink.take()
+            if sink.buffer:
+                yield sink.take()
+    # Central directory
+    yield sink.take()
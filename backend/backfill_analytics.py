@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Rebuild the hourly and daily analytics rollups from the conversions table.
+The app updates the rollups as conversions are uploaded and finish; run this
+once for data recorded before they existed, or to repair a range.
+Deleted conversions are not in the table, so they cannot be counted.
+
+    python backfill_analytics.py [--since 2024-01-01]
+"""
+
+import sys
+import os
+import argparse
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal
+from app import analytics
+
+def backfill_analytics(since=None):
+    db = SessionLocal()
+    try:
+        count = analytics.backfill(db, since)
+        db.commit()
+        scope = f" since {since.date()}" if since else ""
+        print(f"✅ Analytics rollups rebuilt{scope} from {count} conversion(s)")
+    except Exception as e:
+        print(f"❌ Error rebuilding analytics rollups: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild analytics rollups from conversions")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="only rebuild days from this date (UTC)")
+    args = parser.parse_args()
+    backfill_analytics(args.since)
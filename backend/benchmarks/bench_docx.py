@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark the streaming DOCX writer against the python-docx renderer.
+
+Each case runs in a fresh subprocess so peak RSS (ru_maxrss) is measured
+for that render alone. The streaming writer's one-off template build is
+done before timing, as it is cached for the life of the worker.
+
+    python benchmarks/bench_docx.py [--minutes 10 60 240]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def run_case(engine: str, minutes: float) -> dict:
+    """Executed in the child process."""
+    from benchmarks.synthetic import synthetic_turns
+    from app import converter, docx_writer
+    render = converter.render_docx if engine == "python-docx" else docx_writer.render_docx
+    if engine == "stream":
+        docx_writer._load_template()
+    turns = list(synthetic_turns(minutes))
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    path = os.path.join(tempfile.mkdtemp(), "bench.docx")
+    start = time.perf_counter()
+    render(path, "Benchmark", turns, {"duration": minutes * 60, "channels": 1})
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"seconds": elapsed, "delta_mb": (peak - baseline) / 1024,
+            "turns": len(turns), "size_kb": os.path.getsize(path) / 1024}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, nargs="+", default=[10, 60, 240])
+    parser.add_argument("--engines", nargs="+", default=["stream", "python-docx"])
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_case(args.child[0], float(args.child[1]))))
+        return
+
+    print(f"{'engine':12} {'minutes':>8} {'turns':>6} {'seconds':>9} {'Δ MB':>8} {'DOCX KB':>8}")
+    print("-" * 56)
+    for minutes in args.minutes:
+        results = {}
+        for engine in args.engines:
+            out = subprocess.run([sys.executable, __file__, "--child", engine, str(minutes)],
+                                 capture_output=True, text=True, check=True, cwd=ROOT)
+            r = results[engine] = json.loads(out.stdout.strip().splitlines()[-1])
+            print(f"{engine:12} {minutes:8.0f} {r['turns']:6d} {r['seconds']:9.3f} {r['delta_mb']:8.1f} {r['size_kb']:8.0f}")
+        if "stream" in results and "python-docx" in results:
+            print(f"{'':12} speed-up x{results['python-docx']['seconds'] / results['stream']['seconds']:.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark PDF rendering time and peak memory by transcript length.
+
+Each case runs in a fresh subprocess so peak RSS (ru_maxrss) is measured
+for that render alone. "stream" is the incremental renderer used by the
+app; "list" builds the whole story up front, as render_pdf did before.
+
+    python benchmarks/bench_pdf.py [--minutes 10 60 240]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def _render_list(path, name, turns, meta):
+    from xml.sax.saxutils import escape
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import cm
+    from app import pdf_render
+    from app.converter import format_ts
+    doc = SimpleDocTemplate(str(path), pagesize=A4, leftMargin=2*cm, rightMargin=2*cm,
+                            topMargin=2*cm, bottomMargin=2*cm)
+    story = [Paragraph(escape(name), pdf_render.HEADING_STYLE), Spacer(1, 12)]
+    for t in turns:
+        story.append(Paragraph(f"Speaker {t['speaker']}  [{format_ts(t['start'])}–{format_ts(t['end'])}]", pdf_render.SPEAKER_STYLE))
+        story.append(Paragraph(escape(t["text"]), pdf_render.TEXT_STYLE))
+    doc.build(story)
+
+def run_case(mode: str, minutes: float) -> dict:
+    """Executed in the child process."""
+    from benchmarks.synthetic import synthetic_turns
+    from app.pdf_render import render_pdf
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    path = os.path.join(tempfile.mkdtemp(), "bench.pdf")
+    turns = synthetic_turns(minutes)
+    start = time.perf_counter()
+    if mode == "stream":
+        render_pdf(path, "Benchmark", turns, {"duration": minutes * 60, "channels": 1})
+    else:
+        _render_list(path, "Benchmark", list(turns), {})
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"seconds": elapsed, "peak_mb": peak / 1024, "delta_mb": (peak - baseline) / 1024,
+            "size_kb": os.path.getsize(path) / 1024}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, nargs="+", default=[10, 60, 240])
+    parser.add_argument("--modes", nargs="+", default=["stream", "list"])
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_case(args.child[0], float(args.child[1]))))
+        return
+
+    print(f"{'mode':8} {'minutes':>8} {'seconds':>9} {'peak MB':>9} {'Δ MB':>8} {'PDF KB':>8}")
+    print("-" * 56)
+    for minutes in args.minutes:
+        for mode in args.modes:
+            out = subprocess.run([sys.executable, __file__, "--child", mode, str(minutes)],
+                                 capture_output=True, text=True, check=True, cwd=ROOT)
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            print(f"{mode:8} {minutes:8.0f} {r['seconds']:9.2f} {r['peak_mb']:9.1f} {r['delta_mb']:8.1f} {r['size_kb']:8.0f}")
+
+if __name__ == "__main__":
+    main()
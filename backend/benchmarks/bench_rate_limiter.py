@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark rate limiter check overhead per storage backend.
+
+Measures the cost of one limiter hit (what every rate-limited request pays)
+for the in-process memory storage and the shared SQLite storage, in a single
+process and with several processes hitting the same database. Pass a Redis
+URI to include a Redis-protocol server (redis, valkey, dragonfly...):
+
+    python benchmarks/bench_rate_limiter.py
+    python benchmarks/bench_rate_limiter.py --redis redis://localhost:6379
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import STRATEGIES
+import app.rate_limit_storage  # noqa: F401  registers sqlite://
+
+def bench(uri: str, strategy: str, iterations: int, keys: int) -> float:
+    """Return mean microseconds per hit."""
+    storage = storage_from_string(uri)
+    limiter = STRATEGIES[strategy](storage)
+    item = parse("1000000 per hour")
+    start = time.perf_counter()
+    for i in range(iterations):
+        limiter.hit(item, f"bench:{i % keys}")
+    elapsed = time.perf_counter() - start
+    storage.reset()
+    return elapsed / iterations * 1e6
+
+def _worker(uri: str, strategy: str, iterations: int, queue):
+    storage = storage_from_string(uri)
+    limiter = STRATEGIES[strategy](storage)
+    item = parse("5 per minute")
+    admitted = sum(1 for _ in range(iterations) if limiter.hit(item, "shared-login"))
+    queue.put(admitted)
+
+def shared_admission(uri: str, strategy: str, processes: int, iterations: int) -> int:
+    """Hit one '5 per minute' key from several processes; returns total admitted."""
+    storage_from_string(uri).reset()
+    queue = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=_worker, args=(uri, strategy, iterations, queue))
+             for _ in range(processes)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    return sum(queue.get() for _ in procs)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--keys", type=int, default=100)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--redis", help="Redis-protocol URI to include")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    uris = {
+        "memory": "memory://",
+        "sqlite": f"sqlite:///{os.path.join(tmp, 'ratelimit.db')}",
+    }
+    if args.redis:
+        uris["redis"] = args.redis
+
+    print(f"{'backend':10} {'strategy':16} {'µs/hit':>10}")
+    print("-" * 38)
+    for name, uri in uris.items():
+        for strategy in ("fixed-window", "moving-window"):
+            print(f"{name:10} {strategy:16} {bench(uri, strategy, args.iterations, args.keys):10.1f}")
+
+    print()
+    print(f"'5 per minute' hit by {args.processes} processes x 20 attempts:")
+    for name, uri in uris.items():
+        if name == "memory":
+            print(f"  {name:10} per-process: up to {5 * args.processes} admitted")
+            continue
+        admitted = shared_admission(uri, "moving-window", args.processes, 20)
+        print(f"  {name:10} shared: {admitted} admitted")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the converter hot paths, with a stored baseline to
+catch regressions.
+
+Cases (each at every transcript length, 1 minute to 4 hours by default):
+
+* build_turns   - build_turns_from_deepgram_json on a parsed response
+* stream_turns  - the same, streaming the saved .json.gz as the worker does
+* render_pdf    - the configured PDF renderer
+* render_docx   - the configured DOCX renderer
+* format_ts     - one call per word, timestamps across the transcript
+
+Every case runs in a fresh subprocess so peak RSS (ru_maxrss) belongs to
+that case alone; the reported memory is the growth over the process
+baseline after imports and input generation. Each time is also divided by
+a fixed pure-Python calibration loop run just before it in the same
+process; baselines store and compare these normalized times, so one
+recorded on a laptop still applies on a CI runner.
+
+    python benchmarks/bench_suite.py                      # print results
+    python benchmarks/bench_suite.py --update-baseline    # record benchmarks/baseline.json
+    python benchmarks/bench_suite.py --check              # exit 1 on regression (CI)
+    python benchmarks/bench_suite.py --minutes 1 10 --cases render_pdf --check
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+CASES = ["build_turns", "stream_turns", "render_pdf", "render_docx", "format_ts"]
+MINUTES = [1, 10, 60, 240]
+SPEAKERS = 3
+PUNCTUATION = 0.12
+TIME_TOLERANCE = 0.25  # allowed slowdown, as a fraction of the baseline
+TIME_SLACK = 0.05  # seconds; timer noise on the smallest cases
+MEMORY_TOLERANCE = 0.20
+MEMORY_SLACK = 4.0  # MB; allocator and page granularity
+
+def _calibrate() -> float:
+    """Time a fixed mix of dict, string and float work (roughly what the converter does)"""
+    start = time.perf_counter()
+    total = 0.0
+    for i in range(100_000):
+        word = {"word": f"w{i % 97}", "start": i * 0.3, "speaker": i % 3}
+        total += word["start"] / (word["speaker"] + 1)
+        "".join((word["word"], " ", str(i)))
+    return time.perf_counter() - start
+
+def _maxrss_mb() -> float:
+    # Kilobytes on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+def run_case(case: str, minutes: float) -> dict:
+    """Executed in the child process."""
+    from benchmarks.synthetic import synthetic_response, synthetic_turns, synthetic_words
+    from app.converter import build_turns_from_deepgram_json, format_ts
+    from app.deepgram_json import open_deepgram_json
+    from app.formats import FORMATS
+
+    tmp = tempfile.mkdtemp()
+    meta = {"duration": minutes * 60, "channels": 1}
+    if case == "build_turns":
+        response = synthetic_response(minutes, SPEAKERS, PUNCTUATION)
+        work = lambda: build_turns_from_deepgram_json(response)
+    elif case == "stream_turns":
+        # Written by another process, so building the response does not set the peak
+        path = os.path.join(tmp, "bench.json.gz")
+        subprocess.run([sys.executable, os.path.join(ROOT, "benchmarks", "synthetic.py"), "--minutes", str(minutes),
+                        "--speakers", str(SPEAKERS), "--punctuation", str(PUNCTUATION), "-o", path],
+                       check=True, stdout=subprocess.DEVNULL)
+        def work():
+            with open_deepgram_json(path) as reader:
+                return build_turns_from_deepgram_json(reader)
+    elif case in ("render_pdf", "render_docx"):
+        fmt = FORMATS[case.split("_", 1)[1]]
+        render = fmt.render_function()
+        output = os.path.join(tmp, "bench" + fmt.extension)
+        # Turns are produced lazily, as render_from_json feeds them
+        work = lambda: render(output, "Benchmark", synthetic_turns(minutes, SPEAKERS, PUNCTUATION), meta)
+    elif case == "format_ts":
+        stamps = [w["start"] for w in synthetic_words(minutes, SPEAKERS, PUNCTUATION)]
+        work = lambda: [format_ts(s) for s in stamps]
+    else:
+        raise ValueError(f"unknown case {case!r}")
+
+    # Calibrated next to the case, so both see the same machine load
+    calibration = min(_calibrate() for _ in range(3))
+    baseline = _maxrss_mb()
+    start = time.perf_counter()
+    work()
+    elapsed = time.perf_counter() - start
+    return {"seconds": elapsed, "calibration": calibration, "memory_mb": max(_maxrss_mb() - baseline, 0.0)}
+
+def _child(*args: str) -> dict:
+    out = subprocess.run([sys.executable, __file__, "--child", *args],
+                         capture_output=True, text=True, check=True, cwd=ROOT)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def _key(case: str, minutes: float) -> str:
+    return f"{case}@{minutes:g}m"
+
+def measure(cases, minutes, repeat: int) -> dict:
+    """Run every case; keep the fastest normalized time and the largest memory growth over repeats"""
+    results = {}
+    for m in minutes:
+        for case in cases:
+            runs = [_child(case, str(m)) for _ in range(repeat)]
+            best = min(runs, key=lambda r: r["seconds"] / r["calibration"])
+            r = results[_key(case, m)] = {
+                "seconds": round(best["seconds"], 4),
+                "normalized": round(best["seconds"] / best["calibration"], 4),
+                "memory_mb": round(max(r["memory_mb"] for r in runs), 1),
+            }
+            print(f"{case:13} {m:7g} {r['seconds']:9.3f} {r['normalized']:10.2f} {r['memory_mb']:9.1f}", flush=True)
+    return {"calibration_seconds": round(min(_calibrate() for _ in range(3)), 4), "cases": results}
+
+def compare(current: dict, baseline: dict, time_tolerance: float, memory_tolerance: float) -> list:
+    """Regressions of current against baseline, as printable lines"""
+    regressions = []
+    for key, now in current["cases"].items():
+        before = baseline["cases"].get(key)
+        if before is None:
+            continue
+        # Small absolute slack, in calibration units, absorbs timer noise on tiny cases
+        slack = TIME_SLACK / current["calibration_seconds"]
+        if now["normalized"] > before["normalized"] * (1 + time_tolerance) + slack:
+            regressions.append(f"{key}: {now['normalized']:.3f}, expected at most "
+                               f"{before['normalized'] * (1 + time_tolerance) + slack:.3f} "
+                               f"({now['normalized'] / max(before['normalized'], 1e-4):.2f}x baseline)")
+        allowed = before["memory_mb"] * (1 + memory_tolerance) + MEMORY_SLACK
+        if now["memory_mb"] > allowed:
+            regressions.append(f"{key}: {now['memory_mb']:.1f} MB, expected at most {allowed:.1f} MB")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, nargs="+", default=MINUTES)
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=CASES)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case (fastest time is kept)")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="record these results as the baseline")
+    parser.add_argument("--check", action="store_true", help="compare with the baseline; exit 1 on regression")
+    parser.add_argument("--time-tolerance", type=float, default=TIME_TOLERANCE)
+    parser.add_argument("--memory-tolerance", type=float, default=MEMORY_TOLERANCE)
+    parser.add_argument("--child", nargs="+", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_case(args.child[0], float(args.child[1]))))
+        return
+
+    print(f"{'case':13} {'minutes':>7} {'seconds':>9} {'normalized':>10} {'Δ MB':>9}")
+    print("-" * 52)
+    current = measure(args.cases, args.minutes, args.repeat)
+    print(f"\ncalibration: {current['calibration_seconds']:.3f}s")
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        # Cases not run this time keep their recorded values; comparisons
+        # use the normalized times, so mixing runs is fine
+        cases = {**baseline.get("cases", {}), **current["cases"]}
+        with open(args.baseline, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "calibration_seconds": current["calibration_seconds"],
+                "cases": cases,
+            }, f, indent=2)
+            f.write("\n")
+        print(f"✅ Baseline written to {args.baseline}")
+
+    if args.check:
+        if not os.path.exists(args.baseline):
+            sys.exit(f"❌ No baseline at {args.baseline}; run with --update-baseline first")
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.time_tolerance, args.memory_tolerance)
+        if regressions:
+            print("❌ Regressions against the baseline:")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print("✅ No regressions against the baseline")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test: upload -> transcribe -> render -> download.
+
+Starts the API under uvicorn (one worker, as deployed) against a local fake
+Deepgram server, then runs virtual users that each loop: upload a WAV,
+poll the conversion list and the conversion until it finishes, download
+the rendered files, repeat. The fake answers after a configurable latency
+with a synthetic transcript, and fails a configurable fraction of calls.
+
+Reports throughput, p50/p95/p99 latency per endpoint, conversion outcomes
+and end-to-end time, and the server's memory high-water mark.
+
+    python benchmarks/load_test.py                                  # SQLite, 10 users, 60 s
+    python benchmarks/load_test.py --users 30 --latency 5 --failure-rate 0.1
+    python benchmarks/load_test.py --database postgresql://user:pw@localhost/loadtest
+
+Use a throwaway Postgres database: tables are created if missing and the
+run adds its own users and conversions.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import resource
+import secrets
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import httpx
+
+from benchmarks.synthetic import synthetic_response
+
+class FakeDeepgram(ThreadingHTTPServer):
+    """POST /v1/listen: wait ``latency`` (±50%), then fail or return the transcript"""
+    daemon_threads = True
+
+    def __init__(self, latency: float, failure_rate: float, transcript_minutes: float, speakers: int):
+        super().__init__(("127.0.0.1", 0), _FakeDeepgramHandler)
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.body = json.dumps(synthetic_response(transcript_minutes, speakers)).encode()
+        self.calls = 0
+        self.failures = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+class _FakeDeepgramHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        server = self.server
+        remaining = int(self.headers.get("Content-Length") or 0)
+        while remaining > 0:
+            remaining -= len(self.rfile.read(min(remaining, 1 << 16)))
+        time.sleep(server.latency * random.uniform(0.5, 1.5))
+        failed = random.random() < server.failure_rate
+        with server.lock:
+            server.calls += 1
+            server.failures += failed
+        status, body = (503, b'{"err_msg": "fake outage"}') if failed else (200, server.body)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def make_wav(seconds: float, rate: int = 8000) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(b"\x00\x00" * int(seconds * rate))
+    return buf.getvalue()
+
+def percentile(values, q: float) -> float:
+    """Nearest-rank percentile of a sorted list"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, int(round(q / 100 * len(values) + 0.5)) - 1))]
+
+class Stats:
+    def __init__(self):
+        self.latencies = {}  # endpoint -> [seconds]
+        self.errors = {}  # endpoint -> count of non-2xx/3xx or transport errors
+        self.conversions = {"completed": 0, "failed": 0, "timed_out": 0}
+        self.end_to_end = []
+
+    def record(self, endpoint: str, seconds: float, ok: bool):
+        self.latencies.setdefault(endpoint, []).append(seconds)
+        if not ok:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+async def timed(stats: Stats, client: httpx.AsyncClient, endpoint: str, method: str, url: str, **kwargs):
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+    except httpx.HTTPError:
+        stats.record(endpoint, time.perf_counter() - start, False)
+        return None
+    stats.record(endpoint, time.perf_counter() - start, response.status_code < 400)
+    return response
+
+async def virtual_user(client, token: str, stats: Stats, audio: bytes, deadline: float, args):
+    headers = {"Authorization": f"Bearer {token}"}
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        response = await timed(stats, client, "POST /upload", "POST", "/api/conversions/upload", headers=headers,
+                               files={"file": ("load.wav", audio, "audio/wav")}, data={"formats": "pdf,docx"})
+        if response is None or response.status_code != 200:
+            await asyncio.sleep(args.poll_interval)
+            continue
+        conversion_id = response.json()["id"]
+        status = "pending"
+        while status in ("pending", "processing"):
+            if time.monotonic() > deadline + args.drain:
+                stats.conversions["timed_out"] += 1
+                return
+            await asyncio.sleep(args.poll_interval)
+            await timed(stats, client, "GET /conversions", "GET", "/api/conversions/", headers=headers)
+            response = await timed(stats, client, "GET /conversions/{id}", "GET",
+                                   f"/api/conversions/{conversion_id}", headers=headers)
+            if response is not None and response.status_code == 200:
+                status = response.json()["status"]
+        stats.conversions[status] = stats.conversions.get(status, 0) + 1
+        if status != "completed":
+            continue
+        stats.end_to_end.append(time.perf_counter() - started)
+        for file_type in ("pdf", "docx"):
+            await timed(stats, client, f"GET /download/{file_type}", "GET",
+                        f"/api/conversions/{conversion_id}/download/{file_type}", headers=headers)
+        await asyncio.sleep(random.uniform(0, args.think_time))
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _rss_mb(pid: int):
+    """Current resident set size of a process (Linux), or None"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+
+def create_users(count: int):
+    """Create load-test users with ample credits; returns their tokens"""
+    from app import auth, models
+    from app.database import SessionLocal, engine, upgrade_schema
+    upgrade_schema(engine)
+    db = SessionLocal()
+    run = secrets.token_hex(3)
+    tokens = []
+    try:
+        for i in range(count):
+            username = f"load-{run}-{i}"
+            # Regular users, so uploads go through credit admission and lists are per user
+            db.add(models.User(email=f"{username}@load.test", username=username,
+                               hashed_password="!", credits=1e9))
+            tokens.append(auth.create_access_token({"sub": username}))
+        db.commit()
+    finally:
+        db.close()
+    engine.dispose()
+    return tokens
+
+async def drive(base_url: str, tokens, audio: bytes, args, stats: Stats):
+    deadline = time.monotonic() + args.duration
+    limits = httpx.Limits(max_connections=len(tokens) * 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        await asyncio.gather(*(virtual_user(client, token, stats, audio, deadline, args) for token in tokens))
+
+def report(stats: Stats, elapsed: float, fake: FakeDeepgram, peak_rss, args) -> dict:
+    endpoints = {}
+    for endpoint, values in sorted(stats.latencies.items()):
+        values.sort()
+        endpoints[endpoint] = {
+            "requests": len(values),
+            "errors": stats.errors.get(endpoint, 0),
+            "rps": round(len(values) / elapsed, 2),
+            "p50_ms": round(percentile(values, 50) * 1000, 1),
+            "p95_ms": round(percentile(values, 95) * 1000, 1),
+            "p99_ms": round(percentile(values, 99) * 1000, 1),
+            "max_ms": round(values[-1] * 1000, 1),
+        }
+    end_to_end = sorted(stats.end_to_end)
+    return {
+        "database": "postgres" if args.database.startswith("postgres") else "sqlite",
+        "users": args.users,
+        "seconds": round(elapsed, 1),
+        "endpoints": endpoints,
+        "conversions": {
+            **stats.conversions,
+            "per_minute": round(stats.conversions["completed"] / elapsed * 60, 1),
+            "end_to_end_p50_s": round(percentile(end_to_end, 50), 2),
+            "end_to_end_p95_s": round(percentile(end_to_end, 95), 2),
+        },
+        "deepgram": {"calls": fake.calls, "failures": fake.failures},
+        "server_peak_rss_mb": peak_rss,
+    }
+
+def print_report(result: dict):
+    print(f"\n{'endpoint':24} {'requests':>8} {'errors':>7} {'rps':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    print("-" * 86)
+    for endpoint, r in result["endpoints"].items():
+        print(f"{endpoint:24} {r['requests']:8} {r['errors']:7} {r['rps']:7.2f} {r['p50_ms']:8.1f} "
+              f"{r['p95_ms']:8.1f} {r['p99_ms']:8.1f} {r['max_ms']:8.1f}")
+    c = result["conversions"]
+    print(f"\nconversions: {c['completed']} completed, {c['failed']} failed, {c['timed_out']} unfinished "
+          f"({c['per_minute']}/min); end to end p50 {c['end_to_end_p50_s']}s, p95 {c['end_to_end_p95_s']}s")
+    print(f"deepgram: {result['deepgram']['calls']} calls, {result['deepgram']['failures']} failed")
+    print(f"server memory high-water: {result['server_peak_rss_mb']} MB ({result['database']})")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", default=None, help="database URL (default: a temporary SQLite file)")
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60, help="seconds of new uploads")
+    parser.add_argument("--drain", type=float, default=120, help="seconds to wait for conversions still running")
+    parser.add_argument("--latency", type=float, default=2.0, help="mean fake Deepgram latency, seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.05, help="fraction of Deepgram calls that fail")
+    parser.add_argument("--transcript-minutes", type=float, default=10, help="length of the returned transcript")
+    parser.add_argument("--speakers", type=int, default=2)
+    parser.add_argument("--audio-seconds", type=float, default=30, help="length of the uploaded WAV")
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--think-time", type=float, default=2.0, help="max pause between a user's conversions")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="load-test-")
+    args.database = args.database or f"sqlite:///{os.path.join(tmp, 'load.db')}"
+    fake = FakeDeepgram(args.latency, args.failure_rate, args.transcript_minutes, args.speakers)
+    threading.Thread(target=fake.serve_forever, daemon=True).start()
+
+    port = _free_port()
+    env = {
+        **os.environ,
+        "DATABASE_URL": args.database,
+        "UPLOAD_DIR": os.path.join(tmp, "uploads"),
+        "SECRET_KEY": secrets.token_hex(16),
+        "DEEPGRAM_API_KEY": "load-test",
+        "DEEPGRAM_URL": fake.url,
+        "STORAGE_BACKEND": "local",
+        "STORAGE_GC_INTERVAL_HOURS": "0",
+    }
+    # The app reads its settings at import, so configure this process the same way
+    os.environ.update(env)
+    tokens = create_users(args.users)
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--no-access-log", "--log-level", "warning"],
+        cwd=ROOT, env=env
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    peak = [0.0]
+    stop = threading.Event()
+
+    def sample():
+        while not stop.wait(0.25):
+            peak[0] = max(peak[0], _rss_mb(server.pid) or 0.0)
+
+    try:
+        for _ in range(100):
+            try:
+                if httpx.get(f"{base_url}/api/health").status_code == 200:
+                    break
+            except httpx.HTTPError:
+                time.sleep(0.2)
+        else:
+            sys.exit("❌ Server did not start")
+        threading.Thread(target=sample, daemon=True).start()
+        print(f"🚀 {args.users} users for {args.duration:.0f}s against {env['DATABASE_URL']} "
+              f"(Deepgram latency {args.latency}s, failure rate {args.failure_rate:.0%})")
+        stats = Stats()
+        started = time.perf_counter()
+        asyncio.run(drive(base_url, tokens, make_wav(args.audio_seconds), args, stats))
+        elapsed = time.perf_counter() - started
+    finally:
+        stop.set()
+        server.terminate()
+        server.wait()
+        fake.shutdown()
+
+    # The server is this process's only child, so its ru_maxrss is the exact high-water mark
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    peak_rss = children / (1024 * 1024) if sys.platform == "darwin" else children / 1024
+    result = report(stats, elapsed, fake, round(max(peak_rss, peak[0]), 1), args)
+    print_report(result)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+if __name__ == "__main__":
+    main()
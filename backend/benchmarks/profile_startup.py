@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Profile API cold start: module import time and time to first response.
+
+The import profile runs ``python -X importtime -c "import app.main"`` in a
+fresh interpreter against a throwaway database and lists the slowest
+top-level packages. It fails if a module that is meant to load lazily
+(the Deepgram SDK, python-docx, reportlab, pyinstrument) is imported at startup.
+
+With --serve the script also reproduces start.sh: it runs init_db.py, starts
+uvicorn and reports the wall time until /api/ready first answers 200, once
+against an empty database and once against the already-initialised one.
+
+    python benchmarks/profile_startup.py [--top 15] [--serve] [--budget-ms 2000]
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Only needed once a conversion runs; importing them at startup is a regression
+LAZY_MODULES = ("deepgram", "docx", "reportlab", "pyinstrument")
+
+def scratch_env(workdir: str) -> dict:
+    env = dict(os.environ)
+    env["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'startup.db')}"
+    env["UPLOAD_DIR"] = os.path.join(workdir, "uploads")
+    env["RATE_LIMIT_STORAGE_URI"] = "memory://"
+    return env
+
+def import_profile(env: dict):
+    """Returns (total_us, {top-level package: self time in us}, set of modules)"""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app.main"],
+                         capture_output=True, text=True, check=True, cwd=ROOT, env=env)
+    packages = defaultdict(int)
+    modules = set()
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        modules.add(name)
+        # Self times are summed per top-level package so nothing is counted twice
+        packages[name.split(".")[0]] += int(self_us)
+    total = sum(packages.values())
+    return total, packages, modules
+
+def wait_ready(url: str, proc: subprocess.Popen, timeout: float = 60.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            return False
+        try:
+            with urllib.request.urlopen(url, timeout=1) as resp:
+                if resp.status == 200:
+                    return True
+        except OSError:
+            time.sleep(0.01)
+    return False
+
+def time_to_ready(env: dict) -> dict:
+    """Run init_db.py then uvicorn like start.sh; seconds until /api/ready is 200"""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "init_db.py"], check=True, cwd=ROOT, env=env, capture_output=True)
+    init_done = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+                            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if not wait_ready(f"http://127.0.0.1:{port}/api/ready", proc):
+            raise RuntimeError("server did not become ready")
+        ready = time.perf_counter()
+    finally:
+        proc.terminate()
+        proc.wait()
+    return {"init_db": init_done - start, "server": ready - init_done, "total": ready - start}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=15, help="packages to list")
+    parser.add_argument("--serve", action="store_true", help="also measure time until /api/ready")
+    parser.add_argument("--budget-ms", type=float, help="fail if importing app.main takes longer")
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as workdir:
+        env = scratch_env(workdir)
+        # First run creates the schema so the import below measures the warm path
+        import_profile(env)
+        total, packages, modules = import_profile(env)
+
+        print(f"import app.main: {total / 1000:.0f} ms")
+        print(f"{'package':28} {'ms':>8} {'share':>7}")
+        print("-" * 45)
+        for name, us in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"{name:28} {us / 1000:8.1f} {us / total:7.1%}")
+
+        eager = sorted(m for m in modules if m.split(".")[0] in LAZY_MODULES)
+        if eager:
+            failed = True
+            print(f"\n✗ imported at startup but should be lazy: {', '.join(eager[:10])}")
+        else:
+            print(f"\n✓ not imported at startup: {', '.join(LAZY_MODULES)}")
+        if args.budget_ms and total / 1000 > args.budget_ms:
+            failed = True
+            print(f"✗ over budget of {args.budget_ms:.0f} ms")
+
+        if args.serve:
+            print()
+            serve_env = scratch_env(os.path.join(workdir, "serve"))
+            os.makedirs(os.path.join(workdir, "serve"))
+            for label in ("empty database", "initialised database"):
+                r = time_to_ready(serve_env)
+                print(f"{label:22} init_db {r['init_db']:6.2f}s   server {r['server']:6.2f}s   "
+                      f"ready after {r['total']:6.2f}s")
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
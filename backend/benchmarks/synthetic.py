@@ -0,0 +1,114 @@
+"""
+Synthetic Deepgram responses for benchmarks.
+
+Generates responses shaped like the prerecorded API output (metadata plus
+results.channels[0].alternatives[0] with transcript, words and paragraphs)
+at a realistic speaking rate, so converter hot paths can be measured
+without an API key. Also writes responses to disk, for manual tests:
+
+    python benchmarks/synthetic.py --minutes 60 --speakers 3 --punctuation 0.2 -o meeting.json.gz
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from typing import Any, Dict, Iterator, List
+
+WORDS_PER_MINUTE = 150
+VOCABULARY = (
+    "the meeting project budget we should review next week client deadline "
+    "team agree think really important question answer because schedule "
+    "décision équipe réunion prochaine semaine d'accord alors donc voilà"
+).split()
+
+def synthetic_words(minutes: float, speakers: int = 2, punctuation: float = 0.12,
+                    seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """
+    Yield word dicts for `minutes` of speech. `punctuation` is the fraction
+    of words followed by punctuation; speaker changes happen at sentence ends.
+    """
+    rnd = random.Random(seed)
+    t = 0.0
+    speaker = 0
+    for _ in range(int(minutes * WORDS_PER_MINUTE)):
+        word = rnd.choice(VOCABULARY)
+        duration = rnd.uniform(0.15, 0.45)
+        punctuated = word
+        if rnd.random() < punctuation:
+            punctuated += rnd.choice(".,?.,")
+        yield {
+            "word": word,
+            "start": round(t, 3),
+            "end": round(t + duration, 3),
+            "confidence": round(rnd.uniform(0.6, 1.0), 4),
+            "punctuated_word": punctuated,
+            "speaker": speaker,
+            "speaker_confidence": round(rnd.uniform(0.5, 1.0), 4),
+        }
+        # Occasional long pause, and speaker changes after sentences
+        t += duration + (rnd.uniform(1.3, 3.0) if rnd.random() < 0.02 else rnd.uniform(0.02, 0.2))
+        if punctuated[-1] in ".?" and rnd.random() < 0.3:
+            speaker = rnd.randrange(speakers)
+
+def synthetic_response(minutes: float, speakers: int = 2, punctuation: float = 0.12,
+                       seed: int = 0) -> Dict[str, Any]:
+    words: List[Dict[str, Any]] = list(synthetic_words(minutes, speakers, punctuation, seed))
+    transcript = " ".join(w["punctuated_word"] for w in words)
+    duration = words[-1]["end"] if words else minutes * 60
+    return {
+        "metadata": {
+            "transaction_key": "deprecated",
+            "request_id": "00000000-0000-0000-0000-000000000000",
+            "sha256": "0" * 64,
+            "created": "2026-01-01T00:00:00.000Z",
+            "duration": duration,
+            "channels": 1,
+            "models": ["00000000-0000-0000-0000-000000000000"],
+            "model_info": {"00000000-0000-0000-0000-000000000000": {"name": "general-nova-3", "version": "2024-12-20", "arch": "nova-3"}},
+        },
+        "results": {
+            "channels": [{
+                "alternatives": [{
+                    "transcript": transcript,
+                    "confidence": 0.95,
+                    "words": words,
+                    # Deepgram repeats the words in paragraphs; keep the size realistic
+                    "paragraphs": {"transcript": transcript, "paragraphs": [
+                        {"sentences": [{"text": transcript[i:i + 200], "start": 0, "end": 0}],
+                         "num_words": 30, "start": 0, "end": 0, "speaker": 0}
+                        for i in range(0, len(transcript), 200)
+                    ]},
+                }],
+                "detected_language": "en",
+            }],
+        },
+    }
+
+def synthetic_turns(minutes: float, speakers: int = 2, punctuation: float = 0.12,
+                    seed: int = 0) -> Iterator[Dict[str, Any]]:
+    from app.converter import iter_turns
+    return iter_turns(synthetic_words(minutes, speakers, punctuation, seed))
+
+def write_response(path: str, minutes: float, speakers: int = 2, punctuation: float = 0.12,
+                   seed: int = 0) -> str:
+    """Save a synthetic response as the app does (compressed per the path's suffix)"""
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from app.artifacts import open_artifact
+    with open_artifact(path, "wt") as f:
+        json.dump(synthetic_response(minutes, speakers, punctuation, seed), f, ensure_ascii=False)
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic Deepgram response")
+    parser.add_argument("--minutes", type=float, default=10)
+    parser.add_argument("--speakers", type=int, default=2)
+    parser.add_argument("--punctuation", type=float, default=0.12, help="fraction of words followed by punctuation")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", required=True, help="file to write; .gz or .zst compresses")
+    args = parser.parse_args()
+    write_response(args.output, args.minutes, args.speakers, args.punctuation, args.seed)
+    print(f"{args.output}: {os.path.getsize(args.output) / 1024:.0f} KB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Compress the stored JSON and TXT artifacts of existing conversions in place.
+Each file is rewritten next to the original with the codec's suffix, the
+conversion row is updated, then the original is removed.
+
+    python compress_artifacts.py [--codec gzip|zstd|none] [--dry-run]
+
+Defaults to ARTIFACT_COMPRESSION; --codec none decompresses again.
+"""
+
+import sys
+import os
+import argparse
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal
+from app.models import Conversion
+from app.config import settings
+from app import artifacts, usage
+from app.storage import storage
+
+COLUMNS = ("json_path", "txt_path")
+
+def compress_artifacts(codec: str, dry_run: bool = False):
+    db = SessionLocal()
+    converted = skipped = 0
+    before = after = 0
+
+    try:
+        conversions = db.query(Conversion).filter(
+            Conversion.json_path.isnot(None) | Conversion.txt_path.isnot(None)
+        ).all()
+
+        for conversion in conversions:
+            for column in COLUMNS:
+                path = getattr(conversion, column)
+                size = storage.size(path) if path else None
+                if size is None or artifacts.stored_path(path, codec) == path:
+                    skipped += 1
+                    continue
+                if dry_run:
+                    print(f"would convert {path} ({size / 1024:.0f} KB)")
+                    converted += 1
+                    continue
+
+                new_path = artifacts.compress_file(path, codec)
+                storage.persist(new_path)
+                new_size = os.path.getsize(new_path)
+                setattr(conversion, column, new_path)
+                # Downloads use the checksum as ETag, so it follows the stored bytes
+                fmt = column[:-len("_path")]
+                if fmt in (conversion.checksums or {}):
+                    conversion.checksums = {**conversion.checksums, fmt: artifacts.file_checksum(new_path)}
+                if fmt in (conversion.sizes or {}):
+                    usage.record_sizes(conversion, {fmt: new_size})
+                db.commit()
+                # Only drop the original once the new path is recorded
+                storage.delete(path)
+                storage.release(new_path)
+
+                before += size
+                after += new_size
+                converted += 1
+                print(f"{path} -> {os.path.basename(new_path)} ({size / 1024:.0f} KB -> {new_size / 1024:.0f} KB)")
+
+        print(f"✅ {converted} artifact(s) {'to convert' if dry_run else 'converted'}, {skipped} skipped")
+        if before:
+            print(f"📦 {before / 1024 / 1024:.1f} MB -> {after / 1024 / 1024:.1f} MB ({1 - after / before:.0%} saved)")
+
+    except Exception as e:
+        print(f"❌ Error compressing artifacts: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compress stored JSON and TXT artifacts")
+    parser.add_argument("--codec", default=settings.ARTIFACT_COMPRESSION, choices=["gzip", "zstd", "none"])
+    parser.add_argument("--dry-run", action="store_true", help="list the files without converting them")
+    args = parser.parse_args()
+    compress_artifacts(args.codec, args.dry_run)
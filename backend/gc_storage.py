@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Expire old source audio and remove orphaned files from storage.
+
+    python gc_storage.py [--dry-run]
+
+Uses AUDIO_RETENTION_DAYS and ORPHAN_GRACE_HOURS; the app runs the same
+sweep in the background every STORAGE_GC_INTERVAL_HOURS.
+"""
+
+import sys
+import os
+import argparse
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal
+from app.storage_gc import sweep
+
+def gc_storage(dry_run: bool = False):
+    db = SessionLocal()
+    try:
+        report = sweep(db, dry_run)
+        verb = "would be" if dry_run else "were"
+        print(f"✅ {report['expired_audio']} expired audio file(s) and {report['orphans']} orphan(s) {verb} removed")
+        print(f"📦 {report['bytes_reclaimed'] / 1024 / 1024:.1f} MB {'reclaimable' if dry_run else 'reclaimed'} in {report['seconds']}s")
+        if report["errors"]:
+            print(f"⚠️  {report['errors']} file(s) could not be removed")
+    except Exception as e:
+        print(f"❌ Error collecting storage: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Expire old audio and remove orphaned files")
+    parser.add_argument("--dry-run", action="store_true", help="report what would be removed")
+    args = parser.parse_args()
+    gc_storage(args.dry_run)
@@ -8,17 +8,33 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from app.database import engine, SessionLocal, Base
-from app.models import User
-from app.auth import get_password_hash
+from app.database import engine, SessionLocal, upgrade_schema
+from app.models import Conversion, UsageRollup, User
 
 def init_database():
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
+    # Create all tables and add any new columns
+    upgrade_schema(engine)
     
     db = SessionLocal()
     
     try:
+        # Users that predate the usage counters get them computed once
+        pending = [user_id for (user_id,) in db.query(User.id).filter(
+            (User.usage_bytes.is_(None)) | (User.usage_failures.is_(None))
+        )]
+        if pending:
+            from app import usage
+            usage.rebuild(db, pending)
+            db.commit()
+            print(f"📊 Usage counters computed for {len(pending)} user(s)")
+        
+        # Analytics rollups start from the existing conversions once
+        if not db.query(UsageRollup.period).first() and db.query(Conversion.id).first():
+            from app import analytics
+            count = analytics.backfill(db)
+            db.commit()
+            print(f"📊 Analytics rollups computed from {count} conversion(s)")
+        
         # Check if admin already exists
         existing_admin = db.query(User).filter(User.username == "admin").first()
         
@@ -26,6 +42,9 @@ def init_database():
             print("Admin user already exists!")
             return
         
+        # Imported only when needed: this script runs before every server start
+        from app.auth import get_password_hash
+        
         # Create default admin user with unlimited credits (-1)
         admin_user = User(
             email="admin@example.com",
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Recompute every user's usage counters (conversions, minutes, stored bytes
+per kind) from the stored files. The app maintains the counters itself;
+run this only if they drifted, e.g. after files were removed by hand.
+
+    python rebuild_usage.py [--user-id ID ...]
+"""
+
+import sys
+import os
+import argparse
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal
+from app import usage
+
+def rebuild_usage(user_ids=None):
+    db = SessionLocal()
+    try:
+        count = usage.rebuild(db, user_ids)
+        db.commit()
+        print(f"✅ Usage counters rebuilt for {count} user(s)")
+    except Exception as e:
+        print(f"❌ Error rebuilding usage counters: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute per-user usage counters")
+    parser.add_argument("--user-id", type=int, action="append", help="only these users (repeatable)")
+    args = parser.parse_args()
+    rebuild_usage(args.user_id)
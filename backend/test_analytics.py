@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test script for the hourly/daily analytics rollups
+"""
+
+import sys
+import os
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app import analytics, models
+from app.database import Base
+
+def _session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+def _conversions(db):
+    user = models.User(email="a@x.com", username="a", hashed_password="x")
+    db.add(user)
+    db.flush()
+    day = datetime(2024, 3, 1)
+    rows = [
+        # uploaded, finished, status, seconds of audio, processing seconds
+        (day + timedelta(hours=9, minutes=5), day + timedelta(hours=9, minutes=7), "completed", 600, 20.0),
+        (day + timedelta(hours=9, minutes=50), day + timedelta(hours=10, minutes=1), "failed", None, 4.0),
+        (day + timedelta(days=1, hours=23, minutes=59), day + timedelta(days=2, minutes=3), "completed", 1200, 40.0),
+        (day + timedelta(days=2, hours=1), None, "processing", None, None),
+    ]
+    for uploaded, finished, status, duration, seconds in rows:
+        conversion = models.Conversion(
+            user_id=user.id, original_filename="a", display_name="a", status=status, duration=duration,
+            created_at=uploaded, completed_at=finished, trace={"wall_seconds": seconds} if seconds else None
+        )
+        db.add(conversion)
+        analytics.conversion_uploaded(db, uploaded)
+        if finished:
+            analytics.conversion_finished(db, conversion, seconds, credits=duration / 60.0 if duration else 0.0)
+    db.commit()
+    return day
+
+def test_rollups():
+    """Events land in their UTC hour and day; ranges are zero-filled"""
+    print("Testing analytics rollups...")
+    db = _session()
+    day = _conversions(db)
+
+    daily = analytics.series(db, day, day + timedelta(days=3), "day")
+    assert [b["uploads"] for b in daily["buckets"]] == [2, 1, 1]
+    assert [b["completed"] for b in daily["buckets"]] == [1, 0, 1]
+    assert daily["totals"] == {
+        "uploads": 4, "completed": 2, "failed": 1, "minutes": 30.0, "credits": 30.0, "avg_processing_seconds": 21.33
+    }
+    hourly = analytics.series(db, day + timedelta(hours=9, minutes=30), day + timedelta(hours=11), "hour")
+    assert [b["start"] for b in hourly["buckets"]] == ["2024-03-01T09:00:00", "2024-03-01T10:00:00"]
+    nine, ten = hourly["buckets"]
+    assert nine["uploads"] == 2 and nine["completed"] == 1 and nine["avg_processing_seconds"] == 20.0
+    assert ten["failed"] == 1 and ten["uploads"] == 0 and ten["avg_processing_seconds"] == 4.0
+    empty = analytics.series(db, datetime(2023, 1, 1), datetime(2023, 1, 2), "day")
+    assert empty["buckets"][0]["uploads"] == 0 and empty["totals"]["avg_processing_seconds"] is None
+    try:
+        analytics.series(db, datetime(2000, 1, 1), datetime(2024, 1, 1), "hour")
+        assert False, "too many buckets must be refused"
+    except ValueError:
+        pass
+    print("✓ hourly and daily buckets")
+
+def test_backfill():
+    """Rebuilding from conversions reproduces the incremental rollups"""
+    print("Testing analytics backfill...")
+    db = _session()
+    day = _conversions(db)
+    rows = lambda: sorted(
+        (r.period, r.bucket, r.uploads, r.completed, r.failed, round(r.minutes, 6), r.processing_seconds, round(r.credits, 6))
+        for r in db.query(models.UsageRollup)
+    )
+    incremental = rows()
+    assert analytics.backfill(db) == 4
+    db.commit()
+    assert rows() == incremental
+    # A partial rebuild only replaces days from since
+    assert analytics.backfill(db, since=day + timedelta(days=1, hours=12)) == 2
+    db.commit()
+    assert rows() == incremental
+    print("✓ backfill matches incremental updates")
+
+if __name__ == "__main__":
+    test_rollups()
+    test_backfill()
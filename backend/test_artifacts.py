@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script for compressed artifact storage
+"""
+
+import sys
+import os
+import io
+import json
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import artifacts
+from app.deepgram_json import open_deepgram_json
+from app.converter import build_turns_from_deepgram_json, render_from_json
+from test_deepgram_json import make_response
+
+CODECS = ["none", "gzip"]
+try:
+    import zstandard  # noqa: F401
+    CODECS.append("zstd")
+except ImportError:
+    pass
+
+def test_artifacts():
+    """Round trips, codec switches and Accept-Encoding negotiation"""
+    print("Testing compressed artifacts...")
+    print("=" * 50)
+
+    data = make_response(2000)
+    raw = json.dumps(data, ensure_ascii=False).encode("utf-8")
+    expected, _ = build_turns_from_deepgram_json(data)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for codec in CODECS:
+            path = artifacts.stored_path(os.path.join(tmp, f"{codec}.json"), codec)
+            assert artifacts.content_encoding(path) == (None if codec == "none" else codec)
+            with artifacts.open_artifact(path, "wt") as f:
+                f.write(raw.decode("utf-8"))
+            assert b"".join(artifacts.iter_decompressed(path, chunk_size=1000)) == raw
+            with open_deepgram_json(path) as reader:
+                turns, _ = build_turns_from_deepgram_json(reader)
+            assert turns == expected
+            paths = render_from_json(path, "x", ["jsonl"])
+            assert paths["jsonl"] == os.path.join(tmp, f"{codec}.jsonl")
+            print(f"✓ {codec}: {len(raw) // 1024} KB stored as {os.path.getsize(path) // 1024} KB, turns match")
+
+        # Switching codecs keeps the original until the caller removes it
+        source = os.path.join(tmp, "none.json")
+        for codec in CODECS[1:] + ["none"]:
+            target = artifacts.compress_file(source, codec)
+            assert os.path.exists(source) and artifacts.content_encoding(target) == (None if codec == "none" else codec)
+            assert b"".join(artifacts.iter_decompressed(target)) == raw
+            if target != source:
+                os.remove(source)
+            source = target
+        assert source == os.path.join(tmp, "none.json")
+        assert not [name for name in os.listdir(tmp) if ".tmp" in name]
+        print("✓ compress_file round trip through every codec")
+
+    for header, codec, ok in [
+        ("gzip, deflate, br", "gzip", True),
+        ("x-gzip", "gzip", True),
+        ("gzip;q=0", "gzip", False),
+        ("deflate, zstd;q=0.5", "zstd", True),
+        ("*", "zstd", True),
+        ("", "gzip", False),
+        ("br", "gzip", False),
+    ]:
+        assert artifacts.accepts_encoding(header, codec) is ok, (header, codec)
+    print("✓ Accept-Encoding negotiation")
+
+    print("=" * 50)
+    print("✅ All artifact tests passed!")
+
+if __name__ == "__main__":
+    test_artifacts()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script for container-header duration probing
+"""
+
+import sys
+import os
+import io
+import struct
+import wave
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.audio_probe import probe_duration
+
+def make_wav(seconds: float, rate: int = 16000) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(b"\x00\x00" * int(seconds * rate))
+    return buf.getvalue()
+
+def make_flac(seconds: float, rate: int = 44100) -> bytes:
+    total = int(seconds * rate)
+    packed = (rate << 44) | (1 << 41) | (15 << 36) | total
+    info = b"\x10\x00\x10\x00" + b"\x00" * 6 + packed.to_bytes(8, "big") + b"\x00" * 16
+    return b"fLaC" + bytes([0x80]) + len(info).to_bytes(3, "big") + info + b"\x00" * 100
+
+def make_mp4(seconds: float, timescale: int = 1000) -> bytes:
+    ftyp = struct.pack(">I4s4sI4s", 20, b"ftyp", b"M4A ", 0, b"isom")
+    mdat = struct.pack(">I4s", 1008, b"mdat") + b"\x00" * 1000
+    mvhd_body = b"\x00\x00\x00\x00" + struct.pack(">IIII", 0, 0, timescale, int(seconds * timescale)) + b"\x00" * 80
+    mvhd = struct.pack(">I4s", 8 + len(mvhd_body), b"mvhd") + mvhd_body
+    moov = struct.pack(">I4s", 8 + len(mvhd), b"moov") + mvhd
+    return ftyp + mdat + moov  # moov at the end, as many encoders write it
+
+def ogg_page(granule: int, packet: bytes) -> bytes:
+    return (b"OggS" + b"\x00\x02" + struct.pack("<q", granule) + b"\x00" * 12
+            + bytes([1, len(packet)]) + packet)
+
+def make_ogg_vorbis(seconds: float, rate: int = 44100) -> bytes:
+    ident = b"\x01vorbis" + struct.pack("<IBI", 0, 2, rate) + b"\x00" * 14
+    return ogg_page(0, ident) + b"\x00" * 5000 + ogg_page(int(seconds * rate), b"\x00" * 10)
+
+def make_ogg_opus(seconds: float, pre_skip: int = 312) -> bytes:
+    head = b"OpusHead" + bytes([1, 2]) + struct.pack("<HI", pre_skip, 48000) + b"\x00\x00\x00"
+    return ogg_page(0, head) + b"\x00" * 5000 + ogg_page(int(seconds * 48000) + pre_skip, b"\x00" * 10)
+
+def make_mp3_cbr(seconds: float) -> bytes:
+    # MPEG-1 Layer III, 128 kbps, 44.1 kHz, stereo; preceded by an ID3v2 tag
+    header = bytes([0xFF, 0xFB, 0x90, 0x00])
+    frame_len = 144 * 128000 // 44100
+    frames = int(seconds * 44100 / 1152)
+    id3 = b"ID3\x03\x00\x00" + bytes([0, 0, 0, 20]) + b"\x00" * 20
+    return id3 + (header + b"\x00" * (frame_len - 4)) * frames
+
+def make_mp3_false_sync(seconds: float) -> bytes:
+    # A valid-looking 32 kbps header in junk before the real 128 kbps frames
+    junk = bytes([0xFF, 0xFB, 0x10, 0x00]) + b"\x01" * 200
+    return junk + make_mp3_cbr(seconds)[30:]
+
+def make_mp3_xing(seconds: float) -> bytes:
+    # MPEG-1 Layer III VBR with a Xing header carrying the frame count
+    header = bytes([0xFF, 0xFB, 0x90, 0x00])
+    frames = int(seconds * 44100 / 1152)
+    first = header + b"\x00" * 32 + b"Xing" + struct.pack(">II", 1, frames)
+    first += b"\x00" * (417 - len(first))
+    return first + (header + b"\x00" * 413) * 10  # payload size is irrelevant for VBR
+
+def test_audio_probe():
+    """Probe synthetic files of every supported container"""
+    print("Testing audio duration probing...")
+    print("=" * 50)
+
+    cases = [
+        ("WAV", ".wav", make_wav(3.5), 3.5, 0.01),
+        ("FLAC", ".flac", make_flac(125.0), 125.0, 0.01),
+        ("M4A", ".m4a", make_mp4(3600.0), 3600.0, 0.01),
+        ("OGG Vorbis", ".ogg", make_ogg_vorbis(61.0), 61.0, 0.01),
+        ("OGG Opus", ".opus", make_ogg_opus(42.0), 42.0, 0.01),
+        ("MP3 CBR", ".mp3", make_mp3_cbr(30.0), 30.0, 0.1),
+        ("MP3 Xing", ".mp3", make_mp3_xing(7200.0), 7200.0, 0.1),
+        ("MP3 junk", ".mp3", make_mp3_false_sync(30.0), 30.0, 0.1),
+    ]
+
+    passed = 0
+    failed = 0
+    for description, ext, data, expected, tolerance in cases:
+        result = probe_duration(io.BytesIO(data), ext)
+        ok = result is not None and abs(result - expected) <= tolerance * max(1.0, expected / 100)
+        passed += ok
+        failed += not ok
+        print(f"{'✓' if ok else '✗'} {description:12} | expected {expected:8.1f}s | got {result}")
+
+    for description, ext, data in [
+        ("Unknown ext", ".webm", make_wav(1.0)),
+        ("Garbage WAV", ".wav", b"not a wav file at all"),
+        ("Empty MP3", ".mp3", b""),
+    ]:
+        result = probe_duration(io.BytesIO(data), ext)
+        ok = result is None
+        passed += ok
+        failed += not ok
+        print(f"{'✓' if ok else '✗'} {description:12} | expected None | got {result}")
+
+    print("=" * 50)
+    print(f"Results: {passed} passed, {failed} failed")
+    assert failed == 0
+
+if __name__ == "__main__":
+    test_audio_probe()
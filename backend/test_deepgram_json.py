@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test script for the streaming Deepgram JSON reader
+"""
+
+import sys
+import os
+import io
+import json
+import random
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import deepgram_json
+from app.deepgram_json import DeepgramJSONReader
+from app.converter import build_turns_from_deepgram_json
+
+def make_response(n_words: int, seed: int = 1) -> dict:
+    rnd = random.Random(seed)
+    vocab = ["bonjour", "l'équipe", 'dit "oui"', "C:\\temp\\", "ok", "€100", "😀", "done"]
+    words, t, speaker = [], 0.0, 0
+    for _ in range(n_words):
+        if rnd.random() < 0.05:
+            speaker = rnd.randint(0, 2)
+        t += rnd.choice([0.3, 0.4, 1.5])
+        w = rnd.choice(vocab)
+        words.append({"word": w.lower(), "start": t, "end": t + 0.25, "confidence": rnd.random(),
+                      "punctuated_word": w + rnd.choice(["", "", ".", ","]), "speaker": speaker})
+    transcript = " ".join(w["punctuated_word"] for w in words)
+    return {
+        "metadata": {"duration": t + 1, "channels": 1, "model_info": {"abc": {"name": "nova-3"}}},
+        "results": {
+            "channels": [{
+                "search": None,
+                "alternatives": [{
+                    "transcript": transcript,
+                    "confidence": 0.9,
+                    "words": words,
+                    "paragraphs": {"transcript": transcript, "paragraphs": [{"sentences": [{"text": "}]{["}]}]},
+                }],
+                "detected_language": "fr",
+            }],
+            "utterances": [{"words": words[:10]}],
+        },
+    }
+
+def test_deepgram_json():
+    """Streaming parse must produce the same turns as the in-memory dict"""
+    print("Testing streaming Deepgram JSON reader...")
+    print("=" * 50)
+
+    original_chunk = deepgram_json.CHUNK_SIZE
+    try:
+        for chunk_size in (7, 1024, original_chunk):
+            deepgram_json.CHUNK_SIZE = chunk_size
+            for n_words in (0, 1, 500):
+                data = make_response(n_words)
+                expected, expected_meta = build_turns_from_deepgram_json(data)
+                reader = DeepgramJSONReader(io.StringIO(json.dumps(data, ensure_ascii=False, indent=1)))
+                assert reader.metadata == expected_meta
+                assert reader.transcript == data["results"]["channels"][0]["alternatives"][0]["transcript"]
+                turns, meta = build_turns_from_deepgram_json(reader)
+                assert turns == expected, (chunk_size, n_words)
+                assert reader.detected_language == "fr"
+            print(f"✓ chunk size {chunk_size}: turns match for 0, 1 and 500 words")
+    finally:
+        deepgram_json.CHUNK_SIZE = original_chunk
+
+    # Responses without channels or words
+    for data, expected_turns in [
+        ({"metadata": {"duration": 1}, "results": {"channels": []}}, 0),
+        ({"metadata": {}, "results": None}, 0),
+        ({"metadata": {}, "results": {"channels": [{"alternatives": [{"transcript": "hi", "confidence": 0.5}]}]}}, 1),
+    ]:
+        turns, _ = build_turns_from_deepgram_json(DeepgramJSONReader(io.StringIO(json.dumps(data))))
+        assert len(turns) == expected_turns
+    print("✓ empty and word-less responses")
+
+    print("=" * 50)
+    print("✅ All streaming reader tests passed!")
+
+def test_turn_options():
+    """Pause threshold, speaker merging and short-turn folding"""
+    print("Testing turn segmentation options...")
+    words = [
+        {"punctuated_word": "Hello", "start": 0.0, "end": 0.5, "speaker": 0},
+        {"punctuated_word": "there.", "start": 2.0, "end": 2.5, "speaker": 0},
+        {"punctuated_word": "Yeah.", "start": 2.6, "end": 2.9, "speaker": 1},
+        {"punctuated_word": "So", "start": 3.0, "end": 3.3, "speaker": 0},
+        {"punctuated_word": "anyway.", "start": 3.4, "end": 4.0, "speaker": 0},
+        {"punctuated_word": "Right.", "start": 5.0, "end": 6.5, "speaker": 2},
+    ]
+    data = {"metadata": {}, "results": {"channels": [{"alternatives": [{"words": words}]}]}}
+
+    turns, _ = build_turns_from_deepgram_json(data)
+    assert [t["speaker"] for t in turns] == [0, 0, 1, 0, 2]
+
+    turns, _ = build_turns_from_deepgram_json(data, pause_break=2.0)
+    assert [t["text"] for t in turns] == ["Hello there.", "Yeah.", "So anyway.", "Right."]
+
+    turns, _ = build_turns_from_deepgram_json(data, pause_break=2.0, min_turn_duration=0.5)
+    assert [t["text"] for t in turns] == ["Hello there. Yeah. So anyway.", "Right."]
+    assert turns[0]["end"] == 4.0
+
+    turns, _ = build_turns_from_deepgram_json(data, pause_break=2.0, speaker_map={1: 0, 2: 0})
+    assert [t["text"] for t in turns] == ["Hello there. Yeah. So anyway. Right."]
+    print("✓ pause_break, min_turn_duration and speaker_map")
+
+if __name__ == "__main__":
+    test_deepgram_json()
+    test_turn_options()
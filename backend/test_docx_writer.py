@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test script for the streaming DOCX writer
+"""
+
+import sys
+import os
+import tempfile
+from pathlib import Path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from docx import Document
+from app.converter import render_docx
+from app.docx_writer import render_docx as render_docx_stream
+
+def describe(path):
+    """Paragraph-level summary of a document as python-docx reads it"""
+    doc = Document(str(path))
+    normal = doc.styles["Normal"].font
+    paragraphs = []
+    for p in doc.paragraphs:
+        paragraphs.append((
+            p.style.name,
+            p.alignment,
+            p.text,
+            [(r.bold, r.italic) for r in p.runs],
+            p.paragraph_format.space_after,
+        ))
+    return normal.name, normal.size, paragraphs
+
+def test_docx_writer():
+    """The streaming writer must produce the same document as python-docx"""
+    print("Testing streaming DOCX writer...")
+    print("=" * 50)
+
+    turns = [
+        {"speaker": 0, "start": 0.0, "end": 12.4, "text": "Bonjour à tous, on commence ?"},
+        {"speaker": 1, "start": 13.0, "end": 75.9, "text": "Oui & <d'accord> \"ok\"  spaces"},
+        {"speaker": 0, "start": None, "end": None, "text": "No timing here"},
+    ]
+    meta = {"duration": 3600.5, "channels": 1, "model_info": {"x": {"name": "general-nova-3"}}}
+
+    tmp = Path(tempfile.mkdtemp())
+    render_docx(tmp / "reference.docx", "Réunion <équipe> & co", iter(turns), meta)
+    render_docx_stream(tmp / "stream.docx", "Réunion <équipe> & co", iter(turns), meta)
+
+    ref_font, ref_size, reference = describe(tmp / "reference.docx")
+    font, size, streamed = describe(tmp / "stream.docx")
+    assert (font, size) == (ref_font, ref_size) == ("Calibri", 139700), (font, size)
+    print("✓ Normal style is Calibri 11pt")
+
+    assert len(streamed) == len(reference), (len(streamed), len(reference))
+    for ref, got in zip(reference, streamed):
+        assert ref == got, (ref, got)
+    print(f"✓ {len(streamed)} paragraphs match (style, alignment, text, bold/italic, spacing)")
+
+    # python-docx refuses control characters; the stream writer drops them
+    render_docx_stream(tmp / "control.docx", "x", [{"speaker": 0, "start": 0, "end": 1, "text": "a\x0bb\x00c"}], {})
+    assert describe(tmp / "control.docx")[2][4][2] == "abc"
+    print("✓ control characters are stripped")
+
+    print("=" * 50)
+    print("✅ All DOCX writer tests passed!")
+
+if __name__ == "__main__":
+    test_docx_writer()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test script for download validators and byte ranges
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.downloads import parse_range, etag_matches, attachment_header
+
+def test_downloads():
+    """Range parsing, If-None-Match matching and Content-Disposition"""
+    print("Testing download helpers...")
+    print("=" * 50)
+
+    size = 1000
+    for header, expected in [
+        ("bytes=0-99", (0, 99)),
+        ("bytes=900-", (900, 999)),
+        ("bytes=900-5000", (900, 999)),
+        ("bytes=-100", (900, 999)),
+        ("bytes=-5000", (0, 999)),
+        ("bytes=5-4", None),          # invalid, ignored
+        ("bytes=0-9,20-29", None),    # multiple ranges are served in full
+        ("items=0-9", None),
+        ("bytes=abc", None),
+        ("bytes=1-x", None),
+    ]:
+        assert parse_range(header, size) == expected, header
+    for header in ("bytes=1000-", "bytes=2000-3000", "bytes=-0"):
+        try:
+            parse_range(header, size)
+            assert False, header
+        except ValueError:
+            pass
+    print("✓ Range parsing")
+
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('"x", "abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abc-identity"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+    print("✓ If-None-Match")
+
+    assert attachment_header("report.pdf") == 'attachment; filename="report.pdf"'
+    assert attachment_header("réunion.pdf") == "attachment; filename*=utf-8''r%C3%A9union.pdf"
+    print("✓ Content-Disposition")
+
+    print("=" * 50)
+    print("✅ All download tests passed!")
+
+if __name__ == "__main__":
+    test_downloads()
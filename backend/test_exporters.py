@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test script for the SRT, WebVTT and JSONL exporters
+"""
+
+import sys
+import os
+import json
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import exporters, formats
+from app.exporters import iter_cues, render_srt, render_vtt, render_jsonl
+
+TURNS = [
+    {"speaker": 0, "start": 0.0, "end": 1.5, "text": "Hello there.", "avg_conf": 0.9},
+    {"speaker": 1, "start": 2.0, "end": 3.2346, "text": "Fish & <chips>?", "avg_conf": None},
+    {"speaker": 0, "start": 3600.0, "end": 3630.0, "text": " ".join(["word"] * 60), "avg_conf": 0.5},
+]
+
+def test_exporters():
+    """Captions and JSONL rendered from a turn list"""
+    print("Testing exporters...")
+    print("=" * 50)
+
+    assert exporters._clock(3723.0456, ",") == "01:02:03,046"
+    assert exporters._clock(-1, ".") == "00:00:00.000"
+    print("✓ timestamps with millisecond precision")
+
+    cues = list(iter_cues(TURNS, {}))
+    long_cues = [c for c in cues if c[0] >= 3600]
+    assert len(long_cues) > 1
+    assert all(len(c[3]) <= exporters.MAX_CUE_CHARS for c in cues)
+    assert long_cues[0][0] == 3600.0 and long_cues[-1][1] == 3630.0
+    assert all(a[1] == b[0] for a, b in zip(long_cues, long_cues[1:]))
+    assert " ".join(c[3] for c in long_cues) == TURNS[2]["text"]
+    print(f"✓ long turn split into {len(long_cues)} contiguous cues")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        srt_path = os.path.join(tmp, "t.srt")
+        render_srt(srt_path, "t", iter(TURNS), {})
+        srt = open(srt_path, encoding="utf-8").read()
+        assert srt.startswith("1\n00:00:00,000 --> 00:00:01,500\nSpeaker 0: Hello there.\n\n2\n")
+        assert "00:00:02,000 --> 00:00:03,235\nSpeaker 1: Fish & <chips>?" in srt
+        assert srt.count("Speaker 0:") == 2
+        print("✓ SRT")
+
+        vtt_path = os.path.join(tmp, "t.vtt")
+        render_vtt(vtt_path, "t", iter(TURNS), {})
+        vtt = open(vtt_path, encoding="utf-8").read()
+        assert vtt.startswith("WEBVTT\n\n00:00:00.000 --> 00:00:01.500\n<v Speaker 0>Hello there.\n")
+        assert "<v Speaker 1>Fish &amp; &lt;chips&gt;?" in vtt
+        print("✓ WebVTT")
+
+        jsonl_path = os.path.join(tmp, "t.jsonl")
+        render_jsonl(jsonl_path, "t", iter(TURNS), {})
+        rows = [json.loads(line) for line in open(jsonl_path, encoding="utf-8")]
+        assert rows[1] == {"speaker": 1, "start": 2.0, "end": 3.2346, "text": "Fish & <chips>?", "confidence": None}
+        assert len(rows) == 3
+        print("✓ JSONL")
+
+    # Registry
+    assert formats.parse_formats(None) == formats.default_formats()
+    assert formats.parse_formats("SRT, vtt,srt") == ["srt", "vtt"]
+    for bad in ("txt", "exe", ","):
+        try:
+            formats.parse_formats(bad)
+            assert False, bad
+        except ValueError:
+            pass
+    for name in formats.renderable():
+        assert callable(formats.FORMATS[name].render_function())
+    print("✓ format registry")
+
+    print("=" * 50)
+    print("✅ All exporter tests passed!")
+
+if __name__ == "__main__":
+    test_exporters()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Test script for the metrics registry, stage timing and multi-process aggregation
+"""
+
+import sys
+import os
+import json
+import socket
+import tempfile
+import urllib.error
+import urllib.request
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import metrics
+from app.config import settings
+
+def _sample(text: str, line_prefix: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{line_prefix} not found")
+
+def test_stage_timer():
+    """Stages are observed; a failure is counted under the stage that was running"""
+    print("Testing stage timer...")
+    timer = metrics.StageTimer()
+    with timer.stage("transcribe"):
+        pass
+    spent = [0.0]
+    assert list(timer.timed_iter(iter(range(3)), spent)) == [0, 1, 2] and spent[0] >= 0
+    try:
+        with timer.stage("render_pdf"):
+            raise MemoryError()
+    except MemoryError as e:
+        timer.failed(e)
+    assert set(timer.durations) == {"transcribe"}
+    text = metrics.render()
+    assert _sample(text, 'conversion_failures_total{error="MemoryError",stage="render_pdf"}') >= 1
+    assert _sample(text, 'pipeline_stage_seconds_count{stage="transcribe"}') >= 1
+    assert 'pipeline_stage_seconds_bucket{stage="transcribe",le="+Inf"}' in text
+    print("✓ stages timed, failure attributed to render_pdf")
+
+def test_trace_events():
+    """Stages become trace events offset from the origin"""
+    print("Testing trace events...")
+    timer = metrics.StageTimer(origin=1000.0)
+    timer.record("queue_wait", 2.5, 1000.0)
+    timer.record("render_pdf", 1.25, 1003.0, turns_seconds=0.5, bytes=42)
+    timer.record("build_turns", 0.5, trace=False)
+    trace = timer.trace(speed=3.0)
+    assert trace == {
+        "stages": [
+            {"stage": "queue_wait", "start": 0.0, "seconds": 2.5},
+            {"stage": "render_pdf", "start": 3.0, "seconds": 1.25, "turns_seconds": 0.5, "bytes": 42},
+        ],
+        "speed": 3.0,
+    }
+    assert timer.durations["build_turns"] == 0.5
+    print("✓ events with offsets and extra fields")
+
+def test_multiprocess_aggregation():
+    """Snapshots of other workers are summed; gauges of exited (or pid-reusing) workers are ignored"""
+    print("Testing multi-process aggregation...")
+    saved = settings.METRICS_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.METRICS_DIR = tmp
+        try:
+            before = metrics.render()
+            other = {
+                "conversions_finished_total": [[[["status", "completed"]], 5.0]],
+                "transcriptions_in_flight": [[[], 2.0]],
+                "pipeline_stage_seconds": [[[["stage", "agg"]], [1] + [0] * len(metrics.STAGE_BUCKETS) + [0.004]]],
+            }
+            parent = os.getppid()
+            # A live worker (our parent), one that has exited, one from before
+            # a restart whose pid is now our parent's (the volume outlives
+            # processes), and one written before snapshots named the instance
+            for name in (
+                metrics._snapshot_name(parent), "999999-x.1.json", f"{parent}-{metrics._BOOT_ID}.1.json", f"{parent}.json"
+            ):
+                with open(os.path.join(tmp, name), "w") as f:
+                    json.dump({"pid": parent, "metrics": other}, f)
+            text = metrics.render()
+            finished = 'conversions_finished_total{status="completed"}'
+            previous = _sample(before, finished) if finished in before else 0
+            assert _sample(text, finished) == previous + 20
+            assert _sample(text, "transcriptions_in_flight") == _sample(before, "transcriptions_in_flight") + 2
+            assert _sample(text, 'pipeline_stage_seconds_count{stage="agg"}') == 4
+            assert _sample(text, 'pipeline_stage_seconds_bucket{stage="agg",le="0.01"}') == 4
+
+            metrics.flush()
+            assert os.path.exists(os.path.join(tmp, metrics._snapshot_name(os.getpid())))
+            # This process's own snapshot is not counted twice
+            assert _sample(metrics.render(), finished) == previous + 20
+        finally:
+            settings.METRICS_DIR = saved
+    print("✓ counters and histograms summed, live gauges only")
+
+def test_internal_server():
+    """Scrapes are served on the internal port by whichever worker binds it first"""
+    print("Testing internal metrics listener...")
+    with socket.socket() as taken:
+        taken.bind(("127.0.0.1", 0))
+        taken.listen()
+        # Another worker already serves this port
+        assert metrics.start_server(taken.getsockname()[1], "127.0.0.1") is None
+    assert metrics.start_server(0) is None  # disabled
+    server = metrics.start_server(_free_port(), "127.0.0.1")
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(url + "/metrics") as response:
+            assert response.headers["Content-Type"].startswith("text/plain")
+            assert "# TYPE conversions_finished_total counter" in response.read().decode()
+        try:
+            urllib.request.urlopen(url + "/api/health")
+            assert False, "only /metrics is served"
+        except urllib.error.HTTPError as e:
+            assert e.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+        metrics._server = None
+    print("✓ /metrics served, other workers and other paths refused")
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+if __name__ == "__main__":
+    test_stage_timer()
+    test_trace_events()
+    test_multiprocess_aggregation()
+    test_internal_server()
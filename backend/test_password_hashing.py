@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test script for the password hashing executor and rehash-on-login
+"""
+
+import sys
+import os
+import asyncio
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from passlib.context import CryptContext
+from app import hashing
+
+def test_password_hashing():
+    """Hash, verify and upgrade outdated hashes through the executor"""
+    print("Testing password hashing executor...")
+    print("=" * 50)
+
+    async def run():
+        hashed = await hashing.hash_password("LongEnough1")
+        assert await hashing.verify_password("LongEnough1", hashed)
+        assert not await hashing.verify_password("wrong", hashed)
+        print("✓ hash/verify round-trip")
+
+        # A hash made with a different cost must be upgraded on verify
+        rounds = hashing.pwd_context.handler("bcrypt").default_rounds
+        old_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds + 1 if rounds < 31 else rounds - 1)
+        old_hash = old_context.hash("LongEnough1")
+        is_valid, new_hash = await hashing.verify_and_update("LongEnough1", old_hash)
+        assert is_valid and new_hash and new_hash != old_hash
+        assert hashing.pwd_context.verify("LongEnough1", new_hash)
+        print("✓ outdated hash upgraded")
+
+        is_valid, new_hash = await hashing.verify_and_update("LongEnough1", hashed)
+        assert is_valid and new_hash is None
+        print("✓ current hash left untouched")
+
+        stats = hashing.hashing_stats()
+        assert stats["pending"] == 0 and stats["completed"] >= 5 and stats["rehashed"] >= 1
+        print(f"✓ stats: {stats['completed']} completed, {stats['rehashed']} rehashed")
+
+        # Requests cancelled while their job waits in the queue (client gone,
+        # shutdown) must not leave it counted as pending
+        waiting = [asyncio.ensure_future(hashing.hash_password("LongEnough1")) for _ in range(6)]
+        await asyncio.sleep(0.01)
+        for task in waiting:
+            task.cancel()
+        await asyncio.gather(*waiting, return_exceptions=True)
+        await asyncio.to_thread(lambda: hashing._executor.submit(lambda: None).result())
+        for _ in range(100):
+            if hashing.hashing_stats()["pending"] == 0:
+                break
+            await asyncio.sleep(0.05)
+        assert hashing.hashing_stats()["pending"] == 0
+        print("✓ cancelled requests release their queue slot")
+
+    asyncio.run(run())
+    print("=" * 50)
+    print("✅ All hashing tests passed!")
+
+if __name__ == "__main__":
+    test_password_hashing()
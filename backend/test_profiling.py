@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for admin request profiling. The profiled part needs
+pyinstrument (the profiling extra).
+"""
+
+import sys
+import os
+import asyncio
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+from fastapi import FastAPI
+from app import profiling
+from app.config import settings
+
+class _Admin:
+    username = "admin"
+
+def _app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/work")
+    async def work():
+        return {"total": sum(i * i for i in range(20000))}
+
+    app.add_middleware(profiling.ProfilingMiddleware)
+    return app
+
+def test_profiling_flags():
+    """Only an explicit flag asks for a profile; report ids cannot escape the directory"""
+    print("Testing profiling flags...")
+    scope = lambda query=b"", headers=(): {"query_string": query, "headers": list(headers)}
+    assert not profiling._requested(scope())
+    assert not profiling._requested(scope(b"profiled=1&x=2"))
+    assert not profiling._requested(scope(b"profile=0"))
+    assert profiling._requested(scope(b"a=1&profile=1"))
+    assert profiling._requested(scope(headers=[(b"x-profile", b"1")]))
+    assert profiling.report_path("20240101T000000-0123abcd").endswith("20240101T000000-0123abcd.html")
+    assert profiling.report_path("../../etc/passwd") is None
+    print("✓ flags and report ids")
+
+def test_profiled_request():
+    """Admin requests get a stored report and a link; others pass through untouched"""
+    print("Testing profiled requests...")
+    try:
+        import pyinstrument  # noqa: F401
+    except ImportError:
+        print("- skipped (pyinstrument not installed)")
+        return
+
+    saved = (settings.PROFILES_DIR, settings.PROFILE_KEEP, profiling._admin)
+    admin = [None]
+
+    async def fake_admin(scope):
+        return admin[0]
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=_app()), base_url="http://t") as client:
+            r = await client.get("/work?profile=1")
+            assert r.status_code == 200 and "x-profile-report" not in r.headers  # not an admin
+            admin[0] = _Admin()
+            r = await client.get("/work")
+            assert "x-profile-report" not in r.headers
+            links = []
+            for _ in range(3):
+                r = await client.get("/work", headers={"X-Profile": "1"})
+                assert r.status_code == 200 and r.json()["total"] > 0
+                links.append(r.headers["x-profile-report"])
+                await asyncio.sleep(1.1)  # ids have one-second resolution
+            return links
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.PROFILES_DIR, settings.PROFILE_KEEP, profiling._admin = tmp, 2, fake_admin
+        try:
+            links = asyncio.run(run())
+            reports = profiling.list_reports()
+            assert [r["id"] for r in reports] == [link.rsplit("/", 1)[1] for link in links[:0:-1]]
+            assert reports[0]["path"] == "/work" and reports[0]["status"] == 200 and reports[0]["admin"] == "admin"
+            with open(profiling.report_path(reports[0]["id"])) as f:
+                assert "<html" in f.read().lower()
+            assert len(os.listdir(tmp)) == 4  # oldest pruned, html and json per report
+        finally:
+            settings.PROFILES_DIR, settings.PROFILE_KEEP, profiling._admin = saved
+    print("✓ reports stored, linked and pruned")
+
+if __name__ == "__main__":
+    test_profiling_flags()
+    test_profiled_request()
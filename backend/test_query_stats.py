@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script for SQL statement statistics
+"""
+
+import sys
+import os
+import asyncio
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+from fastapi import BackgroundTasks, FastAPI
+from sqlalchemy import create_engine, text
+from app import query_stats
+from app.config import settings
+
+def test_normalize():
+    """Calls that differ only in their values share one statement"""
+    print("Testing statement normalisation...")
+    n = query_stats.normalize
+    assert n("SELECT * FROM users WHERE id IN (?, ?, ?) LIMIT ?") == n("SELECT *  FROM users\nWHERE id IN (?, ?) LIMIT ?")
+    assert n("SELECT * FROM users WHERE id IN (?, ?, ?)") == "SELECT * FROM users WHERE id IN (?, ...)"
+    assert n("SELECT a::text FROM t WHERE b = %(b_1)s AND c = 'it''s' AND d > 10.5 AND anon_1.e = 3") == \
+        "SELECT a::text FROM t WHERE b = ? AND c = ? AND d > ? AND anon_1.e = ?"
+    assert n("INSERT INTO t (a, b) VALUES (?, ?), (?, ?), (?, ?)") == "INSERT INTO t (a, b) VALUES (?, ...), ..."
+    assert query_stats.parameter_shape({"name": "x", "id": 1}) == {"name": "str", "id": "int"}
+    assert query_stats.parameter_shape([(1, "a"), (2, "b")], executemany=True) == "2 x ['int', 'str']"
+    print("✓ statements normalised, parameters reduced to their types")
+
+def test_request_stats():
+    """Queries are timed per statement and counted per route; background work is not the request's"""
+    print("Testing per-request query counts...")
+    engine = create_engine("sqlite://")
+    query_stats.instrument(engine)
+    app = FastAPI()
+
+    def query(value: int):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT :v"), {"v": value})
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int, background_tasks: BackgroundTasks):
+        query(item_id)
+        await asyncio.to_thread(query, item_id + 1)  # threads inherit the request
+        background_tasks.add_task(query, 0)
+        return {"id": item_id}
+
+    app.add_middleware(query_stats.QueryStatsMiddleware)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+            for i in range(3):
+                assert (await client.get(f"/items/{i}")).status_code == 200
+
+    saved = settings.SLOW_QUERY_MS
+    query_stats.reset()
+    try:
+        settings.SLOW_QUERY_MS = 0.000001  # every query is slow
+        asyncio.run(run())
+        query(5)  # outside any request
+    finally:
+        settings.SLOW_QUERY_MS = saved
+    stats = query_stats.stats()
+    statement = next(s for s in stats["statements"] if s["statement"] == "SELECT ?")
+    assert statement["count"] == 10
+    route = next(r for r in stats["routes"] if r["route"] == "/items/{item_id}")
+    assert route["requests"] == 3 and route["queries_per_request"] == 2 and route["max_queries"] == 2
+    slow = stats["slow_queries"]
+    assert len(slow) == 10 and slow[0]["route"] is None and slow[-1]["route"] == "/items/{item_id}"
+    assert slow[-1]["parameters"] in (["int"], ("int",))
+    query_stats.reset()
+    assert query_stats.stats()["statements"] == []
+    print("✓ 10 statements timed, 2 queries per request, slow queries kept")
+
+if __name__ == "__main__":
+    test_normalize()
+    test_request_stats()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared SQLite rate limiter storage
+"""
+
+import sys
+import os
+import tempfile
+import time
+import multiprocessing
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import MovingWindowRateLimiter, FixedWindowRateLimiter
+from app.rate_limit_storage import SQLiteStorage
+
+def _hit_login(uri, queue):
+    limiter = MovingWindowRateLimiter(storage_from_string(uri))
+    queue.put(sum(1 for _ in range(10) if limiter.hit(parse("5 per minute"), "1.2.3.4:/api/auth/login")))
+
+def test_rate_limit_storage():
+    """Limits must hold across processes and survive a storage re-open"""
+    print("Testing shared rate limiter storage...")
+    print("=" * 50)
+
+    uri = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'ratelimit.db')}"
+    storage = storage_from_string(uri)
+    assert isinstance(storage, SQLiteStorage)
+
+    moving = MovingWindowRateLimiter(storage)
+    item = parse("3 per minute")
+    assert [moving.hit(item, "k") for _ in range(5)] == [True, True, True, False, False]
+    reset_at, remaining = moving.get_window_stats(item, "k")
+    assert remaining == 0 and reset_at > 0
+    print("✓ moving window admits exactly the limit")
+
+    fixed = FixedWindowRateLimiter(storage)
+    assert [fixed.hit(item, "f") for _ in range(4)] == [True, True, True, False]
+    print("✓ fixed window admits exactly the limit")
+
+    # An expired counter not yet purged reads as an empty window, like memory://
+    storage._conn().execute(
+        "INSERT INTO rl_counters (key, count, expires_at) VALUES ('stale', 7, ?)", (time.time() - 30,)
+    )
+    before = time.time()
+    assert storage.get("stale") == 0 and storage.get_expiry("stale") >= before
+    reset_at, remaining = fixed.get_window_stats(parse("3 per minute"), "stale")
+    assert remaining == 3 and reset_at >= int(before), (reset_at, remaining)
+    print("✓ expired counters report no hits and a current reset time")
+
+    # A fresh process/storage sees the same counters (restart, other worker)
+    reopened = MovingWindowRateLimiter(storage_from_string(uri))
+    assert not reopened.hit(item, "k")
+    print("✓ counters survive re-opening the storage")
+
+    queue = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=_hit_login, args=(uri, queue)) for _ in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    admitted = sum(queue.get() for _ in procs)
+    assert admitted == 5, admitted
+    print(f"✓ 4 processes x 10 attempts admitted {admitted} (limit 5)")
+
+    moving.clear(item, "k")
+    assert moving.hit(item, "k")
+    assert storage.reset() >= 1
+    print("✓ clear/reset")
+
+    print("=" * 50)
+    print("✅ All rate limiter storage tests passed!")
+
+if __name__ == "__main__":
+    test_rate_limit_storage()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Test script for background file removal
+"""
+
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import reaper
+
+def test_reaper():
+    """Queued files are removed off-thread and counted"""
+    print("Testing file reaper...")
+    before = reaper.reaper_stats()
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(20):
+            path = os.path.join(tmp, f"{i}.bin")
+            with open(path, "wb") as f:
+                f.write(b"x" * 100)
+            paths.append(path)
+        queued = reaper.discard(paths + [None, os.path.join(tmp, "never-existed.srt")])
+        assert queued == 21
+        reaper.wait_idle()
+        assert os.listdir(tmp) == []
+    after = reaper.reaper_stats()
+    assert after["removed"] - before["removed"] == 20
+    assert after["bytes_reclaimed"] - before["bytes_reclaimed"] == 2000
+    assert after["queued"] == 0 and after["errors"] == before["errors"]
+    print("✓ 20 files removed, missing paths ignored")
+
+if __name__ == "__main__":
+    test_reaper()
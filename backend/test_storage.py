@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test script for the storage backends. The S3 part runs against moto's
+server when boto3 and moto are installed.
+"""
+
+import sys
+import os
+import json
+import tempfile
+import urllib.request
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import storage as storage_module, artifacts
+from app.config import settings
+
+def test_local_storage():
+    """Local files are used as they are"""
+    print("Testing local storage...")
+    local = storage_module.LocalStorage()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "a.txt")
+        assert not local.exists(path) and not local.exists(None)
+        assert local.size(path) is None and local.delete(path) == 0
+        with open(path, "wb") as f:
+            f.write(b"hello")
+        local.persist(path)
+        local.release(path)
+        assert local.fetch(path) == path and local.exists(path)
+        with local.open(path) as f:
+            assert f.read() == b"hello"
+        assert local.presigned_url(path, "a.txt", "text/plain") is None
+        assert local.delete(path) == 5 and not os.path.exists(path)
+    print("✓ local storage")
+
+def test_s3_storage():
+    """Files round-trip through a bucket and only scratch copies stay local"""
+    print("Testing S3 storage...")
+    try:
+        import boto3
+        from moto.server import ThreadedMotoServer
+    except ImportError:
+        print("- skipped (boto3/moto not installed)")
+        return
+
+    server = ThreadedMotoServer(port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+    overrides = {
+        "S3_BUCKET": "test-bucket", "S3_PREFIX": "app/", "S3_ENDPOINT_URL": f"http://{host}:{port}",
+        "S3_REGION": "us-east-1", "S3_ACCESS_KEY_ID": "test", "S3_SECRET_ACCESS_KEY": "test",
+    }
+    saved = {name: getattr(settings, name) for name in list(overrides) + ["UPLOAD_DIR"]}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, value in {**overrides, "UPLOAD_DIR": tmp}.items():
+                setattr(settings, name, value)
+            s3 = storage_module.S3Storage()
+            s3.client.create_bucket(Bucket="test-bucket")
+            # Modules bind the configured instance at import
+            artifacts.storage = s3
+            os.makedirs(os.path.join(tmp, "docs"))
+
+            path = os.path.join(tmp, "docs", "x.json.gz")
+            assert s3.key(path) == "app/docs/x.json.gz"
+            with artifacts.open_artifact(path, "wt") as f:
+                json.dump({"ok": True}, f)
+            checksum = artifacts.file_checksum(path)
+            s3.persist(path)
+            s3.release(path)
+            assert not os.path.exists(path) and s3.exists(path)
+
+            # Reads stream from the bucket, through the codec
+            with artifacts.open_artifact(path, "rt") as f:
+                assert json.load(f) == {"ok": True}
+            assert artifacts.file_checksum(path) == checksum
+            head = s3.client.head_object(Bucket="test-bucket", Key=s3.key(path))
+            assert head["ContentEncoding"] == "gzip" and head["ContentType"] == "application/json"
+
+            url = s3.presigned_url(path, "Résumé.json", "application/json")
+            with urllib.request.urlopen(url) as response:
+                assert "filename*=utf-8''R%C3%A9sum%C3%A9.json" in response.headers["Content-Disposition"]
+
+            assert s3.fetch(path) == path and os.path.exists(path)
+            size = s3.size(path)
+            assert s3.delete(path) == size and not s3.exists(path) and not os.path.exists(path)
+            assert s3.delete(path) == 0 and s3.size(path) is None
+            try:
+                s3.key("/elsewhere/file")
+                assert False, "paths outside UPLOAD_DIR must be rejected"
+            except ValueError:
+                pass
+    finally:
+        artifacts.storage = storage_module.storage
+        for name, value in saved.items():
+            setattr(settings, name, value)
+        server.stop()
+    print("✓ S3 storage")
+
+if __name__ == "__main__":
+    test_local_storage()
+    test_s3_storage()
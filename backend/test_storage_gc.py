@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test script for storage garbage collection (retention and orphans)
+"""
+
+import sys
+import os
+import tempfile
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app import models, storage_gc, usage
+from app.database import Base
+from app.config import settings
+
+def _write(path: str, size: int, age_hours: float = 0) -> str:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    mtime = datetime.utcnow().timestamp() - age_hours * 3600
+    os.utime(path, (mtime, mtime))
+    return path
+
+def test_storage_gc():
+    """Old audio expires, unreferenced files past the grace period are removed"""
+    print("Testing storage garbage collection...")
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    saved = (settings.UPLOAD_DIR, settings.AUDIO_RETENTION_DAYS, settings.ORPHAN_GRACE_HOURS)
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.UPLOAD_DIR, settings.AUDIO_RETENTION_DAYS, settings.ORPHAN_GRACE_HOURS = tmp, 30, 24
+        try:
+            now = datetime.utcnow()
+            user = models.User(email="a@x.com", username="a", hashed_password="x")
+            db.add(user)
+            db.flush()
+            docs = os.path.join(tmp, "docs")
+            old = models.Conversion(
+                user_id=user.id, original_filename="a", display_name="a", status="completed",
+                audio_path=_write(os.path.join(tmp, "audio", "old.mp3"), 1000, 24 * 40),
+                json_path=_write(os.path.join(docs, "old.json.gz"), 10, 24 * 40),
+                completed_at=now - timedelta(days=31)
+            )
+            recent = models.Conversion(
+                user_id=user.id, original_filename="b", display_name="b", status="completed",
+                audio_path=_write(os.path.join(tmp, "audio", "recent.mp3"), 1000, 48),
+                json_path=_write(os.path.join(docs, "recent.json.gz"), 10, 48),
+                completed_at=now - timedelta(days=2)
+            )
+            db.add_all([old, recent])
+            db.commit()
+            # Format files next to the JSON belong to the conversion
+            kept = [_write(os.path.join(docs, "recent.srt"), 10, 48)]
+            orphans = [
+                _write(os.path.join(tmp, "audio", "gone.mp3"), 500, 48),
+                _write(os.path.join(docs, "gone.pdf"), 200, 48),
+                _write(os.path.join(tmp, "pdfs", "legacy.pdf"), 300, 24 * 365),
+            ]
+            in_flight = _write(os.path.join(tmp, "audio", "uploading.mp3"), 700, 0.1)
+
+            report = storage_gc.sweep(db, dry_run=True)
+            assert report["expired_audio"] == 1 and report["orphans"] == 3
+            assert report["bytes_reclaimed"] == 2000 and all(os.path.exists(p) for p in orphans)
+
+            report = storage_gc.sweep(db)
+            assert report["expired_audio"] == 1 and report["orphans"] == 3 and report["errors"] == 0
+            assert report["bytes_reclaimed"] == 2000
+            db.refresh(old)
+            assert old.audio_path is None and not os.path.exists(os.path.join(tmp, "audio", "old.mp3"))
+            assert not any(os.path.exists(p) for p in orphans)
+            assert all(os.path.exists(p) for p in kept + [in_flight, recent.audio_path, old.json_path])
+            assert storage_gc.last_report() == report
+
+            # Nothing left to do
+            report = storage_gc.sweep(db)
+            assert report["expired_audio"] == 0 and report["orphans"] == 0
+        finally:
+            settings.UPLOAD_DIR, settings.AUDIO_RETENTION_DAYS, settings.ORPHAN_GRACE_HOURS = saved
+            db.close()
+    print("✓ 1 audio file expired, 3 orphans removed, in-flight and referenced files kept")
+
+def test_overlapping_sweeps():
+    """A row expired by another process's sweep is not deleted or uncounted twice"""
+    print("Testing overlapping retention sweeps...")
+    saved = (settings.UPLOAD_DIR, settings.AUDIO_RETENTION_DAYS)
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.UPLOAD_DIR, settings.AUDIO_RETENTION_DAYS = tmp, 30
+        engine = create_engine(f"sqlite:///{tmp}/gc.db")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+        db, other = Session(), Session()
+        try:
+            user = models.User(email="a@x.com", username="a", hashed_password="x")
+            db.add(user)
+            db.flush()
+            db.add(models.Conversion(
+                user_id=user.id, original_filename="a", display_name="a", status="failed",
+                audio_path=_write(os.path.join(tmp, "audio", "old.mp3"), 1000, 24 * 40),
+                sizes={"audio": 1000}, completed_at=datetime.utcnow() - timedelta(days=31)
+            ))
+            usage.add(db, user.id, {"audio": 1000})
+            db.commit()
+
+            # The other sweep (gc_storage.py, another worker) expires the row
+            # after this one has read it, just before this one claims it
+            reports = {}
+
+            @event.listens_for(db, "do_orm_execute")
+            def interleave(state):
+                if state.is_update and not reports:
+                    reports["other"] = {"expired_audio": 0, "bytes_reclaimed": 0, "errors": 0}
+                    storage_gc.expire_audio(other, reports["other"], datetime.utcnow())
+
+            report = storage_gc.sweep(db)
+            assert reports["other"]["expired_audio"] == 1
+            assert report["expired_audio"] == 0 and report["errors"] == 0
+            db.expire_all()
+            assert db.get(models.User, user.id).usage_bytes == 0
+        finally:
+            settings.UPLOAD_DIR, settings.AUDIO_RETENTION_DAYS = saved
+            db.close()
+            other.close()
+            engine.dispose()
+    print("✓ expired once, usage adjusted once")
+
+if __name__ == "__main__":
+    test_storage_gc()
+    test_overlapping_sweeps()
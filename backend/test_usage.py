@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test script for incrementally maintained usage counters
+"""
+
+import sys
+import os
+import tempfile
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app import models, usage
+from app.database import Base
+
+def _session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+def _counters(db, user):
+    db.refresh(user)
+    return user.usage_conversions, round(user.usage_minutes, 2), user.usage_bytes, usage.storage_by_kind(user)
+
+def test_incremental_counters():
+    """Writes, replacements and deletions adjust the counters by their difference"""
+    print("Testing usage counters...")
+    db = _session()
+    user = models.User(email="a@x.com", username="a", hashed_password="x")
+    db.add(user)
+    db.commit()
+
+    conversions = []
+    for i in range(2):
+        conversion = models.Conversion(
+            user_id=user.id, original_filename="a", display_name="a", sizes={"audio": 1000}
+        )
+        db.add(conversion)
+        usage.add(db, user.id, {"audio": 1000}, conversions=1, uploaded_at=datetime(2024, 1, 1 + i))
+        conversions.append(conversion)
+    db.commit()
+    assert _counters(db, user) == (2, 0.0, 2000, {"audio": 2000})
+    assert user.last_upload_at == datetime(2024, 1, 2)
+    conversions[1].status = "failed"
+    usage.add(db, user.id, failures=1)
+    db.commit()
+    db.refresh(user)
+    assert user.usage_failures == 1
+
+    first = conversions[0]
+    usage.record_sizes(first, {"json": 300, "pdf": 500})
+    usage.add(db, user.id, minutes=1.5)
+    db.commit()
+    assert _counters(db, user) == (2, 1.5, 2800, {"audio": 2000, "json": 300, "pdf": 500})
+
+    # Re-rendering replaces the file: only the difference is applied
+    usage.record_sizes(first, {"pdf": 450})
+    usage.forget_sizes(first, ["audio"])
+    db.commit()
+    assert first.sizes == {"json": 300, "pdf": 450}
+    assert _counters(db, user) == (2, 1.5, 1750, {"audio": 1000, "json": 300, "pdf": 450})
+
+    usage.conversions_deleted(db, conversions)
+    for conversion in conversions:
+        db.delete(conversion)
+    db.commit()
+    # Minutes are what was transcribed, so they stay
+    assert _counters(db, user) == (0, 1.5, 0, {})
+    assert user.usage_failures == 0 and user.last_upload_at == datetime(2024, 1, 2)
+    print("✓ writes, replacements, expiry, failures and deletions")
+
+def test_rebuild():
+    """Counters are recomputed from the stored files"""
+    print("Testing usage rebuild...")
+    db = _session()
+    user = models.User(email="a@x.com", username="a", hashed_password="x", usage_bytes=123456)
+    db.add(user)
+    db.commit()
+    with tempfile.TemporaryDirectory() as tmp:
+        audio = os.path.join(tmp, "a.mp3")
+        with open(audio, "wb") as f:
+            f.write(b"x" * 700)
+        db.add(models.Conversion(
+            user_id=user.id, original_filename="a", display_name="a", status="completed", duration=90,
+            audio_path=audio, pdf_path=os.path.join(tmp, "missing.pdf")
+        ))
+        uploaded = datetime.utcnow() - timedelta(days=3)
+        db.add(models.Conversion(
+            user_id=user.id, original_filename="b", display_name="b", status="failed", created_at=uploaded
+        ))
+        db.commit()
+        assert usage.rebuild(db) == 1
+        db.commit()
+    assert _counters(db, user) == (2, 1.5, 700, {"audio": 700})
+    assert user.usage_failures == 1 and user.last_upload_at > uploaded
+    assert user.conversions[0].sizes == {"audio": 700}
+    print("✓ rebuilt from files")
+
+if __name__ == "__main__":
+    test_incremental_counters()
+    test_rebuild()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test script for the index-backed admin user search
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateIndex
+from app import models, user_search
+from app.database import Base, upgrade_schema
+
+def _session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    for name, email in [
+        ("Alice", "alice@example.com"), ("alicia", "ali@corp.io"), ("bob", "Bob.Alison@example.com"),
+        ("carol", "carol@alps.org"), ("dave_100%", "d@x.io"),
+    ]:
+        db.add(models.User(username=name, email=email, hashed_password="x"))
+    db.commit()
+    return db
+
+def _names(users):
+    return [u.username for u in users]
+
+def test_prefix_search():
+    """Case-insensitive prefix matches on username or email"""
+    print("Testing prefix search...")
+    db = _session()
+    assert _names(user_search.autocomplete(db, " ALI ")) == ["Alice", "alicia"]
+    assert _names(user_search.autocomplete(db, "bob.a")) == ["bob"]
+    assert _names(user_search.autocomplete(db, "ali", limit=1)) == ["Alice"]
+    assert _names(user_search.autocomplete(db, "dave_100%")) == ["dave_100%"]
+    assert user_search.autocomplete(db, "lice") == [] and user_search.autocomplete(db, "  ") == []
+    matched = db.query(models.User).filter(user_search.matches(db, "CA")).all()
+    assert _names(matched) == ["carol"]
+    print("✓ username and email prefixes, username matches first")
+
+def test_indexes():
+    """Searches read the lower-cased indexes; Postgres gets trigram and "C" indexes"""
+    print("Testing search indexes...")
+    db = _session()
+    for column in ("username", "email"):
+        plan = " ".join(str(row[-1]) for row in db.execute(text(
+            f"EXPLAIN QUERY PLAN SELECT id FROM users WHERE lower({column}) >= 'ab' AND lower({column}) < 'ac' "
+            f"ORDER BY lower({column}) LIMIT 10"
+        )))
+        assert f"ix_users_{column}_search" in plan and "TEMP B-TREE" not in plan, plan
+    ddl = [
+        str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+        for index in models.User.__table__.indexes if index.name.endswith(("_search", "_prefix"))
+    ]
+    assert sorted(ddl) == [
+        'CREATE INDEX ix_users_email_prefix ON users ((lower(email) COLLATE "C"))',
+        "CREATE INDEX ix_users_email_search ON users USING gin (lower(email) gin_trgm_ops)",
+        'CREATE INDEX ix_users_username_prefix ON users ((lower(username) COLLATE "C"))',
+        "CREATE INDEX ix_users_username_search ON users USING gin (lower(username) gin_trgm_ops)",
+    ]
+    # The "C" indexes are Postgres-only, in create_all and in upgrade_schema
+    upgrade_schema(bind=db.get_bind(), force=True)
+    names = {row[0] for row in db.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'"))}
+    assert "ix_users_username_search" in names and not any(n.endswith("_prefix") for n in names), names
+    print("✓ index range scans, trigram and ordered prefix DDL on Postgres")
+
+if __name__ == "__main__":
+    test_prefix_search()
+    test_indexes()